@@ -0,0 +1,74 @@
+"""
+CURE Derived Fields Backfill Script
+Fills in fields that are computed on write for documents stored before the
+feature existed, and recounts the story counters from the stories collection.
+Run once after deploying a release that adds such a field; safe to re-run.
+The API does not do this at startup, so it never runs in every worker; it
+only seeds the story counters when there are none yet.
+
+The counter recount replaces totals that live moderation keeps moving, so
+run --counters when no stories are being submitted or moderated.
+
+Usage:
+    python backfill_derived_fields.py             # everything
+    python backfill_derived_fields.py --counters  # only recount story counters
+"""
+
+import argparse
+import asyncio
+import os
+from motor.motor_asyncio import AsyncIOMotorClient
+from dotenv import load_dotenv
+from pathlib import Path
+
+import journal_search
+import near_duplicates
+import story_counters
+from story_render import render_story
+
+# Load environment
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+db_name = os.environ.get('DB_NAME', 'cure_db')
+
+
+async def render_approved_stories(db) -> int:
+    """Excerpt, reading time and sanitized HTML for stories approved before precomputation"""
+    rendered = 0
+    cursor = db.stories.find({"status": "approved", "body_html": {"$exists": False}}, {"_id": 0, "id": 1, "body": 1})
+    async for story in cursor:
+        await db.stories.update_one({"id": story["id"]}, {"$set": render_story(story.get("body", ""))})
+        rendered += 1
+    return rendered
+
+
+async def backfill(args):
+    """Run backfill"""
+    print("🚀 Starting derived field backfill...")
+
+    client = AsyncIOMotorClient(mongo_url)
+    db = client[db_name]
+    print(f"📊 Connected to database: {db_name}")
+
+    if not args.counters:
+        print("\n📝 Rendering approved stories...")
+        print(f"   ✅ {await render_approved_stories(db)} stories rendered")
+
+        print("\n🔎 Normalizing journal search fields...")
+        print(f"   ✅ {await journal_search.backfill(db)} articles updated")
+
+        print("\n🧬 Signing submissions for duplicate detection...")
+        print(f"   ✅ {await near_duplicates.backfill(db)} submissions signed")
+
+    print("\n🔢 Recounting story counters...")
+    print(f"   ✅ {await story_counters.rebuild(db)} counters written")
+
+    client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill derived fields and recount story counters")
+    parser.add_argument("--counters", action="store_true", help="only recount story counters")
+    asyncio.run(backfill(parser.parse_args()))
@@ -0,0 +1,56 @@
+"""
+CURE Journal Identifier Backfill Script
+Seeds the per-year NSR identifier counters from identifiers already issued
+and adds the unique index on cure_identifier. Safe to re-run.
+"""
+
+import asyncio
+import os
+from collections import Counter
+from motor.motor_asyncio import AsyncIOMotorClient
+from dotenv import load_dotenv
+from pathlib import Path
+
+from sequences import ensure_identifier_index, seed_nsr_counters
+
+# Load environment
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+db_name = os.environ.get('DB_NAME', 'cure_db')
+
+
+async def backfill():
+    """Run backfill"""
+    print("🚀 Starting NSR identifier backfill...")
+
+    client = AsyncIOMotorClient(mongo_url)
+    db = client[db_name]
+    print(f"📊 Connected to database: {db_name}")
+
+    # 1. Seed counters
+    print("\n🔢 Seeding identifier counters...")
+    highest = await seed_nsr_counters(db)
+    for year, number in sorted(highest.items()):
+        print(f"   ✅ nsr:{year} >= {number}")
+    if not highest:
+        print("   ℹ️  No issued identifiers found")
+
+    # 2. Unique index (fails if duplicates were already issued)
+    print("\n🔍 Creating unique cure_identifier index...")
+    identifiers = Counter()
+    async for article in db.journal_articles.find({"cure_identifier": {"$type": "string"}}, {"_id": 0, "cure_identifier": 1}):
+        identifiers[article["cure_identifier"]] += 1
+    duplicates = sorted(identifier for identifier, count in identifiers.items() if count > 1)
+    if duplicates:
+        print(f"   ⚠️  Duplicate identifiers must be fixed first: {', '.join(duplicates)}")
+    else:
+        await ensure_identifier_index(db)
+        print("   ✅ Created cure_identifier_unique index")
+
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(backfill())
@@ -0,0 +1,78 @@
+"""
+CURE - Near-Duplicate Benchmark
+Signs a synthetic corpus (100k submissions by default), builds the LSH band
+index in memory and times duplicate lookups against a brute-force scan of the
+same signatures, reporting recall on planted near-duplicates.
+
+Usage: python benchmark_near_duplicates.py [--docs 100000] [--queries 500]
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+import near_duplicates
+
+VOCABULARY_SIZE = 20000
+WORDS_PER_DOC = 180
+
+
+def synthetic_text(rng: random.Random, vocabulary) -> str:
+    return " ".join(rng.choice(vocabulary) for _ in range(WORDS_PER_DOC))
+
+
+def small_edit(rng: random.Random, text: str, vocabulary, edits: int = 4) -> str:
+    """A resubmission: a few words swapped out"""
+    words = text.split()
+    for _ in range(edits):
+        words[rng.randrange(len(words))] = rng.choice(vocabulary)
+    return " ".join(words)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocabulary = [f"w{i}" for i in range(VOCABULARY_SIZE)]
+    texts = [synthetic_text(rng, vocabulary) for _ in range(args.docs)]
+
+    started = time.perf_counter()
+    signatures = [near_duplicates.signature(text) for text in texts]
+    sign_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    index = near_duplicates.LshIndex()
+    for i, sig in enumerate(signatures):
+        index.add(str(i), sig)
+    index_seconds = time.perf_counter() - started
+
+    targets = rng.sample(range(args.docs), args.queries)
+    queries = [near_duplicates.signature(small_edit(rng, texts[i], vocabulary)) for i in targets]
+
+    started = time.perf_counter()
+    found = sum(str(target) in {doc_id for doc_id, _ in index.query(sig)} for target, sig in zip(targets, queries))
+    lsh_seconds = time.perf_counter() - started
+
+    matrix = np.vstack(signatures)
+    brute_queries = queries[:min(50, len(queries))]
+    started = time.perf_counter()
+    for sig in brute_queries:
+        np.flatnonzero((matrix == sig).mean(axis=1) >= near_duplicates.SIMILARITY_THRESHOLD)
+    brute_seconds = (time.perf_counter() - started) / len(brute_queries) * len(queries)
+
+    print(f"documents:            {args.docs:,}")
+    print(f"sign:                 {sign_seconds:.1f}s ({sign_seconds / args.docs * 1e6:.0f} us/doc)")
+    print(f"build band index:     {index_seconds:.1f}s")
+    print(f"LSH lookup:           {lsh_seconds / len(queries) * 1e3:.3f} ms/query")
+    print(f"brute-force scan:     {brute_seconds / len(queries) * 1e3:.3f} ms/query")
+    print(f"recall (4-word edit): {found / len(queries):.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+CURE - Static Catalog Snapshots
+The public catalog lists (published articles, approved and paid posters) only
+change on review, payment and deletion events. After each such event the list
+is rendered once to JSON and written to disk precompressed (gzip, and brotli
+when the `brotli` package is installed); list requests then serve those bytes
+with a strong ETag instead of querying and serializing.
+
+Each version is written under its content hash and a small pointer file is
+swapped in last, so readers never see a half-written set. Disk reads and
+writes run in a thread, off the event loop.
+
+Snapshots are per host. Workers on one host share the directory: whichever
+worker handles an event rewrites the files and the others pick the new
+pointer up within REVALIDATE_SECONDS. Every worker also renders the lists at
+startup; an unchanged list hashes to the current version and is not
+rewritten. With several hosts, an event only refreshes the host that handled
+it, so point CATALOG_SNAPSHOT_DIR at shared storage in that setup.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import Request, Response
+
+try:
+    import brotli
+except ImportError:  # optional: gzip and identity are always written
+    brotli = None
+
+SNAPSHOT_DIR = Path(os.environ.get("CATALOG_SNAPSHOT_DIR", Path(__file__).parent / "snapshots"))
+CACHE_CONTROL = "public, max-age=60"
+# How long a worker serves its loaded version before re-reading the pointer
+REVALIDATE_SECONDS = 1.0
+# Preference order when the client accepts several
+SUFFIXES = {"br": ".br", "gzip": ".gz", "identity": ""}
+
+
+def encode_json(payload: Any) -> bytes:
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def compress(body: bytes) -> Dict[str, bytes]:
+    variants = {"identity": body, "gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants["br"] = brotli.compress(body)
+    return variants
+
+
+def accepted_encoding(header: Optional[str], available) -> str:
+    """Best available content coding for an Accept-Encoding header"""
+    accepted = {}
+    for part in (header or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if coding:
+            accepted[coding.strip().lower()] = quality
+    for coding in SUFFIXES:
+        if coding == "identity":
+            break
+        if coding in available and accepted.get(coding, accepted.get("*", 0.0)) > 0:
+            return coding
+    return "identity"
+
+
+def _write_atomic(path: Path, data: bytes):
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+class StaticSnapshot:
+    """One precompressed JSON document on disk, cached per process by version"""
+
+    def __init__(self, name: str, directory: Optional[Path] = None):
+        # Used in file names: keep it free of dots
+        self.name = name
+        self.directory = Path(directory or SNAPSHOT_DIR)
+        self._loaded: Optional[Tuple[str, Dict[str, bytes]]] = None
+        self._checked_until = 0.0
+
+    @property
+    def pointer(self) -> Path:
+        return self.directory / f"{self.name}.current"
+
+    def _path(self, digest: str, coding: str) -> Path:
+        return self.directory / f"{self.name}.{digest}.json{SUFFIXES[coding]}"
+
+    def write(self, payload: Any) -> str:
+        """Render, compress and publish `payload`; returns the version digest"""
+        body = encode_json(payload)
+        digest = hashlib.sha256(body).hexdigest()[:20]
+        self.directory.mkdir(parents=True, exist_ok=True)
+        previous = self._current_digest()
+        if digest == previous:
+            return digest
+        for coding, data in compress(body).items():
+            _write_atomic(self._path(digest, coding), data)
+        _write_atomic(self.pointer, digest.encode())
+        # Keep the previous version for readers that resolved the old pointer
+        keep = {digest, previous}
+        for path in self.directory.glob(f"{self.name}.*.json*"):
+            if path.name[len(self.name) + 1:].split(".", 1)[0] not in keep:
+                path.unlink(missing_ok=True)
+        return digest
+
+    async def publish(self, payload: Any) -> str:
+        digest = await asyncio.to_thread(self.write, payload)
+        # Serve the new version from this worker straight away
+        self._checked_until = 0.0
+        return digest
+
+    def _current_digest(self) -> Optional[str]:
+        try:
+            return self.pointer.read_text().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def load(self) -> Optional[Tuple[str, Dict[str, bytes]]]:
+        """(digest, bytes per coding) of the current version; None if never written"""
+        digest = self._current_digest()
+        if digest is None:
+            return None
+        if self._loaded and self._loaded[0] == digest:
+            return self._loaded
+        variants = {}
+        for coding in SUFFIXES:
+            try:
+                variants[coding] = self._path(digest, coding).read_bytes()
+            except FileNotFoundError:
+                continue
+        if "identity" not in variants:
+            return None
+        self._loaded = (digest, variants)
+        return self._loaded
+
+    async def current(self) -> Optional[Tuple[str, Dict[str, bytes]]]:
+        """`load` without blocking the event loop; the pointer is re-read at most
+        every REVALIDATE_SECONDS"""
+        if self._loaded and time.monotonic() < self._checked_until:
+            return self._loaded
+        loaded = await asyncio.to_thread(self.load)
+        if loaded is not None:
+            self._checked_until = time.monotonic() + REVALIDATE_SECONDS
+        return loaded
+
+    async def response(self, request: Request) -> Optional[Response]:
+        """The stored bytes for this client, a 304, or None to fall back to a query"""
+        loaded = await self.current()
+        if loaded is None:
+            return None
+        digest, variants = loaded
+        coding = accepted_encoding(request.headers.get("accept-encoding"), variants)
+        # Strong ETags name exact bytes, so each coding gets its own
+        etag = f'"{self.name}-{digest}-{coding}"'
+        headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL, "Vary": "Accept-Encoding"}
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+            return Response(status_code=304, headers=headers)
+        if coding != "identity":
+            headers["Content-Encoding"] = coding
+        return Response(content=variants[coding], media_type="application/json", headers=headers)
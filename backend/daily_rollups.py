@@ -0,0 +1,104 @@
+"""
+CURE - Daily Rollups
+Per-day activity totals (story submissions and approvals, resonances, signups,
+posts, completed payments) for the admin dashboard's time-series charts.
+
+A periodic job recomputes only the days touched since its watermark, so each
+run costs one aggregation per metric over a day or two of data. Days are
+recomputed whole and written with a replace, which keeps runs idempotent when
+several workers race on the same window.
+"""
+
+import os
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReplaceOne
+
+ROLLUP_COLLECTION = "daily_rollups"
+STATE_COLLECTION = "rollup_state"
+WATERMARK_ID = "daily_rollups"
+ROLLUP_INTERVAL_SECONDS = int(os.environ.get("DAILY_ROLLUP_INTERVAL_SECONDS", 15 * 60))
+MAX_RANGE_DAYS = 366
+
+# metric -> (collection, ISO timestamp field, extra match, summed expression)
+METRICS: Dict[str, tuple] = {
+    "story_submissions": ("stories", "created_at", {}, 1),
+    "story_approvals": ("stories", "published_at", {"status": "approved"}, 1),
+    "resonances": ("story_resonances", "created_at", {}, 1),
+    "signups": ("users", "created_at", {}, 1),
+    "posts": ("posts", "created_at", {}, 1),
+    "payments_completed": ("payment_transactions", "completed_at", {"payment_status": "completed"}, 1),
+    "payment_revenue": ("payment_transactions", "completed_at", {"payment_status": "completed"}, "$amount"),
+}
+
+
+def empty_day(day: str) -> Dict[str, Any]:
+    return {"_id": day, "day": day, **{metric: 0 for metric in METRICS}}
+
+
+def day_range(first: str, last: str) -> List[str]:
+    start, end = date.fromisoformat(first), date.fromisoformat(last)
+    return [(start + timedelta(days=i)).isoformat() for i in range((end - start).days + 1)]
+
+
+async def _aggregate_metric(db: AsyncIOMotorDatabase, metric: str, since: str, until: str) -> Dict[str, float]:
+    collection, field, extra_match, value = METRICS[metric]
+    # Timestamps are stored as ISO strings, so the day is their first 10 characters
+    pipeline = [
+        {"$match": {**extra_match, field: {"$gte": since, "$lt": until, "$type": "string"}}},
+        {"$group": {"_id": {"$substrBytes": [f"${field}", 0, 10]}, "total": {"$sum": value}}},
+    ]
+    rows = await db[collection].aggregate(pipeline).to_list(length=None)
+    return {row["_id"]: row["total"] for row in rows}
+
+
+async def run_rollup(db: AsyncIOMotorDatabase, now: Optional[datetime] = None) -> int:
+    """Recompute every day from the watermark's day up to today; returns days written"""
+    now = now or datetime.now(timezone.utc)
+    until = now.isoformat()
+    state = await db[STATE_COLLECTION].find_one({"_id": WATERMARK_ID})
+    # First run backfills all history; later runs restart at the watermark's day
+    since = state["processed_until"][:10] if state else ""
+
+    days: Dict[str, Dict[str, Any]] = {}
+    for metric in METRICS:
+        for day, total in (await _aggregate_metric(db, metric, since, until)).items():
+            days.setdefault(day, empty_day(day))[metric] = total
+
+    today = now.date().isoformat()
+    first = since or min(days, default=today)
+    for day in day_range(first, today):
+        days.setdefault(day, empty_day(day))
+
+    await db[ROLLUP_COLLECTION].bulk_write(
+        [ReplaceOne({"_id": day}, doc, upsert=True) for day, doc in sorted(days.items())],
+        ordered=False
+    )
+    await db[STATE_COLLECTION].update_one(
+        {"_id": WATERMARK_ID}, {"$set": {"processed_until": until}}, upsert=True
+    )
+    return len(days)
+
+
+async def get_series(db: AsyncIOMotorDatabase, days: int = 30,
+                     today: Optional[date] = None) -> List[Dict[str, Any]]:
+    """The last `days` days of rollups, oldest first, with zero-filled gaps"""
+    days = max(1, min(days, MAX_RANGE_DAYS))
+    today = today or datetime.now(timezone.utc).date()
+    first = (today - timedelta(days=days - 1)).isoformat()
+    docs = await db[ROLLUP_COLLECTION].find({"_id": {"$gte": first}}).to_list(length=days)
+    by_day = {doc["_id"]: doc for doc in docs}
+    return [
+        {key: value for key, value in by_day.get(day, empty_day(day)).items() if key != "_id"}
+        for day in day_range(first, today.isoformat())
+    ]
+
+
+async def ensure_indexes(db: AsyncIOMotorDatabase):
+    """Timestamp indexes so each run reads only the window since the watermark"""
+    indexed = {(collection, field) for collection, field, extra, _ in METRICS.values() if not extra}
+    indexed.add(("payment_transactions", "completed_at"))
+    for collection, field in sorted(indexed):
+        await db[collection].create_index([(field, 1)])
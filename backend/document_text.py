@@ -0,0 +1,203 @@
+"""
+CURE - Document Text Extraction
+Background stage that pulls the text out of uploaded poster and article PDFs
+so search can cover the papers themselves, not just the typed abstract.
+
+Parsing runs in a process pool to keep it off the event loop. Results live in
+`document_texts` keyed by the SHA-256 of the file bytes, so a file that was
+already processed (re-uploaded, or attached to a second submission) is never
+parsed again. Each submission then gets a capped `body_text` copy, which the
+journal's text index covers, and `text_source` naming the file it came from.
+Submissions without `text_source` are pending, so whatever replaces a file
+must unset it to have the new file extracted.
+
+Every uvicorn worker runs the job, so rows are claimed one at a time with an
+atomic update (the claim doubles as a lease, like webhook_inbox) and each file
+is parsed by one worker. A worker starts its pool of EXTRACT_WORKERS processes
+the first time it claims a PDF, so a host runs at most
+(uvicorn workers x EXTRACT_WORKERS) parser processes. Failures are recorded in
+`text_error` and retried with backoff; after MAX_ATTEMPTS the file is given up
+on until it is replaced.
+"""
+
+import asyncio
+import hashlib
+import io
+import os
+import re
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from gridfs.errors import NoFile
+from motor.motor_asyncio import AsyncIOMotorDatabase, AsyncIOMotorGridFSBucket
+from pymongo import ReturnDocument
+
+try:
+    from pypdf import PdfReader
+except ImportError:  # extraction is skipped until pypdf is installed
+    PdfReader = None
+
+TEXT_COLLECTION = "document_texts"
+EXTRACT_INTERVAL_SECONDS = int(os.environ.get("DOCUMENT_TEXT_INTERVAL_SECONDS", 120))
+# Parser processes per uvicorn worker
+EXTRACT_WORKERS = int(os.environ.get("DOCUMENT_TEXT_WORKERS", 1))
+BATCH_SIZE = 20
+MAX_ATTEMPTS = 5
+CLAIM_SECONDS = 600
+BASE_RETRY_SECONDS = 300
+MAX_RETRY_SECONDS = 6 * 3600
+MAX_PAGES = 80
+MAX_INDEXED_CHARS = 200_000
+# submission collection -> field holding the GridFS file id
+SOURCES = {"journal_articles": "pdf_url", "poster_submissions": "poster_url"}
+# Full text is for the index; detail and admin reads leave it behind
+BODY_TEXT_PROJECTION = {"body_text": 0}
+
+WHITESPACE_PATTERN = re.compile(r"\s+")
+# Words hyphenated across a line break
+HYPHEN_BREAK_PATTERN = re.compile(r"(\w)-\s*\n\s*(\w)")
+
+_executor: Optional[Executor] = None
+
+
+def extract_pdf_text(data: bytes) -> Dict[str, Any]:
+    """Runs in a worker process: plain text of the first MAX_PAGES pages"""
+    try:
+        reader = PdfReader(io.BytesIO(data))
+        pages = reader.pages[:MAX_PAGES]
+        raw = "\n".join(page.extract_text() or "" for page in pages)
+        text = WHITESPACE_PATTERN.sub(" ", HYPHEN_BREAK_PATTERN.sub(r"\1\2", raw)).strip()
+        return {"status": "ok", "text": text, "pages": len(reader.pages)}
+    except Exception as e:  # malformed or encrypted files
+        return {"status": "failed", "text": "", "error": str(e)[:500]}
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """5m, 10m, 20m... capped at six hours"""
+    return timedelta(seconds=min(BASE_RETRY_SECONDS * 2 ** max(attempts - 1, 0), MAX_RETRY_SECONDS))
+
+
+def get_executor() -> Executor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=EXTRACT_WORKERS)
+    return _executor
+
+
+def shutdown():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def _read_file(fs: AsyncIOMotorGridFSBucket, file_identifier: str) -> Optional[bytes]:
+    try:
+        grid_out = await fs.open_download_stream(ObjectId(file_identifier))
+    except (InvalidId, TypeError, NoFile):
+        return None
+    return await grid_out.read()
+
+
+async def text_for_file(db: AsyncIOMotorDatabase, data: bytes,
+                        executor: Optional[Executor] = None) -> Dict[str, Any]:
+    """Stored extraction for these bytes, parsing them only the first time"""
+    content_hash = hashlib.sha256(data).hexdigest()
+    stored = await db[TEXT_COLLECTION].find_one({"_id": content_hash})
+    if stored and stored.get("status") == "ok":
+        return stored
+    loop = asyncio.get_running_loop()
+    result = await loop.run_in_executor(executor or get_executor(), extract_pdf_text, data)
+    doc = {"_id": content_hash, **result, "bytes": len(data),
+           "extracted_at": datetime.now(timezone.utc).isoformat()}
+    # Failures are not stored, so a retry parses the file again. Two workers
+    # may race on the same file; both computed the same thing.
+    if result["status"] == "ok":
+        await db[TEXT_COLLECTION].replace_one({"_id": content_hash}, doc, upsert=True)
+    return doc
+
+
+def pending_query(file_field: str, now: datetime) -> Dict[str, Any]:
+    """Submissions whose current file has no extracted text yet and are due.
+
+    Only equality and range conditions, so the compound index from
+    ensure_indexes answers it without a collection scan.
+    """
+    return {
+        # Never extracted (new submission or replaced file)
+        "text_source": None,
+        file_field: {"$nin": [None, ""]},
+        # Not claimed by a live worker and not waiting out a retry delay
+        "$or": [{"text_retry_at": {"$exists": False}}, {"text_retry_at": {"$lte": now.isoformat()}}],
+    }
+
+
+async def _claim(db: AsyncIOMotorDatabase, collection: str, file_field: str,
+                 now: datetime) -> Optional[Dict[str, Any]]:
+    return await db[collection].find_one_and_update(
+        pending_query(file_field, now),
+        {"$set": {"text_retry_at": (now + timedelta(seconds=CLAIM_SECONDS)).isoformat()},
+         "$inc": {"text_attempts": 1}},
+        projection={"_id": 0, "id": 1, file_field: 1, "text_attempts": 1},
+        return_document=ReturnDocument.AFTER
+    )
+
+
+async def _extract(db: AsyncIOMotorDatabase, fs: AsyncIOMotorGridFSBucket, file_identifier: str,
+                   executor: Optional[Executor]) -> Dict[str, Any]:
+    """Fields to store for a file; raises when the attempt should be retried"""
+    data = await _read_file(fs, file_identifier)
+    if data is None:
+        raise FileNotFoundError(f"file {file_identifier} not found")
+    if not data.startswith(b"%PDF"):
+        # Images have no text
+        return {"content_sha256": None, "body_text": ""}
+    extracted = await text_for_file(db, data, executor)
+    if extracted["status"] != "ok":
+        raise ValueError(extracted.get("error") or "extraction failed")
+    return {"content_sha256": extracted["_id"], "body_text": extracted["text"][:MAX_INDEXED_CHARS]}
+
+
+async def run_pending(db: AsyncIOMotorDatabase, fs: AsyncIOMotorGridFSBucket,
+                      executor: Optional[Executor] = None) -> int:
+    """Claim and extract submissions whose current file has not been processed"""
+    if PdfReader is None:
+        return 0
+    processed = 0
+    for collection, file_field in SOURCES.items():
+        for _ in range(BATCH_SIZE):
+            now = datetime.now(timezone.utc)
+            doc = await _claim(db, collection, file_field, now)
+            if doc is None:
+                break
+            processed += 1
+            file_identifier = doc[file_field]
+            try:
+                update = {
+                    "$set": {"text_source": file_identifier,
+                             **await _extract(db, fs, file_identifier, executor)},
+                    "$unset": {"text_retry_at": "", "text_attempts": "", "text_error": ""},
+                }
+            except Exception as e:
+                update = {"$set": {"text_error": str(e)[:500]}}
+                if doc["text_attempts"] >= MAX_ATTEMPTS:
+                    # Give up on this file; a replacement is extracted afresh
+                    update["$set"].update({"text_source": file_identifier, "content_sha256": None, "body_text": ""})
+                    update["$unset"] = {"text_retry_at": "", "text_attempts": ""}
+                else:
+                    update["$set"]["text_retry_at"] = (now + retry_delay(doc["text_attempts"])).isoformat()
+                print(f"⚠️  Text extraction failed for {collection} {doc['id']} "
+                      f"(attempt {doc['text_attempts']}): {e}")
+            # If the file was replaced meanwhile, this is a no-op and the new
+            # file is picked up once the claim lapses
+            await db[collection].update_one({"id": doc["id"], file_field: file_identifier}, update)
+    return processed
+
+
+async def ensure_indexes(db: AsyncIOMotorDatabase):
+    for collection, file_field in SOURCES.items():
+        # Pending claims and due retries
+        await db[collection].create_index([("text_source", 1), (file_field, 1), ("text_retry_at", 1)])
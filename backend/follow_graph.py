@@ -0,0 +1,217 @@
+"""
+CURE Social - Follow Suggestions
+"People you may know" computed from a periodic in-memory snapshot of the
+follow graph. Adjacency is held as CSR arrays (indptr/indices) so
+friends-of-friends expansion is a couple of NumPy gathers per user. One
+worker at a time (the job lease holder) rebuilds the stored lists.
+"""
+
+import asyncio
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReplaceOne
+
+import job_leases
+
+SUGGESTION_COLLECTION = "follow_suggestions"
+REFRESH_INTERVAL_SECONDS = int(os.environ.get("FOLLOW_SUGGESTIONS_REFRESH_SECONDS", 3600))
+LEASE_NAME = "follow_suggestions"
+LEASE_SECONDS = 2 * REFRESH_INTERVAL_SECONDS
+TOP_N = 20
+
+# Ranking weights: a mutual follow counts most, then shared circles, then university
+MUTUAL_WEIGHT = 1.0
+CIRCLE_WEIGHT = 0.5
+UNIVERSITY_WEIGHT = 0.25
+# Cap on same-university candidates per user so large schools stay cheap
+MAX_UNIVERSITY_CANDIDATES = 500
+
+
+def _csr(n_rows: int, rows: np.ndarray, cols: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Build (indptr, indices) for a sparse 0/1 matrix with de-duplicated edges"""
+    if rows.size:
+        edges = np.unique(np.stack([rows, cols], axis=1), axis=0)
+        rows, cols = edges[:, 0], edges[:, 1]
+    counts = np.bincount(rows, minlength=n_rows)
+    indptr = np.zeros(n_rows + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+    return indptr, cols.astype(np.int32)
+
+
+def _gather(indptr: np.ndarray, indices: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    """Concatenate the CSR rows listed in `rows` without a Python loop"""
+    if rows.size == 0:
+        return np.empty(0, dtype=indices.dtype)
+    starts = indptr[rows]
+    lengths = indptr[rows + 1] - starts
+    total = int(lengths.sum())
+    if total == 0:
+        return np.empty(0, dtype=indices.dtype)
+    # Position of each gathered element relative to its row start
+    row_offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return indices[row_offsets + np.arange(total)]
+
+
+class FollowGraph:
+    """Immutable snapshot of follows, university affiliation and circle membership"""
+
+    def __init__(self, user_ids: Sequence[str], follows: Sequence[Tuple[str, str]],
+                 universities: Dict[str, Optional[str]], memberships: Sequence[Tuple[str, str]]):
+        self.user_ids = list(user_ids)
+        self.index = {user_id: i for i, user_id in enumerate(self.user_ids)}
+        n = len(self.user_ids)
+
+        pairs = [(self.index[a], self.index[b]) for a, b in follows
+                 if a in self.index and b in self.index and a != b]
+        src = np.array([p[0] for p in pairs], dtype=np.int64)
+        dst = np.array([p[1] for p in pairs], dtype=np.int64)
+        self.follow_indptr, self.follow_indices = _csr(n, src, dst)
+
+        university_codes: Dict[str, int] = {}
+        self.university = np.full(n, -1, dtype=np.int32)
+        for user_id, university in universities.items():
+            if university and user_id in self.index:
+                code = university_codes.setdefault(university, len(university_codes))
+                self.university[self.index[user_id]] = code
+        by_university = np.argsort(self.university, kind="stable").astype(np.int32)
+        self.university_indptr = np.searchsorted(
+            self.university[by_university], np.arange(len(university_codes) + 1)
+        ).astype(np.int64)
+        self.university_members = by_university
+
+        circle_codes: Dict[str, int] = {}
+        member_rows, member_cols = [], []
+        for circle_id, user_id in memberships:
+            if user_id in self.index:
+                member_rows.append(self.index[user_id])
+                member_cols.append(circle_codes.setdefault(circle_id, len(circle_codes)))
+        rows = np.array(member_rows, dtype=np.int64)
+        cols = np.array(member_cols, dtype=np.int64)
+        self.circle_indptr, self.circle_indices = _csr(n, rows, cols)
+        # Transposed membership: circle -> users
+        self.members_indptr, self.members_indices = _csr(len(circle_codes), cols, rows)
+
+    def suggestions_for(self, user_index: int, top_n: int = TOP_N) -> List[Dict[str, Any]]:
+        """Rank candidates for one user by mutual follows, shared circles and university"""
+        followed = self.follow_indices[self.follow_indptr[user_index]:self.follow_indptr[user_index + 1]]
+        friends_of_friends = _gather(self.follow_indptr, self.follow_indices, followed.astype(np.int64))
+
+        circles = self.circle_indices[self.circle_indptr[user_index]:self.circle_indptr[user_index + 1]]
+        circle_mates = _gather(self.members_indptr, self.members_indices, circles.astype(np.int64))
+
+        code = self.university[user_index]
+        if code >= 0:
+            start, end = self.university_indptr[code], self.university_indptr[code + 1]
+            classmates = self.university_members[start:min(end, start + MAX_UNIVERSITY_CANDIDATES)]
+        else:
+            classmates = np.empty(0, dtype=np.int32)
+
+        candidates = np.concatenate([friends_of_friends, circle_mates, classmates]).astype(np.int64)
+        if candidates.size == 0:
+            return []
+        unique, inverse = np.unique(candidates, return_inverse=True)
+
+        n_fof, n_circle = friends_of_friends.size, circle_mates.size
+        mutual = np.bincount(inverse[:n_fof], minlength=unique.size)
+        shared_circles = np.bincount(inverse[n_fof:n_fof + n_circle], minlength=unique.size)
+        same_university = (self.university[unique] == code) & (code >= 0)
+        scores = (MUTUAL_WEIGHT * mutual
+                  + CIRCLE_WEIGHT * shared_circles
+                  + UNIVERSITY_WEIGHT * same_university)
+
+        eligible = (unique != user_index) & ~np.isin(unique, followed)
+        eligible_positions = np.flatnonzero(eligible)
+        if eligible_positions.size == 0:
+            return []
+        if eligible_positions.size > top_n:
+            best = np.argpartition(-scores[eligible_positions], top_n - 1)[:top_n]
+            eligible_positions = eligible_positions[best]
+        order = np.lexsort((unique[eligible_positions], -scores[eligible_positions]))
+        ranked = eligible_positions[order]
+
+        return [
+            {
+                "user_id": self.user_ids[unique[pos]],
+                "score": round(float(scores[pos]), 4),
+                "mutual_follows": int(mutual[pos]),
+                "shared_circles": int(shared_circles[pos]),
+                "shared_university": bool(same_university[pos]),
+            }
+            for pos in ranked
+        ]
+
+    def compute_all(self, top_n: int = TOP_N) -> Dict[str, List[Dict[str, Any]]]:
+        """Suggestions for every user in the snapshot (users with none are omitted)"""
+        results = {}
+        for i, user_id in enumerate(self.user_ids):
+            suggestions = self.suggestions_for(i, top_n)
+            if suggestions:
+                results[user_id] = suggestions
+        return results
+
+
+def _build_graph(users: List[Dict[str, Any]], follows: List[Dict[str, Any]],
+                 members: List[Dict[str, Any]]) -> FollowGraph:
+    user_ids = [u["id"] for u in users if u.get("id")]
+    return FollowGraph(
+        user_ids,
+        [(f["follower_id"], f["followed_id"]) for f in follows],
+        {u["id"]: u.get("university") for u in users if u.get("id")},
+        [(m["circle_id"], m["user_id"]) for m in members],
+    )
+
+
+async def load_graph(db: AsyncIOMotorDatabase) -> FollowGraph:
+    """Snapshot the follow graph with projected reads of users, follows and circle members"""
+    users = await db.users.find({}, {"_id": 0, "id": 1, "university": 1}).to_list(length=None)
+    follows = await db.follows.find({}, {"_id": 0, "follower_id": 1, "followed_id": 1}).to_list(length=None)
+    members = await db.circle_members.find({}, {"_id": 0, "circle_id": 1, "user_id": 1}).to_list(length=None)
+    # Building the CSR arrays is CPU bound too
+    return await asyncio.to_thread(_build_graph, users, follows, members)
+
+
+async def ensure_indexes(db: AsyncIOMotorDatabase):
+    await db[SUGGESTION_COLLECTION].create_index("user_id", unique=True)
+
+
+async def refresh_suggestions(db: AsyncIOMotorDatabase, top_n: int = TOP_N) -> int:
+    """Periodic job: rebuild the snapshot and replace every user's precomputed
+    top-N list; workers without the lease skip it"""
+    if not await job_leases.acquire(db, LEASE_NAME, LEASE_SECONDS):
+        return 0
+    graph = await load_graph(db)
+    # Ranking is CPU bound; keep it off the event loop
+    results = await asyncio.to_thread(graph.compute_all, top_n)
+
+    generated_at = datetime.now(timezone.utc).isoformat()
+    operations = [
+        ReplaceOne(
+            {"user_id": user_id},
+            {"user_id": user_id, "suggestions": suggestions, "generated_at": generated_at},
+            upsert=True
+        )
+        for user_id, suggestions in results.items()
+    ]
+    if operations:
+        await db[SUGGESTION_COLLECTION].bulk_write(operations, ordered=False)
+    # Users who no longer have any candidates keep no stale list
+    await db[SUGGESTION_COLLECTION].delete_many({"generated_at": {"$lt": generated_at}})
+    return len(results)
+
+
+async def get_suggestions(db: AsyncIOMotorDatabase, user_id: str) -> List[Dict[str, Any]]:
+    """Precomputed suggestions for one user (single indexed read)"""
+    doc = await db[SUGGESTION_COLLECTION].find_one({"user_id": user_id}, {"_id": 0, "suggestions": 1})
+    return doc["suggestions"] if doc else []
+
+
+async def discard_suggestion(db: AsyncIOMotorDatabase, user_id: str, suggested_id: str):
+    """Drop a suggestion once the user follows that person, without waiting for the next rebuild"""
+    await db[SUGGESTION_COLLECTION].update_one(
+        {"user_id": user_id},
+        {"$pull": {"suggestions": {"user_id": suggested_id}}}
+    )
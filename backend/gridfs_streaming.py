@@ -0,0 +1,114 @@
+"""
+CURE - GridFS Streaming
+HTTP delivery of files stored in GridFS: chunked reads, single byte-range
+requests (206), ETag/If-None-Match revalidation (304) and cache headers.
+Stored files are never modified in place, so the file id and length make a
+strong ETag.
+"""
+
+import re
+from typing import Optional, Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from gridfs.errors import NoFile
+from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+
+CHUNK_SIZE = 64 * 1024
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def parse_range(header: Optional[str], length: int) -> Optional[Tuple[int, int]]:
+    """Inclusive (start, end) for a single-range header; None means send everything.
+
+    Raises ValueError for a range that cannot be satisfied.
+    """
+    if not header:
+        return None
+    match = RANGE_PATTERN.match(header.strip())
+    if not match or match.groups() == ("", ""):
+        # Multiple or malformed ranges: serve the whole file as the spec allows
+        return None
+    first, last = match.groups()
+    if first == "":
+        suffix = int(last)
+        if suffix == 0:
+            raise ValueError("empty suffix range")
+        return max(0, length - suffix), length - 1
+    start = int(first)
+    end = min(int(last), length - 1) if last else length - 1
+    if start >= length or end < start:
+        raise ValueError("range not satisfiable")
+    return start, end
+
+
+def content_disposition(filename: str, attachment: bool = False) -> str:
+    safe = re.sub(r'[^\w.\- ]', "_", filename).strip() or "file"
+    return f'{"attachment" if attachment else "inline"}; filename="{safe}"'
+
+
+async def stream_gridfs_file(
+    fs: AsyncIOMotorGridFSBucket,
+    file_identifier: str,
+    request: Request,
+    filename: str,
+    attachment: bool = False,
+    media_type: Optional[str] = None,
+    cache_control: str = "public, max-age=86400",
+) -> Response:
+    """Serve a GridFS file honouring Range and If-None-Match"""
+    try:
+        grid_out = await fs.open_download_stream(ObjectId(file_identifier))
+    except (InvalidId, TypeError, NoFile):
+        raise HTTPException(status_code=404, detail="File not found")
+
+    length = grid_out.length
+    etag = f'"{file_identifier}-{length}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": cache_control,
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": content_disposition(filename, attachment),
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    if media_type is None:
+        metadata = grid_out.metadata or {}
+        media_type = metadata.get("content_type", "application/octet-stream")
+
+    try:
+        byte_range = parse_range(request.headers.get("range"), length)
+    except ValueError:
+        return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{length}"})
+    # If-Range: only honour the range if the client still has this version
+    if_range = request.headers.get("if-range")
+    if byte_range and if_range and if_range.strip() != etag:
+        byte_range = None
+
+    start, end = byte_range or (0, length - 1)
+    remaining = end - start + 1 if length else 0
+    if start:
+        grid_out.seek(start)
+
+    async def file_iterator():
+        left = remaining
+        while left > 0:
+            chunk = await grid_out.read(min(CHUNK_SIZE, left))
+            if not chunk:
+                break
+            left -= len(chunk)
+            yield chunk
+
+    headers["Content-Length"] = str(remaining)
+    if byte_range:
+        headers["Content-Range"] = f"bytes {start}-{end}/{length}"
+    return StreamingResponse(
+        file_iterator(),
+        status_code=206 if byte_range else 200,
+        media_type=media_type,
+        headers=headers
+    )
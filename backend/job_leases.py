@@ -0,0 +1,46 @@
+"""
+CURE - Job Leases
+Named, expiring leases in the `job_leases` collection. Background jobs that
+own a collection (precomputed match lists, related stories, ...) or must run
+once per deployment take the lease first, so only one uvicorn worker does the
+work at a time. The holder renews it on every run; if that worker dies the
+lease runs out and another worker takes the job over.
+"""
+
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import DuplicateKeyError
+
+LEASE_COLLECTION = "job_leases"
+# Unique per process, so two workers on one host never share a lease
+HOLDER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+async def acquire(db: AsyncIOMotorDatabase, name: str, ttl_seconds: float,
+                  holder: str = HOLDER_ID, now: Optional[datetime] = None) -> bool:
+    """Take or renew the lease; False while another holder's lease is live"""
+    now = now or datetime.now(timezone.utc)
+    try:
+        await db[LEASE_COLLECTION].update_one(
+            {"_id": name, "$or": [{"holder": holder}, {"expires_at": {"$lt": now.isoformat()}}]},
+            {"$set": {
+                "holder": holder,
+                "expires_at": (now + timedelta(seconds=ttl_seconds)).isoformat(),
+                "renewed_at": now.isoformat(),
+            }},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        # The lease exists and belongs to someone else
+        return False
+    return True
+
+
+async def release(db: AsyncIOMotorDatabase, name: str, holder: str = HOLDER_ID):
+    """Give the lease up early (only if we still hold it)"""
+    await db[LEASE_COLLECTION].delete_one({"_id": name, "holder": holder})
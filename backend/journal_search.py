@@ -0,0 +1,159 @@
+"""
+CURE Journal - Article Search
+Keywords and authors are submitted as comma-separated strings; they are split
+into normalized arrays at write time so a weighted text index can cover title,
+abstract, keywords, authors and the text extracted from the PDF. Search is
+relevance ranked with facets by university, article type and publication
+year, and pages by keyset on (score, id).
+"""
+
+import base64
+import json
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import OperationFailure
+
+CATALOG_QUERY = {"status": "published", "payment_status": "completed"}
+SEARCH_PROJECTION = {"_id": 0, "id": 1, "cure_identifier": 1, "title": 1, "author_list": 1,
+                     "keyword_list": 1, "university": 1, "article_type": 1, "publication_year": 1}
+SPLIT_PATTERN = re.compile(r"[,;\n]")
+IDENTIFIER_YEAR = re.compile(r"^NSR\.(\d{4})\.")
+
+
+def split_list(value: Optional[str], lowercase: bool = False) -> List[str]:
+    """Comma/semicolon separated string -> trimmed, de-duplicated list in input order"""
+    seen = set()
+    items = []
+    for item in SPLIT_PATTERN.split(value or ""):
+        item = " ".join(item.split())
+        if lowercase:
+            item = item.lower()
+        if item and item.lower() not in seen:
+            seen.add(item.lower())
+            items.append(item)
+    return items
+
+
+def search_fields(article: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalized fields stored alongside the submitted strings"""
+    return {
+        "author_list": split_list(article.get("authors")),
+        "keyword_list": split_list(article.get("keywords"), lowercase=True),
+    }
+
+
+def publication_year(article: Dict[str, Any]) -> Optional[int]:
+    match = IDENTIFIER_YEAR.match(article.get("cure_identifier") or "")
+    if match:
+        return int(match.group(1))
+    reviewed_at = article.get("reviewed_at")
+    if isinstance(reviewed_at, str):
+        reviewed_at = datetime.fromisoformat(reviewed_at)
+    return reviewed_at.year if reviewed_at else None
+
+
+def encode_cursor(score: float, article_id: str) -> str:
+    return base64.urlsafe_b64encode(json.dumps([score, article_id]).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[float, str]:
+    """Raises ValueError for a malformed cursor"""
+    try:
+        score, article_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(score), str(article_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError("invalid cursor") from e
+
+
+def build_pipeline(query: str, filters: Dict[str, Any], cursor: Optional[str], limit: int) -> List[Dict[str, Any]]:
+    """Ranked page (limit + 1 rows to detect more), total and facets in one aggregation"""
+    filter_match = {field: value for field, value in filters.items() if value is not None}
+    page_stages: List[Dict[str, Any]] = [{"$match": filter_match}]
+    if cursor:
+        last_score, last_id = decode_cursor(cursor)
+        page_stages.append({"$match": {"$or": [
+            {"score": {"$lt": last_score}},
+            {"score": last_score, "id": {"$gt": last_id}},
+        ]}})
+    page_stages += [{"$sort": {"score": -1, "id": 1}}, {"$limit": limit + 1}]
+
+    def facet(field: str) -> List[Dict[str, Any]]:
+        # Each facet ignores its own filter so the other options stay visible
+        others = {k: v for k, v in filter_match.items() if k != field}
+        return [
+            {"$match": others},
+            {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+            {"$sort": {"count": -1, "_id": 1}},
+        ]
+
+    return [
+        {"$match": {**CATALOG_QUERY, "$text": {"$search": query}}},
+        {"$project": {**SEARCH_PROJECTION, "score": {"$meta": "textScore"}}},
+        {"$facet": {
+            "articles": page_stages,
+            "total": [{"$match": filter_match}, {"$count": "count"}],
+            "universities": facet("university"),
+            "article_types": facet("article_type"),
+            "years": facet("publication_year"),
+        }},
+    ]
+
+
+async def search(db: AsyncIOMotorDatabase, query: str, filters: Dict[str, Any],
+                 cursor: Optional[str] = None, limit: int = 20) -> Dict[str, Any]:
+    result = (await db.journal_articles.aggregate(build_pipeline(query, filters, cursor, limit)).to_list(1))[0]
+    articles = result["articles"]
+    has_more = len(articles) > limit
+    articles = articles[:limit]
+    next_cursor = encode_cursor(articles[-1]["score"], articles[-1]["id"]) if has_more else None
+    return {
+        "articles": articles,
+        "total": result["total"][0]["count"] if result["total"] else 0,
+        "has_more": has_more,
+        "next_cursor": next_cursor,
+        "facets": {
+            name: [{"value": row["_id"], "count": row["count"]} for row in result[name] if row["_id"] is not None]
+            for name in ("universities", "article_types", "years")
+        },
+    }
+
+
+async def backfill(db: AsyncIOMotorDatabase) -> int:
+    """Normalize articles written before these fields existed (backfill_derived_fields.py)"""
+    updated = 0
+    cursor = db.journal_articles.find(
+        {"$or": [{"keyword_list": {"$exists": False}},
+                 {"status": "published", "publication_year": {"$exists": False}}]},
+        {"_id": 0, "id": 1, "authors": 1, "keywords": 1, "status": 1, "cure_identifier": 1, "reviewed_at": 1}
+    )
+    async for article in cursor:
+        fields = search_fields(article)
+        if article.get("status") == "published":
+            fields["publication_year"] = publication_year(article)
+        await db.journal_articles.update_one({"id": article["id"]}, {"$set": fields})
+        updated += 1
+    return updated
+
+
+TEXT_INDEX_NAME = "journal_articles_text"
+# body_text is the extracted PDF text (document_text.py)
+TEXT_INDEX_KEYS = [("title", "text"), ("keyword_list", "text"), ("author_list", "text"),
+                   ("abstract", "text"), ("body_text", "text")]
+TEXT_INDEX_WEIGHTS = {"title": 10, "keyword_list": 5, "author_list": 5, "abstract": 2, "body_text": 1}
+# IndexOptionsConflict / IndexKeySpecsConflict: same name, older definition
+INDEX_CONFLICT_CODES = (85, 86)
+
+
+async def ensure_indexes(db: AsyncIOMotorDatabase):
+    try:
+        await db.journal_articles.create_index(TEXT_INDEX_KEYS, weights=TEXT_INDEX_WEIGHTS, name=TEXT_INDEX_NAME)
+    except OperationFailure as e:
+        if e.code not in INDEX_CONFLICT_CODES:
+            raise
+        # A collection has one text index, so the old definition has to go first
+        await db.journal_articles.drop_index(TEXT_INDEX_NAME)
+        await db.journal_articles.create_index(TEXT_INDEX_KEYS, weights=TEXT_INDEX_WEIGHTS, name=TEXT_INDEX_NAME)
+    await db.journal_articles.create_index([("status", 1), ("payment_status", 1), ("university", 1)])
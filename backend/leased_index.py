@@ -0,0 +1,140 @@
+"""
+CURE - Leased Top-K Index
+Shared machinery for precomputed "top K similar" collections (research
+matches, related stories). One worker at a time holds the job lease and keeps
+the index in memory; it is the only writer of the collection. Request handlers
+queue changed documents with `mark_dirty`, and the periodic `run` either
+rebuilds everything (first run, or every `rebuild_interval_seconds`) or
+patches the lists the queued changes can affect. Vectorising and ranking run
+in a thread so the event loop keeps serving requests meanwhile.
+
+Subclasses supply the corpus: how to load it, `fit` it and `patch` one entry.
+"""
+
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReplaceOne
+
+import job_leases
+
+
+def stale_lists(ids: Sequence[str], top: Dict[str, List[Tuple[str, float]]], k: int, changed_id: str,
+                new_scores: Sequence[float], exclude: Optional[str] = None) -> List[str]:
+    """Ids whose top-k list can change after `changed_id` was rescored: those
+    that already list it, and those it now beats the weakest entry of"""
+    stale = []
+    for j, other_id in enumerate(ids):
+        if other_id == exclude:
+            continue
+        current = top.get(other_id, [])
+        listed = any(entry_id == changed_id for entry_id, _ in current)
+        threshold = current[-1][1] if len(current) >= k else 0.0
+        if listed or new_scores[j] > threshold:
+            stale.append(other_id)
+    return stale
+
+
+class LeasedTopK:
+    """In-process index behind one `collection`, kept by the job lease holder"""
+
+    def __init__(self, collection: str, update_collection: str, lease_name: str,
+                 lease_seconds: float, rebuild_interval_seconds: float):
+        self.collection = collection
+        self.update_collection = update_collection
+        self.lease_name = lease_name
+        self.lease_seconds = lease_seconds
+        self.rebuild_interval_seconds = rebuild_interval_seconds
+        self.model: Any = None
+        self.rebuild_due = 0.0
+        self.lock = asyncio.Lock()
+
+    # --- Corpus hooks ---
+
+    async def load_all(self, db: AsyncIOMotorDatabase) -> Any:
+        raise NotImplementedError
+
+    async def load_one(self, db: AsyncIOMotorDatabase, mark: Dict[str, Any]) -> Any:
+        """The queued document's current state; falsy once it left the corpus"""
+        raise NotImplementedError
+
+    def fit(self, loaded: Any, generated_at: str) -> List[ReplaceOne]:
+        """Runs in a thread: refit, vectorise and rank everything"""
+        raise NotImplementedError
+
+    def patch(self, mark: Dict[str, Any], loaded: Any, generated_at: str) -> List[ReplaceOne]:
+        """Runs in a thread: update one entry and re-rank the lists it can affect"""
+        raise NotImplementedError
+
+    def removed(self, mark: Dict[str, Any]) -> Dict[str, Any]:
+        """Filter for the stored list of an entry that left the corpus"""
+        raise NotImplementedError
+
+    def reset(self):
+        """Drop the in-memory index (this worker lost the lease)"""
+        self.model = None
+
+    # --- Job ---
+
+    async def rebuild(self, db: AsyncIOMotorDatabase) -> int:
+        """Refit on the whole corpus and rewrite every stored list"""
+        async with self.lock:
+            loaded = await self.load_all(db)
+            generated_at = datetime.now(timezone.utc).isoformat()
+            operations = await asyncio.to_thread(self.fit, loaded, generated_at)
+            if operations:
+                await db[self.collection].bulk_write(operations, ordered=False)
+            await db[self.collection].delete_many({"updated_at": {"$lt": generated_at}})
+            self.rebuild_due = time.monotonic() + self.rebuild_interval_seconds
+            return len(operations)
+
+    async def refresh(self, db: AsyncIOMotorDatabase, mark: Dict[str, Any]) -> int:
+        """Apply one queued change, patching only the lists it can affect.
+
+        New words are ignored until the next full rebuild refits the vocabulary.
+        """
+        if self.model is None:
+            return await self.rebuild(db)
+
+        async with self.lock:
+            loaded = await self.load_one(db, mark)
+            generated_at = datetime.now(timezone.utc).isoformat()
+            operations = await asyncio.to_thread(self.patch, mark, loaded, generated_at)
+            if not loaded:
+                await db[self.collection].delete_one(self.removed(mark))
+            if operations:
+                await db[self.collection].bulk_write(operations, ordered=False)
+            return len(operations)
+
+    async def run(self, db: AsyncIOMotorDatabase) -> int:
+        """Periodic job: rebuild when due, otherwise apply queued changes.
+
+        Workers without the lease only drop their copy of the index, so they
+        start from a full rebuild if the lease ever passes to them.
+        """
+        if not await job_leases.acquire(db, self.lease_name, self.lease_seconds):
+            self.reset()
+            return 0
+
+        queued = await db[self.update_collection].find({}).to_list(length=None)
+        if self.model is None or time.monotonic() >= self.rebuild_due:
+            written = await self.rebuild(db)
+        else:
+            written = 0
+            for mark in queued:
+                written += await self.refresh(db, mark)
+        # A change queued again while we worked keeps its newer mark
+        for mark in queued:
+            await db[self.update_collection].delete_one({"_id": mark["_id"], "marked_at": mark["marked_at"]})
+        return written
+
+    async def mark_dirty(self, db: AsyncIOMotorDatabase, key: str, **fields: Any):
+        """Queue a changed document for the job (request handlers)"""
+        await db[self.update_collection].update_one(
+            {"_id": key},
+            {"$set": {**fields, "marked_at": datetime.now(timezone.utc).isoformat()}},
+            upsert=True
+        )
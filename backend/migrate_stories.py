@@ -0,0 +1,77 @@
+"""
+Vital Signs Story Migration Script
+Moves story resonances out of the legacy `resonated_by` array on each story
+into the `story_resonances` collection and recomputes `resonance_count`.
+Safe to re-run.
+"""
+
+import asyncio
+import os
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from dotenv import load_dotenv
+from pathlib import Path
+from datetime import datetime, timezone
+
+# Load environment
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+db_name = os.environ.get('DB_NAME', 'cure_db')
+
+
+async def migrate_resonances(db):
+    """Copy every resonated_by entry into story_resonances, then drop the array"""
+    await db.story_resonances.create_index([("user_id", 1), ("story_id", 1)], unique=True)
+    await db.story_resonances.create_index([("story_id", 1)])
+    print("   ✅ Created story_resonances indexes")
+
+    migrated_stories = 0
+    cursor = db.stories.find({"resonated_by": {"$exists": True}}, {"_id": 0, "id": 1, "resonated_by": 1})
+    async for story in cursor:
+        user_ids = list(dict.fromkeys(story.get("resonated_by") or []))
+        if user_ids:
+            now = datetime.now(timezone.utc).isoformat()
+            await db.story_resonances.bulk_write([
+                UpdateOne(
+                    {"story_id": story["id"], "user_id": user_id},
+                    {"$setOnInsert": {"story_id": story["id"], "user_id": user_id, "created_at": now}},
+                    upsert=True
+                )
+                for user_id in user_ids
+            ], ordered=False)
+
+        # Resonances recorded after the switch are already edges, so count them all
+        resonance_count = await db.story_resonances.count_documents({"story_id": story["id"]})
+        await db.stories.update_one(
+            {"id": story["id"]},
+            {"$set": {"resonance_count": resonance_count}, "$unset": {"resonated_by": ""}}
+        )
+        migrated_stories += 1
+
+    print(f"   ✅ Migrated resonances for {migrated_stories} stories")
+
+
+async def migrate():
+    """Run migration"""
+    print("🚀 Starting Vital Signs story migration...")
+
+    client = AsyncIOMotorClient(mongo_url)
+    db = client[db_name]
+    print(f"📊 Connected to database: {db_name}")
+
+    print("\n💛 Moving story resonances to their own collection...")
+    await migrate_resonances(db)
+
+    print("\n" + "="*60)
+    print("✅ Vital Signs story migration completed successfully!")
+    print("="*60)
+    print(f"   Stories: {await db.stories.count_documents({})}")
+    print(f"   Resonances: {await db.story_resonances.count_documents({})}")
+
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
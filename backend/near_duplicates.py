@@ -0,0 +1,148 @@
+"""
+CURE - Near-Duplicate Submissions
+MinHash signatures over the word shingles of a submission's title and
+abstract, banded for locality-sensitive hashing. Each document stores its
+signature and band keys; a multikey index on the band keys finds earlier
+submissions that share at least one band, and only those candidates are
+compared, so a check costs a handful of index lookups however large the
+collection grows. Matches are stored on the new submission for reviewers.
+"""
+
+import hashlib
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+import numpy as np
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from text_vectors import tokenize
+
+SHINGLE_WORDS = 3
+BANDS = 16
+ROWS = 8
+NUM_PERMUTATIONS = BANDS * ROWS
+# The banding S-curve crosses 0.5 near (1/BANDS) ** (1/ROWS) ~= 0.71
+SIMILARITY_THRESHOLD = 0.7
+MAX_CANDIDATES = 5
+COLLECTIONS = ("poster_submissions", "journal_articles")
+# Stored for the index only; list endpoints leave them out
+SIGNATURE_PROJECTION = {"minhash": 0, "lsh_bands": 0}
+
+_PRIME = (1 << 31) - 1
+_rng = np.random.default_rng(20240611)  # fixed: stored signatures must stay comparable
+_A = _rng.integers(1, _PRIME, size=NUM_PERMUTATIONS, dtype=np.uint64)
+_B = _rng.integers(0, _PRIME, size=NUM_PERMUTATIONS, dtype=np.uint64)
+
+
+def shingles(text: str) -> Set[str]:
+    tokens = tokenize(text)
+    if len(tokens) < SHINGLE_WORDS:
+        return set(tokens)
+    return {" ".join(tokens[i:i + SHINGLE_WORDS]) for i in range(len(tokens) - SHINGLE_WORDS + 1)}
+
+
+def signature(text: str) -> Optional[np.ndarray]:
+    """MinHash signature (uint32 per permutation); None when there is no text"""
+    items = shingles(text)
+    if not items:
+        return None
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(item.encode(), digest_size=4).digest(), "little") for item in items),
+        dtype=np.uint64, count=len(items)
+    ) % _PRIME
+    # a*x + b stays below 2**62, so uint64 never overflows before the modulus
+    permuted = (_A[:, np.newaxis] * hashes[np.newaxis, :] + _B[:, np.newaxis]) % _PRIME
+    return permuted.min(axis=1).astype(np.uint32)
+
+
+def band_keys(sig: np.ndarray) -> List[str]:
+    return [
+        f"{band}:{hashlib.blake2b(sig[band * ROWS:(band + 1) * ROWS].tobytes(), digest_size=8).hexdigest()}"
+        for band in range(BANDS)
+    ]
+
+
+def similarity(a: Iterable[int], b: Iterable[int]) -> float:
+    """Estimated Jaccard similarity of the two shingle sets"""
+    return float(np.mean(np.asarray(a, dtype=np.uint32) == np.asarray(b, dtype=np.uint32)))
+
+
+def submission_text(doc: Dict[str, Any]) -> str:
+    return f"{doc.get('title', '')} {doc.get('abstract', '')}"
+
+
+def fingerprint(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Fields stored with a submission"""
+    sig = signature(submission_text(doc))
+    if sig is None:
+        return {"minhash": None, "lsh_bands": []}
+    return {"minhash": sig.tolist(), "lsh_bands": band_keys(sig)}
+
+
+class LshIndex:
+    """In-memory band index with the same keys as the Mongo one (benchmarks, batch jobs)"""
+
+    def __init__(self):
+        self.buckets: Dict[str, List[str]] = defaultdict(list)
+        self.signatures: Dict[str, np.ndarray] = {}
+
+    def add(self, doc_id: str, sig: np.ndarray):
+        self.signatures[doc_id] = sig
+        for key in band_keys(sig):
+            self.buckets[key].append(doc_id)
+
+    def query(self, sig: np.ndarray, threshold: float = SIMILARITY_THRESHOLD) -> List[tuple]:
+        candidates = {doc_id for key in band_keys(sig) for doc_id in self.buckets.get(key, ())}
+        scored = [(doc_id, similarity(sig, self.signatures[doc_id])) for doc_id in candidates]
+        return sorted((c for c in scored if c[1] >= threshold), key=lambda c: -c[1])
+
+
+async def find_duplicates(db: AsyncIOMotorDatabase, collection: str, fields: Dict[str, Any],
+                          exclude_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Earlier submissions whose estimated similarity reaches the threshold"""
+    if not fields.get("lsh_bands"):
+        return []
+    query: Dict[str, Any] = {"lsh_bands": {"$in": fields["lsh_bands"]}}
+    if exclude_id:
+        query["id"] = {"$ne": exclude_id}
+    candidates = await db[collection].find(
+        query, {"_id": 0, "id": 1, "title": 1, "status": 1, "submitted_at": 1, "minhash": 1}
+    ).to_list(length=None)
+
+    matches = []
+    for candidate in candidates:
+        score = similarity(fields["minhash"], candidate["minhash"])
+        if score >= SIMILARITY_THRESHOLD:
+            matches.append({
+                "id": candidate["id"],
+                "title": candidate.get("title"),
+                "status": candidate.get("status"),
+                "submitted_at": candidate.get("submitted_at"),
+                "similarity": round(score, 3),
+            })
+    matches.sort(key=lambda match: -match["similarity"])
+    return matches[:MAX_CANDIDATES]
+
+
+async def check_submission(db: AsyncIOMotorDatabase, collection: str, doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Signature, band keys and flagged duplicates to store with a new submission"""
+    fields = fingerprint(doc)
+    fields["duplicate_candidates"] = await find_duplicates(db, collection, fields, exclude_id=doc.get("id"))
+    return fields
+
+
+async def backfill(db: AsyncIOMotorDatabase) -> int:
+    """Sign submissions stored before signatures existed (backfill_derived_fields.py); they are
+    not flagged retroactively"""
+    updated = 0
+    for collection in COLLECTIONS:
+        cursor = db[collection].find({"lsh_bands": {"$exists": False}}, {"_id": 0, "id": 1, "title": 1, "abstract": 1})
+        async for doc in cursor:
+            await db[collection].update_one({"id": doc["id"]}, {"$set": fingerprint(doc)})
+            updated += 1
+    return updated
+
+
+async def ensure_indexes(db: AsyncIOMotorDatabase):
+    for collection in COLLECTIONS:
+        await db[collection].create_index([("lsh_bands", 1)])
@@ -0,0 +1,67 @@
+"""
+CURE - Payment Status
+Answers the checkout status poll. A verified paid-checkout event waiting in
+the webhook inbox completes the payment without asking Stripe; a completed
+payment is answered from the stored transaction. Otherwise Stripe is asked
+through a single-flight cache, and if it is rate limited or unreachable the
+last known state is returned instead of an error.
+"""
+
+import logging
+from typing import Any, Awaitable, Callable, Dict
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+import webhook_inbox
+from single_flight import SingleFlightCache
+
+logger = logging.getLogger(__name__)
+
+
+def stored(transaction: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "status": transaction.get("checkout_status"),
+        "payment_status": transaction["payment_status"],
+        "amount": transaction["amount"],
+        "currency": transaction["currency"]
+    }
+
+
+async def check(db: AsyncIOMotorDatabase, transaction: Dict[str, Any],
+                fetch_status: Callable[[], Awaitable[Any]],
+                complete_payment: Callable[..., Awaitable[bool]],
+                cache: SingleFlightCache) -> Dict[str, Any]:
+    """Status response for a transaction; `fetch_status` asks Stripe and
+    `complete_payment` marks the transaction and its item paid"""
+    session_id = transaction["session_id"]
+
+    # A verified webhook may be waiting in the inbox; it is fresher than polling
+    if transaction["payment_status"] != "completed" and \
+            await webhook_inbox.has_paid_checkout(db, session_id):
+        await complete_payment(transaction, source="Webhook")
+        transaction = await db.payment_transactions.find_one({"session_id": session_id})
+
+    if transaction["payment_status"] == "completed":
+        return stored(transaction)
+
+    try:
+        checkout_status = await cache.get(session_id, fetch_status)
+    except Exception as e:
+        # Rate limited or unreachable: the last known state beats an error page
+        logger.warning("Stripe status check failed for %s: %s", session_id, e)
+        return stored(transaction)
+
+    if checkout_status.payment_status == "paid":
+        await complete_payment(transaction)
+    else:
+        await db.payment_transactions.update_one(
+            {"session_id": session_id, "payment_status": {"$ne": "completed"}},
+            {"$set": {"checkout_status": checkout_status.status}}
+        )
+
+    return {
+        "status": checkout_status.status,
+        "payment_status": checkout_status.payment_status,
+        "amount": checkout_status.amount_total / 100,  # Convert from cents
+        "currency": checkout_status.currency
+    }
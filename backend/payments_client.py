@@ -0,0 +1,86 @@
+"""
+CURE - Payments Client
+One Stripe transport per process instead of one per request. The Stripe SDK
+is pointed at a single pooled HTTPX client (keep-alive connections, connect and
+read timeouts) and retries failed calls with exponential backoff; checkout
+helpers built on top of it are cached per webhook URL. Created at startup and
+closed on shutdown. STRIPE_API_BASE points everything at a local stand-in
+server for tests.
+
+Checkout helpers reach Stripe through the SDK's module-level API, which uses
+the transport installed here.
+"""
+
+import os
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+import httpx
+import stripe
+
+STRIPE_API_BASE = os.environ.get("STRIPE_API_BASE")
+STRIPE_CONNECT_TIMEOUT_SECONDS = float(os.environ.get("STRIPE_CONNECT_TIMEOUT_SECONDS", 5))
+STRIPE_TIMEOUT_SECONDS = float(os.environ.get("STRIPE_TIMEOUT_SECONDS", 20))
+# Stripe's SDK backs off 0.5s, 1s, 2s... (jittered, capped at 5s) and honours
+# Stripe-Should-Retry; POSTs get idempotency keys so retries are safe
+STRIPE_MAX_NETWORK_RETRIES = int(os.environ.get("STRIPE_MAX_NETWORK_RETRIES", 2))
+# Checkout webhook URLs come from the request origin; keep only a few
+MAX_CACHED_CHECKOUTS = 16
+
+
+class PaymentsClient:
+    """Lifecycle-managed Stripe HTTP transport and checkout helper cache"""
+
+    def __init__(
+        self,
+        api_key: Optional[str],
+        checkout_factory: Callable[..., Any],
+        api_base: Optional[str] = STRIPE_API_BASE,
+        connect_timeout: float = STRIPE_CONNECT_TIMEOUT_SECONDS,
+        timeout: float = STRIPE_TIMEOUT_SECONDS,
+        max_retries: int = STRIPE_MAX_NETWORK_RETRIES,
+    ):
+        self.api_key = api_key
+        self.checkout_factory = checkout_factory
+        self.api_base = api_base
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.max_retries = max_retries
+        self.http_client: Optional[stripe.HTTPXClient] = None
+        self._checkouts: "OrderedDict[str, Any]" = OrderedDict()
+
+    def start(self):
+        """Install the pooled client as the Stripe SDK's transport"""
+        if self.http_client is not None:
+            return
+        # Sync and async SDK calls each get one long-lived connection pool
+        self.http_client = stripe.HTTPXClient(timeout=self.timeout, allow_sync_methods=True)
+        stripe.default_http_client = self.http_client
+        stripe.max_network_retries = self.max_retries
+        if self.api_key:
+            stripe.api_key = self.api_key
+        if self.api_base:
+            stripe.api_base = self.api_base
+
+    def checkout(self, webhook_url: str) -> Any:
+        """Shared checkout helper for this webhook URL"""
+        if self.http_client is None:
+            self.start()
+        checkout = self._checkouts.get(webhook_url)
+        if checkout is None:
+            checkout = self.checkout_factory(api_key=self.api_key, webhook_url=webhook_url)
+            self._checkouts[webhook_url] = checkout
+            if len(self._checkouts) > MAX_CACHED_CHECKOUTS:
+                self._checkouts.popitem(last=False)
+        else:
+            self._checkouts.move_to_end(webhook_url)
+        return checkout
+
+    async def close(self):
+        self._checkouts.clear()
+        if self.http_client is None:
+            return
+        if stripe.default_http_client is self.http_client:
+            stripe.default_http_client = None
+        self.http_client.close()
+        await self.http_client.close_async()
+        self.http_client = None
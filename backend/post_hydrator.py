@@ -0,0 +1,107 @@
+"""
+CURE Social - Post Hydration
+Turns raw post documents into PostResponse objects for a given viewer.
+Used by every feed/post endpoint so enrichment costs a fixed number of
+batched queries (authors, likes, follows) regardless of page size.
+"""
+
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from social_models import PostResponse
+
+AUTHOR_PROJECTION = {"_id": 0, "id": 1, "name": 1, "role": 1, "profile_picture": 1, "university": 1}
+DEFAULT_METRICS = {"likes": 0, "comments": 0, "reposts": 0, "views": 0}
+
+
+class PostHydrator:
+    """Batch enrichment of posts with author details and viewer engagement state"""
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.db = db
+
+    async def _authors(self, author_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        users = await self.db.users.find({"id": {"$in": author_ids}}, AUTHOR_PROJECTION).to_list(length=len(author_ids))
+        return {u["id"]: u for u in users}
+
+    async def _liked_post_ids(self, viewer_id: Optional[str], post_ids: List[str]) -> set:
+        if not viewer_id:
+            return set()
+        likes = await self.db.likes.find(
+            {"user_id": viewer_id, "post_id": {"$in": post_ids}},
+            {"_id": 0, "post_id": 1}
+        ).to_list(length=len(post_ids))
+        return {like["post_id"] for like in likes}
+
+    async def _followed_author_ids(self, viewer_id: Optional[str], author_ids: List[str]) -> set:
+        if not viewer_id:
+            return set()
+        follows = await self.db.follows.find(
+            {"follower_id": viewer_id, "followed_id": {"$in": author_ids}},
+            {"_id": 0, "followed_id": 1}
+        ).to_list(length=len(author_ids))
+        return {follow["followed_id"] for follow in follows}
+
+    async def hydrate(self, posts: List[Dict[str, Any]], viewer_id: Optional[str] = None) -> List[PostResponse]:
+        """Enrich `posts` in their given order; posts whose author no longer exists are skipped"""
+        if not posts:
+            return []
+
+        post_ids = [post["id"] for post in posts]
+        author_ids = list({post["author_id"] for post in posts})
+        authors, liked, followed = await asyncio.gather(
+            self._authors(author_ids),
+            self._liked_post_ids(viewer_id, post_ids),
+            self._followed_author_ids(viewer_id, author_ids),
+        )
+
+        responses = []
+        for post in posts:
+            author = authors.get(post["author_id"])
+            if not author:
+                continue
+            responses.append(PostResponse(
+                id=post["id"],
+                author_id=post["author_id"],
+                author_name=author.get("name", "Unknown"),
+                author_role=author.get("role", "student"),
+                author_picture=author.get("profile_picture"),
+                author_university=author.get("university"),
+                text=post["text"],
+                attachments=post.get("attachments", []),
+                tags=post.get("tags", []),
+                visibility=post.get("visibility", "public"),
+                metrics=post.get("metrics", DEFAULT_METRICS),
+                created_at=post.get("created_at"),
+                is_liked=post["id"] in liked,
+                is_following_author=post["author_id"] in followed
+            ))
+        return responses
+
+    async def annotate(self, post: Dict[str, Any], viewer_id: Optional[str] = None) -> Dict[str, Any]:
+        """The stored post with author details and viewer state added.
+
+        Unlike `hydrate`, every stored field is kept and a deleted author falls
+        back to placeholders; this is the single-post endpoint's response.
+        """
+        authors, liked, followed = await asyncio.gather(
+            self._authors([post["author_id"]]),
+            self._liked_post_ids(viewer_id, [post["id"]]),
+            self._followed_author_ids(viewer_id, [post["author_id"]]),
+        )
+        author = authors.get(post["author_id"])
+        return {
+            **post,
+            "author_name": author.get("name") if author else "Unknown",
+            "author_role": author.get("role") if author else "student",
+            "author_picture": author.get("profile_picture") if author else None,
+            "author_university": author.get("university") if author else None,
+            "is_liked": post["id"] in liked,
+            "is_following_author": post["author_id"] in followed
+        }
+
+    async def hydrate_one(self, post: Dict[str, Any], viewer_id: Optional[str] = None) -> Optional[PostResponse]:
+        hydrated = await self.hydrate([post], viewer_id)
+        return hydrated[0] if hydrated else None
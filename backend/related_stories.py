@@ -0,0 +1,176 @@
+"""
+Vital Signs - Related Stories
+Precomputed "read next" lists for approved stories. Similarity blends TF-IDF
+cosine over title and body with cosine over the stories' tags; every approved
+story's top-K neighbours are stored in `related_stories`, so serving them is
+one indexed read.
+"""
+
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReplaceOne
+
+from leased_index import LeasedTopK, stale_lists
+from story_render import plain_text
+from text_vectors import SparseRow, SparseRows, TfidfModel, normalized_row, tokenize, top_k
+
+RELATED_COLLECTION = "related_stories"
+# Stories whose moderation changed since the job last ran, keyed by story id
+UPDATE_COLLECTION = "related_story_updates"
+TOP_K = 6
+TEXT_WEIGHT = 0.7
+TAG_WEIGHT = 0.3
+REBUILD_INTERVAL_SECONDS = int(os.environ.get("RELATED_STORIES_REBUILD_SECONDS", 24 * 3600))
+REFRESH_INTERVAL_SECONDS = int(os.environ.get("RELATED_STORIES_REFRESH_SECONDS", 60))
+LEASE_NAME = "related_stories"
+LEASE_SECONDS = 5 * REFRESH_INTERVAL_SECONDS
+
+STORY_FIELDS = {"_id": 0, "id": 1, "title": 1, "body": 1, "tags": 1, "excerpt": 1,
+                "reading_minutes": 1, "published_at": 1}
+
+
+def story_tokens(story: Dict[str, Any]) -> List[str]:
+    # The title is the story's own summary, so it counts double
+    title = tokenize(story.get("title", ""))
+    return title + title + tokenize(plain_text(story.get("body", "")))
+
+
+def story_card(story: Dict[str, Any]) -> Dict[str, Any]:
+    """What a related-story link needs; no author details are stored"""
+    return {
+        "id": story["id"],
+        "title": story.get("title"),
+        "excerpt": story.get("excerpt"),
+        "tags": story.get("tags", []),
+        "reading_minutes": story.get("reading_minutes"),
+        "published_at": story.get("published_at"),
+    }
+
+
+class RelatedStories(LeasedTopK):
+    """Similarity index over approved stories; the queue holds story ids"""
+
+    def __init__(self, k: int = TOP_K):
+        super().__init__(RELATED_COLLECTION, UPDATE_COLLECTION, LEASE_NAME, LEASE_SECONDS, REBUILD_INTERVAL_SECONDS)
+        self.k = k
+        self.tag_index: Dict[str, int] = {}
+        self.ids: List[str] = []
+        self.position: Dict[str, int] = {}
+        self.text_vectors = SparseRows()
+        self.tag_vectors = SparseRows()
+        self.cards: Dict[str, Dict[str, Any]] = {}
+        self.top: Dict[str, List[Tuple[str, float]]] = {}
+
+    def _tag_vector(self, tags: List[str]) -> SparseRow:
+        for tag in tags:
+            # New tags get the next column; rows are sparse, so nothing is resized
+            self.tag_index.setdefault(tag, len(self.tag_index))
+        columns = sorted({self.tag_index[tag] for tag in tags})
+        return normalized_row(columns, [1.0] * len(columns))
+
+    def _scores(self, i: int) -> np.ndarray:
+        return (TEXT_WEIGHT * self.text_vectors.dot(self.text_vectors[i])
+                + TAG_WEIGHT * self.tag_vectors.dot(self.tag_vectors[i]))
+
+    def _rank(self, story_id: str) -> List[Tuple[str, float]]:
+        i = self.position[story_id]
+        return [(self.ids[j], round(score, 4)) for j, score in top_k(self._scores(i), self.k, exclude=i)]
+
+    def _replace(self, story_id: str, generated_at: str) -> ReplaceOne:
+        return ReplaceOne({"story_id": story_id}, {
+            "story_id": story_id,
+            "related": [{**self.cards[other_id], "score": score} for other_id, score in self.top[story_id]],
+            "updated_at": generated_at,
+        }, upsert=True)
+
+    async def load_all(self, db: AsyncIOMotorDatabase) -> List[Dict[str, Any]]:
+        return await db.stories.find({"status": "approved"}, STORY_FIELDS).to_list(length=None)
+
+    async def load_one(self, db: AsyncIOMotorDatabase, mark: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return await db.stories.find_one({"id": mark["_id"], "status": "approved"}, STORY_FIELDS)
+
+    def fit(self, stories: List[Dict[str, Any]], generated_at: str) -> List[ReplaceOne]:
+        tokens = [story_tokens(s) for s in stories]
+        self.model = TfidfModel.fit(tokens)
+        self.tag_index = {tag: i for i, tag in enumerate(sorted({t for s in stories for t in s.get("tags", [])}))}
+        self.ids = [s["id"] for s in stories]
+        self.position = {story_id: i for i, story_id in enumerate(self.ids)}
+        self.text_vectors = self.model.transform(tokens)
+        self.tag_vectors = SparseRows(self._tag_vector(s.get("tags", [])) for s in stories)
+        self.cards = {s["id"]: story_card(s) for s in stories}
+        self.top = {}
+        operations = []
+        for story_id in self.ids:
+            self.top[story_id] = self._rank(story_id)
+            operations.append(self._replace(story_id, generated_at))
+        return operations
+
+    def _upsert(self, story: Dict[str, Any]):
+        text_vector = self.model.transform_one(story_tokens(story))
+        tag_vector = self._tag_vector(story.get("tags", []))
+        self.cards[story["id"]] = story_card(story)
+        if story["id"] in self.position:
+            i = self.position[story["id"]]
+            self.text_vectors[i] = text_vector
+            self.tag_vectors[i] = tag_vector
+        else:
+            self.position[story["id"]] = len(self.ids)
+            self.ids.append(story["id"])
+            self.text_vectors.append(text_vector)
+            self.tag_vectors.append(tag_vector)
+
+    def _remove(self, story_id: str):
+        i = self.position.pop(story_id, None)
+        if i is None:
+            return
+        self.ids.pop(i)
+        self.text_vectors.pop(i)
+        self.tag_vectors.pop(i)
+        self.position = {other_id: j for j, other_id in enumerate(self.ids)}
+        self.cards.pop(story_id, None)
+        self.top.pop(story_id, None)
+
+    def patch(self, mark: Dict[str, Any], story: Optional[Dict[str, Any]], generated_at: str) -> List[ReplaceOne]:
+        story_id = mark["_id"]
+        if story:
+            self._upsert(story)
+            self.top[story_id] = self._rank(story_id)
+            new_scores = self._scores(self.position[story_id])
+        else:
+            self._remove(story_id)
+            new_scores = np.zeros(len(self.ids), dtype=np.float32)
+
+        operations = []
+        for other_id in stale_lists(self.ids, self.top, self.k, story_id, new_scores, exclude=story_id):
+            self.top[other_id] = self._rank(other_id)
+            operations.append(self._replace(other_id, generated_at))
+        if story:
+            operations.append(self._replace(story_id, generated_at))
+        return operations
+
+    def removed(self, mark: Dict[str, Any]) -> Dict[str, Any]:
+        return {"story_id": mark["_id"]}
+
+    async def refresh_story(self, db: AsyncIOMotorDatabase, story_id: str) -> int:
+        """Add, update or drop one story after a moderation change"""
+        return await self.refresh(db, {"_id": story_id})
+
+
+related_index = RelatedStories()
+
+
+async def mark_dirty(db: AsyncIOMotorDatabase, story_id: str):
+    """Queue a story for the job after it entered or left approved"""
+    await related_index.mark_dirty(db, story_id)
+
+
+async def ensure_indexes(db: AsyncIOMotorDatabase):
+    await db[RELATED_COLLECTION].create_index([("story_id", 1)], unique=True)
+
+
+async def get_related(db: AsyncIOMotorDatabase, story_id: str) -> List[Dict[str, Any]]:
+    doc = await db[RELATED_COLLECTION].find_one({"story_id": story_id}, {"_id": 0, "related": 1})
+    return doc["related"] if doc else []
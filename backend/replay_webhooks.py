@@ -0,0 +1,75 @@
+"""
+CURE Webhook Replay Script
+Re-drives webhook events stored in the inbox (webhook_events) for local
+testing or after fixing whatever sent them to the dead-letter state. Events
+are reset to pending with a fresh attempt budget; the API's inbox worker picks
+them up, or pass --process to apply them here and now (only the events this
+run requeued; anything else due is left to the API).
+
+Usage:
+    python replay_webhooks.py --list
+    python replay_webhooks.py --status dead
+    python replay_webhooks.py --event-id evt_123 --process
+"""
+
+import argparse
+import asyncio
+import os
+from motor.motor_asyncio import AsyncIOMotorClient
+from dotenv import load_dotenv
+from pathlib import Path
+
+import webhook_inbox
+
+# Load environment
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+db_name = os.environ.get('DB_NAME', 'cure_db')
+
+
+async def replay(args):
+    client = AsyncIOMotorClient(mongo_url)
+    db = client[db_name]
+    print(f"📊 Connected to database: {db_name}")
+
+    query = {}
+    if args.event_id:
+        query["_id"] = {"$in": args.event_id}
+    if args.status:
+        query["status"] = args.status
+
+    if args.list:
+        async for event in db[webhook_inbox.INBOX_COLLECTION].find(query).sort("received_at", -1).limit(50):
+            print(f"   {event['_id']}  {event['event_type']:<30} {event['status']:<10} "
+                  f"attempts={event['attempts']}  {event.get('last_error', '')}")
+        client.close()
+        return
+
+    if not query:
+        print("⚠️  Pick events with --event-id or --status (use --status done to replay everything applied)")
+        client.close()
+        return
+
+    event_ids = [event["_id"] async for event in db[webhook_inbox.INBOX_COLLECTION].find(query, {"_id": 1})]
+    requeued = await webhook_inbox.requeue(db, {"_id": {"$in": event_ids}})
+    print(f"🔁 Requeued {requeued} event(s)")
+
+    if args.process:
+        # Same handler the API worker uses
+        from server import handle_stripe_event
+        processed = await webhook_inbox.process_pending(db, handle_stripe_event, event_ids=event_ids)
+        print(f"✅ Processed {processed} event(s)")
+
+    client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-drive stored webhook events")
+    parser.add_argument("--event-id", action="append", help="event id to replay (repeatable)")
+    parser.add_argument("--status", choices=[webhook_inbox.PENDING, webhook_inbox.PROCESSING,
+                                             webhook_inbox.DONE, webhook_inbox.DEAD])
+    parser.add_argument("--list", action="store_true", help="show matching events instead of replaying")
+    parser.add_argument("--process", action="store_true", help="apply requeued events in this process")
+    asyncio.run(replay(parser.parse_args()))
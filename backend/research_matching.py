@@ -0,0 +1,210 @@
+"""
+CURE Network - Research Matching
+Precomputed student <-> professor matches from TF-IDF vectors of research
+interests, skills and research areas. Every profile's top-K list is stored in
+`research_matches`, so serving a user's matches is one indexed read. Profile
+edits are queued and picked up by the leased background job (leased_index)
+within REFRESH_INTERVAL_SECONDS.
+"""
+
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReplaceOne
+
+from leased_index import LeasedTopK, stale_lists
+from text_vectors import SparseRow, SparseRows, TfidfModel, tokenize, top_k
+
+MATCH_COLLECTION = "research_matches"
+# Profile edits waiting for the lease holder, one document per (role, user)
+UPDATE_COLLECTION = "research_match_updates"
+TOP_K = 20
+REBUILD_INTERVAL_SECONDS = int(os.environ.get("RESEARCH_MATCHES_REBUILD_SECONDS", 6 * 3600))
+REFRESH_INTERVAL_SECONDS = int(os.environ.get("RESEARCH_MATCHES_REFRESH_SECONDS", 30))
+LEASE_NAME = "research_matches"
+LEASE_SECONDS = 5 * REFRESH_INTERVAL_SECONDS
+
+STUDENT = "student"
+PROFESSOR = "professor"
+OTHER_ROLE = {STUDENT: PROFESSOR, PROFESSOR: STUDENT}
+
+
+def student_tokens(profile: Dict[str, Any]) -> List[str]:
+    return tokenize(" ".join(profile.get("research_interests", []) + profile.get("skills", [])))
+
+
+def professor_tokens(profile: Dict[str, Any]) -> List[str]:
+    # Research areas are the professor's own keywords, so they count double
+    areas = tokenize(" ".join(profile.get("research_areas", [])))
+    return areas + areas + tokenize(f"{profile.get('department', '')} {profile.get('lab_description', '')}")
+
+
+def match_entry(role: str, profile: Dict[str, Any], user: Dict[str, Any]) -> Dict[str, Any]:
+    """Denormalised card for a profile as it appears in the other side's match list"""
+    entry = {
+        "user_id": profile["user_id"],
+        "profile_id": profile.get("id"),
+        "name": user.get("name"),
+        "university": user.get("university"),
+    }
+    if role == PROFESSOR:
+        entry["department"] = profile.get("department")
+        entry["accepting_students"] = profile.get("accepting_students", True)
+    else:
+        entry["program"] = user.get("program")
+    return entry
+
+
+class _Side:
+    """Vectors, cards and current top-K lists for one role"""
+
+    def __init__(self, role: str, ids: List[str], vectors: SparseRows, cards: Dict[str, Dict[str, Any]]):
+        self.role = role
+        self.ids = ids
+        self.vectors = vectors
+        self.cards = cards
+        self.position = {user_id: i for i, user_id in enumerate(ids)}
+        self.top: Dict[str, List[Tuple[str, float]]] = {}
+
+    def upsert(self, user_id: str, vector: SparseRow, card: Dict[str, Any]):
+        self.cards[user_id] = card
+        if user_id in self.position:
+            self.vectors[self.position[user_id]] = vector
+        else:
+            self.position[user_id] = len(self.ids)
+            self.ids.append(user_id)
+            self.vectors.append(vector)
+
+    def remove(self, user_id: str):
+        i = self.position.pop(user_id, None)
+        if i is None:
+            return
+        self.ids.pop(i)
+        self.vectors.pop(i)
+        self.position = {uid: j for j, uid in enumerate(self.ids)}
+        self.cards.pop(user_id, None)
+        self.top.pop(user_id, None)
+
+
+class ResearchMatcher(LeasedTopK):
+    """Matching index over both roles; the queue holds (role, user_id) marks"""
+
+    def __init__(self, k: int = TOP_K):
+        super().__init__(MATCH_COLLECTION, UPDATE_COLLECTION, LEASE_NAME, LEASE_SECONDS, REBUILD_INTERVAL_SECONDS)
+        self.k = k
+        self.sides: Dict[str, _Side] = {}
+
+    @staticmethod
+    async def _load_profiles(db: AsyncIOMotorDatabase, role: str, user_id: Optional[str] = None):
+        collection = db.student_network if role == STUDENT else db.professor_network
+        query: Dict[str, Any] = {"public_profile": True} if role == STUDENT else {}
+        if user_id:
+            query["user_id"] = user_id
+        profiles = await collection.find(query, {"_id": 0}).to_list(length=None)
+        user_ids = [p["user_id"] for p in profiles]
+        users = await db.users.find(
+            {"id": {"$in": user_ids}},
+            {"_id": 0, "id": 1, "name": 1, "university": 1, "program": 1}
+        ).to_list(length=None)
+        users_by_id = {u["id"]: u for u in users}
+        # Profiles whose user account is gone are not matchable
+        return [(p, users_by_id[p["user_id"]]) for p in profiles if p["user_id"] in users_by_id]
+
+    def _rank(self, role: str, user_id: str) -> List[Tuple[str, float]]:
+        side, other = self.sides[role], self.sides[OTHER_ROLE[role]]
+        if not other.ids:
+            return []
+        scores = other.vectors.dot(side.vectors[side.position[user_id]])
+        return [(other.ids[i], round(score, 4)) for i, score in top_k(scores, self.k)]
+
+    def _replace(self, role: str, user_id: str, generated_at: str) -> ReplaceOne:
+        other = self.sides[OTHER_ROLE[role]]
+        return ReplaceOne({"user_id": user_id, "role": role}, {
+            "user_id": user_id,
+            "role": role,
+            "matches": [{**other.cards[match_id], "score": score} for match_id, score in self.sides[role].top[user_id]],
+            "updated_at": generated_at,
+        }, upsert=True)
+
+    async def load_all(self, db: AsyncIOMotorDatabase) -> Dict[str, List[Tuple[Dict[str, Any], Dict[str, Any]]]]:
+        return {role: await self._load_profiles(db, role) for role in (STUDENT, PROFESSOR)}
+
+    async def load_one(self, db: AsyncIOMotorDatabase, mark: Dict[str, Any]) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        return await self._load_profiles(db, mark["role"], mark["user_id"])
+
+    def fit(self, loaded: Dict[str, List[Tuple[Dict[str, Any], Dict[str, Any]]]],
+            generated_at: str) -> List[ReplaceOne]:
+        tokens = {
+            STUDENT: [student_tokens(p) for p, _ in loaded[STUDENT]],
+            PROFESSOR: [professor_tokens(p) for p, _ in loaded[PROFESSOR]],
+        }
+        self.model = TfidfModel.fit(tokens[STUDENT] + tokens[PROFESSOR])
+        for role in (STUDENT, PROFESSOR):
+            self.sides[role] = _Side(
+                role,
+                [p["user_id"] for p, _ in loaded[role]],
+                self.model.transform(tokens[role]),
+                {p["user_id"]: match_entry(role, p, u) for p, u in loaded[role]},
+            )
+        operations = []
+        for role in (STUDENT, PROFESSOR):
+            side = self.sides[role]
+            for user_id in side.ids:
+                side.top[user_id] = self._rank(role, user_id)
+                operations.append(self._replace(role, user_id, generated_at))
+        return operations
+
+    def patch(self, mark: Dict[str, Any], loaded: List[Tuple[Dict[str, Any], Dict[str, Any]]],
+              generated_at: str) -> List[ReplaceOne]:
+        role, user_id = mark["role"], mark["user_id"]
+        side, other = self.sides[role], self.sides[OTHER_ROLE[role]]
+        if loaded:
+            profile, user = loaded[0]
+            tokens = student_tokens(profile) if role == STUDENT else professor_tokens(profile)
+            side.upsert(user_id, self.model.transform_one(tokens), match_entry(role, profile, user))
+            side.top[user_id] = self._rank(role, user_id)
+            new_scores = other.vectors.dot(side.vectors[side.position[user_id]])
+        else:
+            side.remove(user_id)
+            new_scores = np.zeros(len(other.ids), dtype=np.float32)
+
+        operations = []
+        for other_id in stale_lists(other.ids, other.top, self.k, user_id, new_scores):
+            other.top[other_id] = self._rank(other.role, other_id)
+            operations.append(self._replace(other.role, other_id, generated_at))
+        if loaded:
+            operations.append(self._replace(role, user_id, generated_at))
+        return operations
+
+    def removed(self, mark: Dict[str, Any]) -> Dict[str, Any]:
+        return {"user_id": mark["user_id"], "role": mark["role"]}
+
+    def reset(self):
+        super().reset()
+        self.sides = {}
+
+    async def refresh_profile(self, db: AsyncIOMotorDatabase, role: str, user_id: str) -> int:
+        """Re-vectorise one profile and patch only the match lists it can affect"""
+        return await self.refresh(db, {"role": role, "user_id": user_id})
+
+
+matcher = ResearchMatcher()
+
+
+async def mark_dirty(db: AsyncIOMotorDatabase, role: str, user_id: str):
+    """Queue a profile for the matching job after it was created, edited or removed"""
+    await matcher.mark_dirty(db, f"{role}:{user_id}", role=role, user_id=user_id)
+
+
+async def ensure_indexes(db: AsyncIOMotorDatabase):
+    await db[MATCH_COLLECTION].create_index([("user_id", 1), ("role", 1)], unique=True)
+
+
+async def get_matches(db: AsyncIOMotorDatabase, user_id: str, role: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Stored match list for a user (their student or professor side)"""
+    query: Dict[str, Any] = {"user_id": user_id}
+    if role:
+        query["role"] = role
+    return await db[MATCH_COLLECTION].find_one(query, {"_id": 0})
@@ -0,0 +1,68 @@
+"""
+CURE Journal - Sequences
+Atomic per-name counters in the `counters` collection. Used for article
+identifiers (NSR.{year}.{n}) so concurrent reviews never hand out the same
+number and deleting an article never causes one to be reused.
+"""
+
+import re
+from typing import Dict
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument, UpdateOne
+
+COUNTER_COLLECTION = "counters"
+NSR_PATTERN = re.compile(r"^NSR\.(\d{4})\.(\d+)$")
+
+
+def nsr_counter(year: int) -> str:
+    return f"nsr:{year}"
+
+
+def format_nsr_identifier(year: int, number: int) -> str:
+    return f"NSR.{year}.{number:03d}"
+
+
+async def next_value(db: AsyncIOMotorDatabase, name: str) -> int:
+    """Increment and return the named counter, creating it at 1"""
+    doc = await db[COUNTER_COLLECTION].find_one_and_update(
+        {"_id": name},
+        {"$inc": {"seq": 1}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return doc["seq"]
+
+
+async def next_nsr_identifier(db: AsyncIOMotorDatabase, year: int) -> str:
+    return format_nsr_identifier(year, await next_value(db, nsr_counter(year)))
+
+
+async def seed_nsr_counters(db: AsyncIOMotorDatabase) -> Dict[int, int]:
+    """Raise each year's counter to the highest identifier already issued.
+
+    Uses $max, so it never moves a counter backwards and is safe to re-run.
+    """
+    highest: Dict[int, int] = {}
+    cursor = db.journal_articles.find({"cure_identifier": {"$type": "string"}}, {"_id": 0, "cure_identifier": 1})
+    async for article in cursor:
+        match = NSR_PATTERN.match(article["cure_identifier"])
+        if match:
+            year, number = int(match.group(1)), int(match.group(2))
+            highest[year] = max(highest.get(year, 0), number)
+    if highest:
+        await db[COUNTER_COLLECTION].bulk_write([
+            UpdateOne({"_id": nsr_counter(year)}, {"$max": {"seq": number}}, upsert=True)
+            for year, number in sorted(highest.items())
+        ], ordered=False)
+    return highest
+
+
+async def ensure_identifier_index(db: AsyncIOMotorDatabase):
+    """Unique cure_identifier among articles that have one"""
+    await db.journal_articles.create_index(
+        [("cure_identifier", 1)],
+        unique=True,
+        partialFilterExpression={"cure_identifier": {"$type": "string"}},
+        name="cure_identifier_unique"
+    )
@@ -1,12 +1,16 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, File, UploadFile, Request
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, File, UploadFile, Request, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.responses import JSONResponse, RedirectResponse, FileResponse, StreamingResponse
+from fastapi.encoders import jsonable_encoder
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorGridFSBucket
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 from authlib.integrations.starlette_client import OAuth
 import os
+import sys
 import logging
 from pathlib import Path
 import shutil
@@ -14,11 +18,14 @@ from pydantic import BaseModel, Field, EmailStr
 from typing import List, Optional, Dict, Any
 import uuid
 from datetime import datetime, timezone, timedelta
+import asyncio
 import jwt
 from passlib.context import CryptContext
 import secrets
+import json
+import base64
 from urllib.parse import quote
-from emergentintegrations.payments.stripe.checkout import StripeCheckout, CheckoutSessionResponse, CheckoutStatusResponse, CheckoutSessionRequest
+from emergentintegrations.payments.stripe.checkout import StripeCheckout, CheckoutSessionResponse, CheckoutSessionRequest
 import io
 from google.oauth2 import id_token
 from google.auth.transport import requests as google_requests
@@ -26,6 +33,33 @@ from google.auth.transport import requests as google_requests
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
+# Sibling service modules are imported by name whether the app is started as
+# `server:app` from backend/ or as `backend.server:app` from the repo root
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+import trending
+import follow_graph
+import research_matching
+import story_counters
+import daily_rollups
+import related_stories
+import sequences
+import journal_search
+import near_duplicates
+import document_text
+import webhook_inbox
+import job_leases
+import payment_status
+from shared_snapshot import SharedSnapshot
+from tag_registry import TagRegistry
+from story_render import render_story
+from gridfs_streaming import stream_gridfs_file
+from post_hydrator import PostHydrator
+from catalog_snapshots import StaticSnapshot
+from payments_client import PaymentsClient
+from single_flight import SingleFlightCache
+
 # MongoDB connection with fallbacks for development
 mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
 client = AsyncIOMotorClient(mongo_url)
@@ -47,6 +81,9 @@ security = HTTPBearer()
 
 # Stripe Payment Configuration
 STRIPE_API_KEY = os.environ.get('STRIPE_API_KEY')
+# Shared Stripe transport (pooled connections, timeouts, retries); see startup/shutdown
+payments = PaymentsClient(STRIPE_API_KEY, checkout_factory=StripeCheckout)
+PAYMENT_STATUS_TTL_SECONDS = float(os.environ.get('PAYMENT_STATUS_TTL_SECONDS', 3))
 STRIPE_PUBLISHABLE_KEY = os.environ.get('STRIPE_PUBLISHABLE_KEY')
 POSTER_PUBLICATION_FEE = 15.00  # Fixed fee in CAD for poster publication
 
@@ -177,6 +214,24 @@ class PosterSubmission(BaseModel):
     stripe_session_id: Optional[str] = None
     payment_completed_at: Optional[datetime] = None
 
+class AdminPosterSubmission(PosterSubmission):
+    duplicate_candidates: List[Dict[str, Any]] = []  # Near-duplicate earlier submissions
+
+class PosterSummary(BaseModel):
+    """Public list card; the full submission loads on the detail route"""
+    id: str
+    title: str
+    authors: List[str]
+    keywords: List[str] = []
+    university: str
+    program: Optional[str] = None
+    excerpt: str = ""
+    poster_url: Optional[str] = None  # GridFS id; the card's thumbnail/viewer source
+    submitted_by: Optional[str] = None
+    status: str
+    submitted_at: datetime
+    year: int
+
 class PosterSubmissionCreate(BaseModel):
     title: str
     authors: List[str]
@@ -196,9 +251,12 @@ class JournalArticle(BaseModel):
     authors: str  # Comma-separated author names
     abstract: str
     keywords: Optional[str] = None  # Comma-separated keywords
+    author_list: List[str] = []  # Normalized from authors at write time (search index)
+    keyword_list: List[str] = []  # Normalized, lowercased keywords
     university: str
     program: str
     article_type: str = "research"  # research, review, case_study
+    publication_year: Optional[int] = None  # Set when published (search facet)
     pdf_url: Optional[str] = None
     submitted_by: str  # user_id
     submitter_email: Optional[str] = None
@@ -223,6 +281,52 @@ class JournalArticleCreate(BaseModel):
     pdf_url: Optional[str] = None
     submitter_email: str
 
+class AdminJournalArticle(JournalArticle):
+    duplicate_candidates: List[Dict[str, Any]] = []  # Near-duplicate earlier submissions
+
+class ArticleSummary(BaseModel):
+    """Public list card; abstract, payment and review fields load on the detail route"""
+    id: str
+    cure_identifier: Optional[str] = None
+    title: str
+    authors: str
+    keywords: Optional[str] = None
+    university: str
+    article_type: str = "research"
+    excerpt: str = ""
+    pdf_url: Optional[str] = None
+    status: str
+    submitted_at: datetime
+    year: int
+
+# Catalog lists read only what the cards show; the abstract is cut down in Mongo
+SUMMARY_EXCERPT_CHARS = 300
+POSTER_SUMMARY_PROJECTION = {
+    "_id": 0, "id": 1, "title": 1, "authors": 1, "keywords": 1, "university": 1, "program": 1,
+    "poster_url": 1, "submitted_by": 1, "status": 1, "submitted_at": 1,
+    "excerpt": {"$substrCP": ["$abstract", 0, SUMMARY_EXCERPT_CHARS]},
+}
+ARTICLE_SUMMARY_PROJECTION = {
+    "_id": 0, "id": 1, "cure_identifier": 1, "title": 1, "authors": 1, "keywords": 1, "university": 1,
+    "article_type": 1, "pdf_url": 1, "status": 1, "submitted_at": 1, "publication_year": 1,
+    "excerpt": {"$substrCP": ["$abstract", 0, SUMMARY_EXCERPT_CHARS]},
+}
+
+def summary_from_mongo(doc: Dict[str, Any]) -> Dict[str, Any]:
+    doc = parse_from_mongo(doc)
+    doc["year"] = doc.pop("publication_year", None) or doc["submitted_at"].year
+    return doc
+
+# Signatures and extracted PDF text exist for the indexes; API reads skip them
+SUBMISSION_INDEX_FIELDS = {**near_duplicates.SIGNATURE_PROJECTION, **document_text.BODY_TEXT_PROJECTION}
+
+PUBLIC_POSTER_QUERY = {"status": "approved", "payment_status": "completed"}
+PUBLIC_ARTICLE_QUERY = {"status": "published", "payment_status": "completed"}
+
+# Unfiltered catalog lists, regenerated on review/payment/delete events
+poster_catalog_snapshot = StaticSnapshot("posters")
+article_catalog_snapshot = StaticSnapshot("journal_articles")
+
 class JournalArticleReviewRequest(BaseModel):
     status: str  # published or rejected
     comments: Optional[str] = None
@@ -481,7 +585,8 @@ class Like(BaseModel):
 # VITAL SIGNS - HEALTH STORYTELLING PLATFORM MODELS
 # ============================================================================
 
-# Pre-defined health topic tags
+# Default health topic tags, seeded into health_tags on first startup.
+# The live set (including admin-created tags) is served by tag_registry.
 HEALTH_TOPIC_TAGS = [
     "Mental Health",
     "Chronic Illness", 
@@ -494,6 +599,8 @@ HEALTH_TOPIC_TAGS = [
     "Other"
 ]
 
+tag_registry = TagRegistry(HEALTH_TOPIC_TAGS)
+
 # Canadian universities list for optional affiliation
 CANADIAN_UNIVERSITIES = [
     "University of Toronto",
@@ -534,8 +641,7 @@ class Story(BaseModel):
     status: str = "pending"  # pending, approved, rejected, edit_requested
     admin_feedback: Optional[str] = None  # Feedback when requesting edits
     is_featured: bool = False  # Pinned to homepage
-    resonance_count: int = 0  # Number of "This resonated with me" clicks
-    resonated_by: List[str] = []  # User IDs who resonated (prevents duplicates)
+    resonance_count: int = 0  # Number of "This resonated with me" clicks (edges live in story_resonances)
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     published_at: Optional[datetime] = None  # Set when approved
 
@@ -789,6 +895,7 @@ async def upsert_user_from_oauth(user_info: Dict[str, Any]) -> User:
         )
         profile_dict = prepare_for_mongo(student_profile.dict())
         await db.student_network.insert_one(profile_dict)
+        await refresh_research_matches("student", user.id)
 
     return user
 
@@ -983,8 +1090,11 @@ async def delete_account(current_user: User = Depends(get_current_user)):
     try:
         # Delete all user's associated data
         await db.poster_submissions.delete_many({"submitted_by": current_user.id})
+        await refresh_catalog_snapshots(posters=True)
         await db.student_network.delete_many({"user_id": current_user.id})
         await db.professor_network.delete_many({"user_id": current_user.id})
+        await refresh_research_matches("student", current_user.id)
+        await refresh_research_matches("professor", current_user.id)
         await db.ec_profiles.delete_many({"submitted_by": current_user.id})
         await db.volunteer_opportunities.delete_many({"posted_by": current_user.id})
         
@@ -1061,26 +1171,53 @@ async def submit_poster(poster: PosterSubmissionCreate, current_user: User = Dep
     poster_data = poster.dict()
     poster_obj = PosterSubmission(**poster_data, submitted_by=current_user.id)
     poster_dict = prepare_for_mongo(poster_obj.dict())
+    poster_dict.update(await near_duplicates.check_submission(db, "poster_submissions", poster_dict))
     await db.poster_submissions.insert_one(poster_dict)
     return poster_obj
 
-@api_router.get("/posters", response_model=List[PosterSubmission])
-async def get_posters(status: Optional[str] = None, university: Optional[str] = None):
-    query = {
-        "status": "approved",
-        "payment_status": "completed"  # Only show paid posters to public
-    }
+async def list_poster_summaries(university: Optional[str] = None) -> List[PosterSummary]:
+    query = dict(PUBLIC_POSTER_QUERY)  # Only show paid posters to public
     if university:
         query["university"] = university
     
-    posters = await db.poster_submissions.find(query).to_list(100)
-    return [PosterSubmission(**parse_from_mongo(poster)) for poster in posters]
+    posters = await db.poster_submissions.find(query, POSTER_SUMMARY_PROJECTION).to_list(100)
+    return [PosterSummary(**summary_from_mongo(poster)) for poster in posters]
+
+async def refresh_catalog_snapshots(posters: bool = False, articles: bool = False):
+    """Rewrite the static catalog files after an event that can change them"""
+    try:
+        if posters:
+            await poster_catalog_snapshot.publish(jsonable_encoder(await list_poster_summaries()))
+        if articles:
+            await article_catalog_snapshot.publish(jsonable_encoder(await list_article_summaries()))
+    except Exception as e:
+        print(f"⚠️ Catalog snapshot refresh failed: {e}")
+
+@api_router.get("/posters", response_model=List[PosterSummary])
+async def get_posters(request: Request, status: Optional[str] = None, university: Optional[str] = None):
+    if not university:
+        snapshot = await poster_catalog_snapshot.response(request)
+        if snapshot is not None:
+            return snapshot
+        await refresh_catalog_snapshots(posters=True)
+    return await list_poster_summaries(university)
 
 @api_router.get("/posters/my", response_model=List[PosterSubmission])
 async def get_my_posters(current_user: User = Depends(get_current_user)):
     posters = await db.poster_submissions.find({"submitted_by": current_user.id}).to_list(100)
     return [PosterSubmission(**parse_from_mongo(poster)) for poster in posters]
 
+@api_router.get("/posters/{poster_id}", response_model=PosterSubmission)
+async def get_poster(poster_id: str):
+    """Full public poster (approved & paid); lists only carry PosterSummary"""
+    poster = await db.poster_submissions.find_one(
+        {"id": poster_id, "status": "approved", "payment_status": "completed"},
+        {"_id": 0, "payment_link": 0, "stripe_session_id": 0, "submitter_email": 0, **SUBMISSION_INDEX_FIELDS}
+    )
+    if not poster:
+        raise HTTPException(status_code=404, detail="Poster not found")
+    return PosterSubmission(**parse_from_mongo(poster))
+
 class PosterReviewRequest(BaseModel):
     status: str
     comments: Optional[str] = None
@@ -1115,24 +1252,25 @@ async def review_poster(poster_id: str, review_data: PosterReviewRequest, curren
             print(f"   💳 Student can now complete payment ($${POSTER_PUBLICATION_FEE})")
     
     await db.poster_submissions.update_one({"id": poster_id}, {"$set": update_data})
+    await refresh_catalog_snapshots(posters=True)
     updated_poster = await db.poster_submissions.find_one({"id": poster_id})
     return PosterSubmission(**parse_from_mongo(updated_poster))
 
-@api_router.get("/admin/posters/pending", response_model=List[PosterSubmission])
+@api_router.get("/admin/posters/pending", response_model=List[AdminPosterSubmission])
 async def get_pending_posters(current_user: User = Depends(get_current_user)):
     if current_user.user_type != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
     
-    posters = await db.poster_submissions.find({"status": "pending"}).to_list(100)
-    return [PosterSubmission(**parse_from_mongo(poster)) for poster in posters]
+    posters = await db.poster_submissions.find({"status": "pending"}, SUBMISSION_INDEX_FIELDS).to_list(100)
+    return [AdminPosterSubmission(**parse_from_mongo(poster)) for poster in posters]
 
-@api_router.get("/admin/posters/all", response_model=List[PosterSubmission])
+@api_router.get("/admin/posters/all", response_model=List[AdminPosterSubmission])
 async def get_all_posters_admin(current_user: User = Depends(get_current_user)):
     if current_user.user_type != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
     
-    posters = await db.poster_submissions.find({}).to_list(100)
-    return [PosterSubmission(**parse_from_mongo(poster)) for poster in posters]
+    posters = await db.poster_submissions.find({}, SUBMISSION_INDEX_FIELDS).to_list(100)
+    return [AdminPosterSubmission(**parse_from_mongo(poster)) for poster in posters]
 
 @api_router.put("/admin/posters/{poster_id}/payment")
 async def mark_payment_completed(poster_id: str, current_user: User = Depends(get_current_user)):
@@ -1148,6 +1286,7 @@ async def mark_payment_completed(poster_id: str, current_user: User = Depends(ge
     result = await db.poster_submissions.update_one({"id": poster_id}, {"$set": update_data})
     if result.modified_count == 0:
         raise HTTPException(status_code=404, detail="Poster not found")
+    await refresh_catalog_snapshots(posters=True)
     
     updated_poster = await db.poster_submissions.find_one({"id": poster_id})
     return PosterSubmission(**parse_from_mongo(updated_poster))
@@ -1183,7 +1322,7 @@ async def create_checkout_session(request_data: CreateCheckoutRequest, current_u
     
     # Initialize Stripe checkout
     webhook_url = f"{request_data.origin_url}/api/webhook/stripe"
-    stripe_checkout = StripeCheckout(api_key=STRIPE_API_KEY, webhook_url=webhook_url)
+    stripe_checkout = payments.checkout(webhook_url)
     
     # Create success and cancel URLs
     success_url = f"{request_data.origin_url}/profile?session_id={{CHECKOUT_SESSION_ID}}"
@@ -1232,9 +1371,48 @@ async def create_checkout_session(request_data: CreateCheckoutRequest, current_u
     
     return {"url": session.url, "session_id": session.session_id}
 
+# Polls for one checkout share a single Stripe call per few seconds per worker
+payment_status_cache = SingleFlightCache(ttl_seconds=PAYMENT_STATUS_TTL_SECONDS)
+
+async def complete_payment(transaction: Dict[str, Any], source: str = "Status check") -> bool:
+    """Mark a checkout and its poster/article paid; idempotent, so the status
+    poll and the webhook worker can both call it. True if the item changed."""
+    completed_at = datetime.now(timezone.utc).isoformat()
+    await db.payment_transactions.update_one(
+        {"session_id": transaction["session_id"], "payment_status": {"$ne": "completed"}},
+        {"$set": {
+            "payment_status": "completed",
+            "checkout_status": "complete",
+            "completed_at": completed_at
+        }}
+    )
+    
+    # Determine if this is a poster or article payment based on metadata
+    item_type = transaction.get("metadata", {}).get("type", "poster")
+    item_id = transaction.get("poster_id")  # Field is named poster_id for both
+    collection = db.journal_articles if item_type == "journal_article" else db.poster_submissions
+    
+    result = await collection.update_one(
+        {"id": item_id, "payment_status": {"$ne": "completed"}},
+        {"$set": {
+            "payment_status": "completed",
+            "payment_completed_at": completed_at
+        }}
+    )
+    if not result.modified_count:
+        return False
+    print(f"✅ {source}: Payment completed for {'article' if item_type == 'journal_article' else 'poster'} {item_id}")
+    await refresh_catalog_snapshots(
+        posters=item_type != "journal_article", articles=item_type == "journal_article"
+    )
+    return True
+
 @api_router.get("/payments/status/{session_id}")
 async def get_payment_status(session_id: str, current_user: User = Depends(get_current_user)):
-    """Check the status of a payment by session ID"""
+    """Check the status of a payment by session ID.
+    
+    Answers from stored state once the webhook or an earlier poll has completed
+    the payment; otherwise asks Stripe through a short single-flight cache."""
     if not STRIPE_API_KEY:
         raise HTTPException(status_code=500, detail="Stripe not configured")
     
@@ -1247,69 +1425,11 @@ async def get_payment_status(session_id: str, current_user: User = Depends(get_c
     if transaction["user_id"] != current_user.id and current_user.user_type != "admin":
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    # If already completed, return cached status
-    if transaction["payment_status"] == "completed":
-        return {
-            "status": transaction["checkout_status"],
-            "payment_status": transaction["payment_status"],
-            "amount": transaction["amount"],
-            "currency": transaction["currency"]
-        }
-    
-    # Check with Stripe for latest status
-    webhook_url = "https://placeholder.com/webhook"  # Not used for status checks
-    stripe_checkout = StripeCheckout(api_key=STRIPE_API_KEY, webhook_url=webhook_url)
-    
-    checkout_status: CheckoutStatusResponse = await stripe_checkout.get_checkout_status(session_id)
-    
-    # Update transaction status
-    update_data = {
-        "checkout_status": checkout_status.status,
-        "payment_status": "completed" if checkout_status.payment_status == "paid" else transaction["payment_status"]
-    }
-    
-    # If payment is completed, update poster/article and transaction
-    if checkout_status.payment_status == "paid" and transaction["payment_status"] != "completed":
-        update_data["payment_status"] = "completed"
-        update_data["completed_at"] = datetime.now(timezone.utc).isoformat()
-        
-        # Determine if this is a poster or article payment based on metadata
-        item_type = transaction.get("metadata", {}).get("type", "poster")
-        item_id = transaction.get("poster_id")  # Field is named poster_id for both
-        
-        if item_type == "journal_article":
-            # Update article payment status
-            await db.journal_articles.update_one(
-                {"id": item_id},
-                {"$set": {
-                    "payment_status": "completed",
-                    "payment_completed_at": datetime.now(timezone.utc).isoformat()
-                }}
-            )
-            print(f"✅ Payment completed for article {item_id}")
-        else:
-            # Update poster payment status
-            await db.poster_submissions.update_one(
-                {"id": item_id},
-                {"$set": {
-                    "payment_status": "completed",
-                    "payment_completed_at": datetime.now(timezone.utc).isoformat()
-                }}
-            )
-            print(f"✅ Payment completed for poster {item_id}")
-    
-    await db.payment_transactions.update_one(
-        {"session_id": session_id},
-        {"$set": update_data}
+    stripe_checkout = payments.checkout("https://placeholder.com/webhook")  # URL not used for status checks
+    return await payment_status.check(
+        db, transaction, lambda: stripe_checkout.get_checkout_status(session_id),
+        complete_payment, payment_status_cache
     )
-    
-    return {
-        "status": checkout_status.status,
-        "payment_status": checkout_status.payment_status,
-        "amount": checkout_status.amount_total / 100,  # Convert from cents
-        "currency": checkout_status.currency
-    }
-
 
 
 # ==================== CURE JOURNAL ARTICLE ENDPOINTS ====================
@@ -1318,23 +1438,35 @@ async def get_payment_status(session_id: str, current_user: User = Depends(get_c
 async def submit_article(article: JournalArticleCreate, current_user: User = Depends(get_current_user)):
     """Submit a new journal article"""
     article_data = article.dict()
-    article_obj = JournalArticle(**article_data, submitted_by=current_user.id)
+    article_obj = JournalArticle(
+        **article_data,
+        **journal_search.search_fields(article_data),
+        submitted_by=current_user.id
+    )
     article_dict = prepare_for_mongo(article_obj.dict())
+    article_dict.update(await near_duplicates.check_submission(db, "journal_articles", article_dict))
     await db.journal_articles.insert_one(article_dict)
     return article_obj
 
-@api_router.get("/journal/articles", response_model=List[JournalArticle])
-async def get_articles(status: Optional[str] = None, university: Optional[str] = None):
-    """Get published articles (public can only see published & paid articles)"""
-    query = {
-        "status": "published",
-        "payment_status": "completed"  # Only show paid articles to public
-    }
+async def list_article_summaries(university: Optional[str] = None) -> List[ArticleSummary]:
+    query = dict(PUBLIC_ARTICLE_QUERY)  # Only show paid articles to public
     if university:
         query["university"] = university
     
-    articles = await db.journal_articles.find(query).to_list(100)
-    return [JournalArticle(**parse_from_mongo(article)) for article in articles]
+    articles = await db.journal_articles.find(query, ARTICLE_SUMMARY_PROJECTION).to_list(100)
+    return [ArticleSummary(**summary_from_mongo(article)) for article in articles]
+
+@api_router.get("/journal/articles", response_model=List[ArticleSummary])
+async def get_articles(request: Request, status: Optional[str] = None, university: Optional[str] = None):
+    """Get published articles (public can only see published & paid articles).
+    
+    The unfiltered list is served from its static snapshot."""
+    if not university:
+        snapshot = await article_catalog_snapshot.response(request)
+        if snapshot is not None:
+            return snapshot
+        await refresh_catalog_snapshots(articles=True)
+    return await list_article_summaries(university)
 
 @api_router.get("/journal/articles/my", response_model=List[JournalArticle])
 async def get_my_articles(current_user: User = Depends(get_current_user)):
@@ -1342,10 +1474,35 @@ async def get_my_articles(current_user: User = Depends(get_current_user)):
     articles = await db.journal_articles.find({"submitted_by": current_user.id}).to_list(100)
     return [JournalArticle(**parse_from_mongo(article)) for article in articles]
 
+@api_router.get("/journal/articles/search")
+async def search_articles(
+    q: str,
+    university: Optional[str] = None,
+    article_type: Optional[str] = None,
+    year: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = 20
+):
+    """Relevance-ranked search over published articles, faceted by university,
+    type and year. Declared before /journal/articles/{article_id}."""
+    q = q.strip()
+    if not q:
+        raise HTTPException(status_code=400, detail="Search query is required")
+    if limit < 1 or limit > 50:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 50")
+    filters = {"university": university, "article_type": article_type, "publication_year": year}
+    try:
+        return await journal_search.search(db, q, filters, cursor, limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
 @api_router.get("/journal/articles/{article_id}", response_model=JournalArticle)
 async def get_article(article_id: str):
     """Get a specific article by ID"""
-    article = await db.journal_articles.find_one({"id": article_id, "status": "published", "payment_status": "completed"})
+    article = await db.journal_articles.find_one(
+        {"id": article_id, "status": "published", "payment_status": "completed"},
+        SUBMISSION_INDEX_FIELDS
+    )
     if not article:
         raise HTTPException(status_code=404, detail="Article not found")
     return JournalArticle(**parse_from_mongo(article))
@@ -1357,20 +1514,43 @@ async def get_article_by_identifier(identifier: str):
         "cure_identifier": identifier,
         "status": "published",
         "payment_status": "completed"
-    })
+    }, SUBMISSION_INDEX_FIELDS)
     if not article:
         raise HTTPException(status_code=404, detail="Article not found")
     return JournalArticle(**parse_from_mongo(article))
 
+@api_router.get("/journal/articles/{article_id}/pdf")
+async def get_article_pdf(article_id: str, request: Request, download: bool = False):
+    """Stream a published, paid article's PDF from GridFS (Range, ETag and cache aware)"""
+    article = await db.journal_articles.find_one(
+        {"id": article_id, "status": "published", "payment_status": "completed"},
+        {"_id": 0, "title": 1, "cure_identifier": 1, "pdf_url": 1}
+    )
+    if not article:
+        raise HTTPException(status_code=404, detail="Article not found")
+    
+    # pdf_url holds the GridFS file id returned by /journal/articles/upload
+    file_identifier = article.get("pdf_url")
+    if not file_identifier:
+        raise HTTPException(status_code=404, detail="No PDF attached to this article")
+    
+    filename = f"{article.get('cure_identifier') or article.get('title', 'article')}.pdf"
+    return await stream_gridfs_file(
+        fs, file_identifier, request, filename,
+        attachment=download,
+        media_type="application/pdf",
+        cache_control="public, max-age=604800"
+    )
+
 # Admin endpoints for journal article review
-@api_router.get("/admin/journal/articles", response_model=List[JournalArticle])
+@api_router.get("/admin/journal/articles", response_model=List[AdminJournalArticle])
 async def get_all_articles_admin(current_user: User = Depends(get_current_user)):
-    """Get all articles for admin review"""
+    """Get all articles for admin review, with near-duplicate flags"""
     if current_user.user_type not in ["admin", "professor"]:
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    articles = await db.journal_articles.find({}).to_list(200)
-    return [JournalArticle(**parse_from_mongo(article)) for article in articles]
+    articles = await db.journal_articles.find({}, SUBMISSION_INDEX_FIELDS).to_list(200)
+    return [AdminJournalArticle(**parse_from_mongo(article)) for article in articles]
 
 @api_router.put("/admin/journal/articles/{article_id}/review")
 async def review_article(article_id: str, review_data: JournalArticleReviewRequest, current_user: User = Depends(get_current_user)):
@@ -1396,16 +1576,11 @@ async def review_article(article_id: str, review_data: JournalArticleReviewReque
         
         # Generate unique NSR identifier if not already assigned
         if not article.get("cure_identifier"):
-            # Get count of published articles to determine next number
-            published_count = await db.journal_articles.count_documents({
-                "status": "published",
-                "cure_identifier": {"$exists": True, "$ne": None}
-            })
-            year = datetime.now(timezone.utc).year
-            next_number = published_count + 1
-            nsr_id = f"NSR.{year}.{next_number:03d}"
+            # Per-year atomic sequence; numbers are never reused
+            nsr_id = await sequences.next_nsr_identifier(db, datetime.now(timezone.utc).year)
             update_data["cure_identifier"] = nsr_id
             print(f"   🔖 Assigned identifier: {nsr_id}")
+        update_data["publication_year"] = journal_search.publication_year({**article, **update_data})
         
         # Get user details for email
         user = await db.users.find_one({"id": article["submitted_by"]})
@@ -1430,6 +1605,7 @@ async def review_article(article_id: str, review_data: JournalArticleReviewReque
                 print(f"   ❌ Email error: {e}")
     
     await db.journal_articles.update_one({"id": article_id}, {"$set": update_data})
+    await refresh_catalog_snapshots(articles=True)
     return {"message": f"Article {review_data.status}", "article_id": article_id}
 
 @api_router.post("/admin/journal/articles/{article_id}/payment-completed")
@@ -1446,6 +1622,7 @@ async def mark_article_payment_completed(article_id: str, current_user: User = D
     result = await db.journal_articles.update_one({"id": article_id}, {"$set": update_data})
     if result.modified_count == 0:
         raise HTTPException(status_code=404, detail="Article not found")
+    await refresh_catalog_snapshots(articles=True)
     
     return {"message": "Payment marked as completed", "article_id": article_id}
 
@@ -1458,6 +1635,7 @@ async def delete_article(article_id: str, current_user: User = Depends(get_curre
     result = await db.journal_articles.delete_one({"id": article_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Article not found")
+    await refresh_catalog_snapshots(articles=True)
     
     return {"message": "Article deleted successfully", "article_id": article_id}
 
@@ -1495,7 +1673,7 @@ async def create_article_checkout(article_id: str, current_user: User = Depends(
     # Initialize Stripe checkout
     origin_url = os.getenv('FRONTEND_URL', 'http://localhost:3000')
     webhook_url = f"{os.getenv('REACT_APP_BACKEND_URL', 'http://localhost:8001')}/api/webhook/stripe"
-    stripe_checkout = StripeCheckout(api_key=STRIPE_API_KEY, webhook_url=webhook_url)
+    stripe_checkout = payments.checkout(webhook_url)
     
     # Create success and cancel URLs
     success_url = f"{origin_url}/profile?session_id={{CHECKOUT_SESSION_ID}}"
@@ -1567,9 +1745,24 @@ async def get_article_payment_status(article_id: str, current_user: User = Depen
         "currency": "CAD"
     }
 
+async def handle_stripe_event(event: Dict[str, Any]):
+    """Apply one stored Stripe event (webhook inbox worker); safe to run again"""
+    if not webhook_inbox.is_paid_checkout(event):
+        return
+    session_id = event["payload"].get("session_id")
+    
+    # Get transaction
+    transaction = await db.payment_transactions.find_one({"session_id": session_id})
+    if not transaction:
+        return
+    
+    await complete_payment(transaction, source="Webhook")
+
 @api_router.post("/webhook/stripe")
 async def stripe_webhook(request: Request):
-    """Handle Stripe webhook events"""
+    """Verify a Stripe webhook, store it in the inbox and acknowledge at once.
+    
+    The webhook_inbox worker applies it; redeliveries of a stored event id are ignored."""
     if not STRIPE_API_KEY:
         raise HTTPException(status_code=500, detail="Stripe not configured")
     
@@ -1581,59 +1774,21 @@ async def stripe_webhook(request: Request):
         raise HTTPException(status_code=400, detail="No signature provided")
     
     try:
-        # Initialize Stripe checkout
-        webhook_url = "https://placeholder.com/webhook"  # Not used in handler
-        stripe_checkout = StripeCheckout(api_key=STRIPE_API_KEY, webhook_url=webhook_url)
+        # Shared Stripe checkout (webhook URL not used in handler)
+        stripe_checkout = payments.checkout("https://placeholder.com/webhook")
         
-        # Handle webhook
+        # Verify signature and parse
         webhook_response = await stripe_checkout.handle_webhook(body, signature)
-        
-        # Process based on event type
-        if webhook_response.event_type == "checkout.session.completed":
-            session_id = webhook_response.session_id
-            
-            # Get transaction
-            transaction = await db.payment_transactions.find_one({"session_id": session_id})
-            if transaction:
-                # Update transaction
-                await db.payment_transactions.update_one(
-                    {"session_id": session_id},
-                    {"$set": {
-                        "payment_status": "completed",
-                        "completed_at": datetime.now(timezone.utc).isoformat()
-                    }}
-                )
-                
-                # Determine if this is a poster or article payment based on metadata
-                item_type = transaction.get("metadata", {}).get("type", "poster")
-                item_id = transaction.get("poster_id")  # Field is named poster_id for both
-                
-                if item_type == "journal_article":
-                    # Update article payment status
-                    await db.journal_articles.update_one(
-                        {"id": item_id},
-                        {"$set": {
-                            "payment_status": "completed",
-                            "payment_completed_at": datetime.now(timezone.utc).isoformat()
-                        }}
-                    )
-                    print(f"🎉 Webhook: Payment completed for article {item_id}")
-                else:
-                    # Update poster payment status
-                    await db.poster_submissions.update_one(
-                        {"id": item_id},
-                        {"$set": {
-                            "payment_status": "completed",
-                            "payment_completed_at": datetime.now(timezone.utc).isoformat()
-                        }}
-                    )
-                    print(f"🎉 Webhook: Payment completed for poster {item_id}")
-        
-        return {"status": "success"}
-    
     except Exception as e:
         print(f"❌ Webhook error: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
+    
+    stored = await webhook_inbox.record(db, webhook_response.event_id, "stripe", webhook_response.event_type, {
+        "session_id": webhook_response.session_id,
+        "payment_status": webhook_response.payment_status,
+        "metadata": webhook_response.metadata or {},
+    })
+    return {"status": "success", "duplicate": not stored}
 
 @api_router.get("/admin/stats")
 async def get_admin_stats(current_user: User = Depends(get_current_user)):
@@ -1852,6 +2007,7 @@ async def delete_poster(poster_id: str, current_user: User = Depends(get_current
     
     # Delete from database
     await db.poster_submissions.delete_one({"id": poster_id})
+    await refresh_catalog_snapshots(posters=True)
     
     return {"message": "Poster deleted successfully"}
 
@@ -1907,6 +2063,7 @@ async def admin_create_professor(profile: AdminProfessorNetworkProfile, current_
     )
     profile_dict = prepare_for_mongo(profile_obj.dict())
     await db.professor_network.insert_one(profile_dict)
+    await refresh_research_matches("professor", professor_user_id)
     return profile_obj
 
 @api_router.put("/admin/professor-network/{profile_id}", response_model=ProfessorNetwork)
@@ -1960,6 +2117,9 @@ async def admin_update_professor(profile_id: str, profile: AdminProfessorNetwork
     update_payload["user_id"] = professor_user_id
 
     await db.professor_network.update_one({"id": profile_id}, {"$set": update_payload})
+    if existing_profile.get("user_id") and existing_profile["user_id"] != professor_user_id:
+        await refresh_research_matches("professor", existing_profile["user_id"])
+    await refresh_research_matches("professor", professor_user_id)
 
     updated_profile = await db.professor_network.find_one({"id": profile_id})
     return ProfessorNetwork(**parse_from_mongo(updated_profile))
@@ -1970,10 +2130,14 @@ async def admin_delete_professor(profile_id: str, current_user: User = Depends(g
     if current_user.user_type != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
     
+    profile = await db.professor_network.find_one({"id": profile_id}, {"_id": 0, "user_id": 1})
     result = await db.professor_network.delete_one({"id": profile_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Professor profile not found")
     
+    if profile and profile.get("user_id"):
+        await refresh_research_matches("professor", profile["user_id"])
+    
     return {"message": "Professor profile deleted successfully"}
 
 @api_router.post("/admin/volunteer-opportunities", response_model=VolunteerOpportunity)
@@ -2077,7 +2241,7 @@ async def admin_get_all_posters(current_user: User = Depends(get_current_user)):
     if current_user.user_type != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
     
-    posters = await db.poster_submissions.find({}).to_list(100)
+    posters = await db.poster_submissions.find({}, SUBMISSION_INDEX_FIELDS).to_list(100)
     result = []
     for poster in posters:
         result.append({
@@ -2095,7 +2259,8 @@ async def admin_get_all_posters(current_user: User = Depends(get_current_user)):
             "payment_status": poster.get("payment_status", "not_required"),
             "payment_link": poster.get("payment_link"),
             "payment_completed_at": poster.get("payment_completed_at"),
-            "stripe_session_id": poster.get("stripe_session_id")
+            "stripe_session_id": poster.get("stripe_session_id"),
+            "duplicate_candidates": poster.get("duplicate_candidates", [])
         })
     return result
 
@@ -2419,6 +2584,7 @@ async def create_student_network_profile(profile: StudentNetworkCreate, current_
     profile_obj = StudentNetwork(**profile_data, user_id=current_user.id)
     profile_dict = prepare_for_mongo(profile_obj.dict())
     await db.student_network.insert_one(profile_dict)
+    await refresh_research_matches("student", current_user.id)
     return profile_obj
 
 @api_router.get("/student-network", response_model=List[Dict[str, Any]])
@@ -2499,6 +2665,7 @@ async def update_my_student_network_profile(profile_update: StudentNetworkCreate
     
     update_data = prepare_for_mongo(profile_update.dict())
     await db.student_network.update_one({"user_id": current_user.id}, {"$set": update_data})
+    await refresh_research_matches("student", current_user.id)
     updated_profile = await db.student_network.find_one({"user_id": current_user.id})
     return StudentNetwork(**parse_from_mongo(updated_profile))
 
@@ -2512,6 +2679,7 @@ async def create_professor_network_profile(profile: ProfessorNetworkCreate, curr
     profile_obj = ProfessorNetwork(**profile_data, user_id=current_user.id, contact_email=current_user.email)
     profile_dict = prepare_for_mongo(profile_obj.dict())
     await db.professor_network.insert_one(profile_dict)
+    await refresh_research_matches("professor", current_user.id)
     return profile_obj
 
 @api_router.get("/professor-network", response_model=List[Dict[str, Any]])
@@ -2537,6 +2705,30 @@ async def get_professor_network(research_area: Optional[str] = None, accepting_s
     
     return result
 
+# Research Matching Routes
+async def refresh_research_matches(role: str, user_id: str):
+    """Queue a changed network profile; the matching job patches the precomputed lists"""
+    try:
+        await research_matching.mark_dirty(db, role, user_id)
+    except Exception as e:
+        print(f"⚠️  Research match update not queued for {user_id}: {e}")
+
+@api_router.get("/network/matches")
+async def get_research_matches(role: Optional[str] = None, limit: int = 10, current_user: User = Depends(get_current_user)):
+    """Top professor matches for a student (or student matches for a professor), precomputed"""
+    if role is not None and role not in ["student", "professor"]:
+        raise HTTPException(status_code=400, detail="role must be 'student' or 'professor'")
+    
+    doc = await research_matching.get_matches(db, current_user.id, role)
+    if not doc:
+        return {"role": role, "matches": [], "updated_at": None}
+    
+    return {
+        "role": doc["role"],
+        "matches": doc["matches"][:max(1, min(limit, research_matching.TOP_K))],
+        "updated_at": doc.get("updated_at")
+    }
+
 # Basic Routes
 @api_router.get("/")
 async def root():
@@ -2570,6 +2762,7 @@ async def create_post(post_data: PostCreate, current_user: User = Depends(get_cu
     )
     
     await db.posts.insert_one(prepare_for_mongo(post.dict()))
+    await trending.record_tags(db, post.tags, post.created_at, 1)
     
     # Create notifications for mentions
     mentions = extract_mentions(post_data.text)
@@ -2585,33 +2778,16 @@ async def get_post(post_id: str, request: Request):
     """Get a single post by ID"""
     current_user = await get_current_user_optional(request)
     
-    post = await db.posts.find_one({"id": post_id})
+    post = await db.posts.find_one({"id": post_id}, {"_id": 0})
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
     
-    author = await db.users.find_one({"id": post["author_id"]})
-    
-    # Check if current user liked/following
-    is_liked = False
-    is_following = False
-    if current_user:
-        like = await db.likes.find_one({"post_id": post_id, "user_id": current_user.id})
-        is_liked = like is not None
-        follow = await db.follows.find_one({"follower_id": current_user.id, "followed_id": post["author_id"]})
-        is_following = follow is not None
+    post_response = await PostHydrator(db).annotate(post, current_user.id if current_user else None)
     
     # Increment view count
     await db.posts.update_one({"id": post_id}, {"$inc": {"metrics.views": 1}})
     
-    return {
-        **parse_from_mongo(post),
-        "author_name": author.get("name") if author else "Unknown",
-        "author_role": author.get("role") if author else "student",
-        "author_picture": author.get("profile_picture") if author else None,
-        "author_university": author.get("university") if author else None,
-        "is_liked": is_liked,
-        "is_following_author": is_following
-    }
+    return parse_from_mongo(post_response)
 
 @api_router.delete("/social/posts/{post_id}")
 async def delete_post(post_id: str, current_user: User = Depends(get_current_user)):
@@ -2626,20 +2802,24 @@ async def delete_post(post_id: str, current_user: User = Depends(get_current_use
     await db.posts.delete_one({"id": post_id})
     await db.comments.delete_many({"post_id": post_id})
     await db.likes.delete_many({"post_id": post_id})
+    await trending.record_tags(db, post.get("tags", []), post.get("created_at"), -1)
     
     return {"message": "Post deleted successfully"}
 
+# TRENDING ENDPOINT
+@api_router.get("/social/trending")
+async def get_trending_tags(window_hours: int = trending.DEFAULT_WINDOW_HOURS, limit: int = 10):
+    """Get the most used hashtags over a sliding window (served from hourly buckets)"""
+    if limit < 1 or limit > 50:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 50")
+    tags = await trending.get_trending(db, window_hours=window_hours, limit=limit)
+    return {"window_hours": min(max(window_hours, 1), trending.MAX_WINDOW_HOURS), "tags": tags}
+
 # FEED ENDPOINTS
-@api_router.get("/social/feed")
-async def get_feed(
-    request: Request,
-    mode: str = "global",
-    circle_id: Optional[str] = None,
-    cursor: Optional[str] = None,
-    limit: int = 20
-):
-    """Get feed based on mode: following, global, university, circle"""
-    current_user = await get_current_user_optional(request)
+FEED_SINCE_MAX_IDS = 100
+
+async def build_feed_query(mode: str, circle_id: Optional[str], current_user: Optional[User]) -> Optional[dict]:
+    """Base posts query for a feed mode; None means the feed is empty by definition"""
     query = {"visibility": "public"}
     
     if mode == "following":
@@ -2648,7 +2828,7 @@ async def get_feed(
         follows = await db.follows.find({"follower_id": current_user.id}).to_list(length=1000)
         followed_ids = [f["followed_id"] for f in follows]
         if not followed_ids:
-            return {"posts": [], "cursor": None, "has_more": False}
+            return None
         query["author_id"] = {"$in": followed_ids}
     
     elif mode == "university":
@@ -2668,6 +2848,22 @@ async def get_feed(
             raise HTTPException(status_code=404, detail="Circle not found")
         query["tags"] = {"$in": [circle["slug"], circle["name"].lower()]}
     
+    return query
+
+@api_router.get("/social/feed")
+async def get_feed(
+    request: Request,
+    mode: str = "global",
+    circle_id: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = 20
+):
+    """Get feed based on mode: following, global, university, circle"""
+    current_user = await get_current_user_optional(request)
+    query = await build_feed_query(mode, circle_id, current_user)
+    if query is None:
+        return {"posts": [], "cursor": None, "has_more": False}
+    
     if cursor:
         query["created_at"] = {"$lt": cursor}
     
@@ -2678,33 +2874,44 @@ async def get_feed(
     if has_more:
         posts = posts[:limit]
     
-    # Enrich with author details
-    enriched_posts = []
-    for post in posts:
-        author = await db.users.find_one({"id": post["author_id"]})
-        if author:
-            is_liked = False
-            is_following = False
-            if current_user:
-                like = await db.likes.find_one({"post_id": post["id"], "user_id": current_user.id})
-                is_liked = like is not None
-                follow = await db.follows.find_one({"follower_id": current_user.id, "followed_id": post["author_id"]})
-                is_following = follow is not None
-            
-            enriched_posts.append({
-                **parse_from_mongo(post),
-                "author_name": author.get("name"),
-                "author_role": author.get("role", "student"),
-                "author_picture": author.get("profile_picture"),
-                "author_university": author.get("university"),
-                "is_liked": is_liked,
-                "is_following_author": is_following
-            })
+    # Enrich with author details and viewer state in batched queries
+    enriched_posts = await PostHydrator(db).hydrate(posts, current_user.id if current_user else None)
     
-    next_cursor = posts[-1]["created_at"].isoformat() if posts and has_more else None
+    next_cursor = parse_from_mongo(posts[-1])["created_at"].isoformat() if posts and has_more else None
     
     return {"posts": enriched_posts, "cursor": next_cursor, "has_more": has_more}
 
+@api_router.get("/social/feed/since")
+async def get_feed_since(
+    request: Request,
+    cursor: str,
+    mode: str = "global",
+    circle_id: Optional[str] = None
+):
+    """Count and ids of posts newer than the client's head cursor (the created_at
+    of the newest post it has). Answered from the feed index without hydration;
+    204 when nothing is new."""
+    current_user = await get_current_user_optional(request)
+    query = await build_feed_query(mode, circle_id, current_user)
+    if query is None:
+        return Response(status_code=204)
+    
+    query["created_at"] = {"$gt": cursor}
+    newer = await db.posts.find(
+        query, {"_id": 0, "id": 1, "created_at": 1}
+    ).sort("created_at", -1).limit(FEED_SINCE_MAX_IDS + 1).to_list(length=FEED_SINCE_MAX_IDS + 1)
+    if not newer:
+        return Response(status_code=204)
+    
+    has_more = len(newer) > FEED_SINCE_MAX_IDS
+    newer = newer[:FEED_SINCE_MAX_IDS]
+    return {
+        "count": len(newer),
+        "has_more": has_more,
+        "ids": [p["id"] for p in newer],
+        "head": newer[0]["created_at"]
+    }
+
 # ENGAGEMENT ENDPOINTS
 @api_router.post("/social/posts/{post_id}/like")
 async def like_post(post_id: str, current_user: User = Depends(get_current_user)):
@@ -2807,6 +3014,7 @@ async def follow_user(user_id: str, current_user: User = Depends(get_current_use
     
     follow = Follow(follower_id=current_user.id, followed_id=user_id)
     await db.follows.insert_one(prepare_for_mongo(follow.dict()))
+    await follow_graph.discard_suggestion(db, current_user.id, user_id)
     await create_notification(user_id, "follow", current_user.id)
     
     return {"message": "User followed successfully"}
@@ -2835,6 +3043,36 @@ async def get_following(user_id: str, limit: int = 50):
     users = await db.users.find({"id": {"$in": followed_ids}}).to_list(length=len(followed_ids))
     return [{"id": u["id"], "name": u.get("name"), "profile_picture": u.get("profile_picture"), "role": u.get("role")} for u in users]
 
+@api_router.get("/social/suggestions")
+async def get_follow_suggestions(limit: int = 10, current_user: User = Depends(get_current_user)):
+    """People you may know, served from the precomputed follow-graph snapshot"""
+    suggestions = (await follow_graph.get_suggestions(db, current_user.id))[:max(1, min(limit, follow_graph.TOP_N))]
+    if not suggestions:
+        return []
+    
+    user_ids = [s["user_id"] for s in suggestions]
+    users = await db.users.find(
+        {"id": {"$in": user_ids}},
+        {"_id": 0, "id": 1, "name": 1, "profile_picture": 1, "role": 1, "university": 1}
+    ).to_list(length=len(user_ids))
+    users_by_id = {u["id"]: u for u in users}
+    
+    result = []
+    for suggestion in suggestions:
+        user = users_by_id.get(suggestion["user_id"])
+        if user:
+            result.append({
+                "id": user["id"],
+                "name": user.get("name"),
+                "profile_picture": user.get("profile_picture"),
+                "role": user.get("role"),
+                "university": user.get("university"),
+                "mutual_follows": suggestion["mutual_follows"],
+                "shared_circles": suggestion["shared_circles"],
+                "shared_university": suggestion["shared_university"]
+            })
+    return result
+
 # CIRCLE ENDPOINTS
 @api_router.get("/social/circles")
 async def get_circles():
@@ -3018,6 +3256,7 @@ async def update_social_profile(
                     website=None
                 )
                 await db.professor_network.insert_one(prepare_for_mongo(professor_profile.dict()))
+                await refresh_research_matches("professor", current_user.id)
                 print(f"✅ Auto-created professor network profile for {current_user.email}")
     
     if update_data:
@@ -3040,95 +3279,222 @@ def slugify(text: str) -> str:
 
 # --- Public Story Endpoints ---
 
+# Stories written before resonances moved to their own collection may still
+# carry the legacy resonated_by array until migrate_stories.py has run; the
+# resonance endpoints treat a user listed there as having resonated.
+# Public lists ship the excerpt fields computed at approval instead of the body,
+# the story page ships the sanitized body_html (rendered on first read for
+# stories approved before that), and authors/admins the raw body.
+STORY_LIST_PROJECTION = {"_id": 0, "author_email": 0, "resonated_by": 0, "body": 0, "body_html": 0}
+STORY_PUBLIC_PROJECTION = {"_id": 0, "author_email": 0, "resonated_by": 0, "body": 0}
+STORY_PRIVATE_PROJECTION = {"_id": 0, "resonated_by": 0, "body_html": 0}
+
+# sort name -> (field, direction); ties are broken by id in the same direction
+STORY_SORTS = {
+    "newest": ("published_at", -1),
+    "oldest": ("published_at", 1),
+    "most_resonated": ("resonance_count", -1),
+}
+
+def encode_story_cursor(value: Any, story_id: str) -> str:
+    return base64.urlsafe_b64encode(json.dumps([value, story_id]).encode()).decode()
+
+def decode_story_cursor(cursor: str):
+    try:
+        value, story_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return value, story_id
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
 @api_router.get("/stories")
 async def get_stories(
-    page: int = 1,
+    cursor: Optional[str] = None,
     limit: int = 12,
     tag: Optional[str] = None,
     sort: str = "newest"  # newest, oldest, most_resonated
 ):
-    """Get approved stories (public, paginated, filterable)"""
+    """Get approved stories (public, keyset-paginated, filterable).
+    
+    Pass the returned next_cursor to get the following page."""
+    if limit < 1 or limit > 50:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 50")
     query = {"status": "approved"}
     
     # Filter by tag if provided
     if tag:
         query["tags"] = tag
     
-    # Sorting
-    sort_order = -1 if sort == "newest" else 1
-    sort_field = "published_at"
-    if sort == "most_resonated":
-        sort_field = "resonance_count"
-        sort_order = -1
-    
-    skip = (page - 1) * limit
+    sort_field, sort_order = STORY_SORTS.get(sort, STORY_SORTS["newest"])
+    if cursor:
+        last_value, last_id = decode_story_cursor(cursor)
+        op = "$lt" if sort_order == -1 else "$gt"
+        query["$or"] = [
+            {sort_field: {op: last_value}},
+            {sort_field: last_value, "id": {op: last_id}}
+        ]
+    
+    docs = await db.stories.find(query, STORY_LIST_PROJECTION).sort(
+        [(sort_field, sort_order), ("id", sort_order)]
+    ).limit(limit + 1).to_list(length=limit + 1)
+    has_more = len(docs) > limit
+    docs = docs[:limit]
+    next_cursor = encode_story_cursor(docs[-1].get(sort_field), docs[-1]["id"]) if has_more else None
     
-    cursor = db.stories.find(query).sort(sort_field, sort_order).skip(skip).limit(limit)
     stories = []
-    async for story in cursor:
+    for story in docs:
         story = parse_from_mongo(story)
         # Hide author info for anonymous stories in public view
         if story.get("is_anonymous", True):
             story["author_name"] = "Anonymous"
-            story.pop("author_email", None)
-        else:
-            story.pop("author_email", None)  # Never expose email publicly
         stories.append(story)
     
-    # Get total count
-    total = await db.stories.count_documents(query)
+    # Totals are maintained counters, not a count over the collection
+    total = await story_counters.get_count(db, "approved", tag)
     
     return {
         "stories": stories,
         "total": total,
-        "page": page,
         "limit": limit,
-        "has_more": (page * limit) < total
+        "has_more": has_more,
+        "next_cursor": next_cursor
     }
 
-@api_router.get("/stories/featured")
-async def get_featured_stories():
-    """Get featured stories for homepage"""
+FEATURED_SLOTS = 4
+featured_stories_snapshot = SharedSnapshot("featured_stories")
+
+async def build_featured_stories(database) -> List[dict]:
+    """Admin-pinned stories first, topped up with the most resonated ones.
+    
+    Kept as stored (ISO date strings) so the list can be cached as-is."""
     # First try to get admin-pinned featured stories
     featured_query = {"status": "approved", "is_featured": True}
-    cursor = db.stories.find(featured_query).sort("published_at", -1).limit(4)
-    stories = []
-    async for story in cursor:
-        story = parse_from_mongo(story)
-        if story.get("is_anonymous", True):
-            story["author_name"] = "Anonymous"
-        story.pop("author_email", None)
-        stories.append(story)
+    stories = await database.stories.find(featured_query, STORY_LIST_PROJECTION).sort(
+        "published_at", -1
+    ).to_list(length=FEATURED_SLOTS)
     
     # If not enough featured, fill with most resonated
-    if len(stories) < 4:
-        remaining = 4 - len(stories)
+    if len(stories) < FEATURED_SLOTS:
         featured_ids = [s["id"] for s in stories]
         top_query = {"status": "approved", "id": {"$nin": featured_ids}}
-        cursor = db.stories.find(top_query).sort("resonance_count", -1).limit(remaining)
-        async for story in cursor:
-            story = parse_from_mongo(story)
-            if story.get("is_anonymous", True):
-                story["author_name"] = "Anonymous"
-            story.pop("author_email", None)
-            stories.append(story)
+        stories += await database.stories.find(top_query, STORY_LIST_PROJECTION).sort(
+            "resonance_count", -1
+        ).to_list(length=FEATURED_SLOTS - len(stories))
     
+    for story in stories:
+        if story.get("is_anonymous", True):
+            story["author_name"] = "Anonymous"
     return stories
 
+async def refresh_featured_stories():
+    """Rebuild the homepage featured slot after a story event that can change it"""
+    try:
+        await featured_stories_snapshot.publish(db, await build_featured_stories(db))
+    except Exception as e:
+        print(f"⚠️ Featured stories refresh failed: {e}")
+
+async def refresh_related_stories(story_id: str):
+    """Queue a story that entered or left approved; the related-stories job patches the lists"""
+    try:
+        await related_stories.mark_dirty(db, story_id)
+    except Exception as e:
+        print(f"⚠️ Related stories update not queued for {story_id}: {e}")
+
+@api_router.get("/stories/featured")
+async def get_featured_stories(request: Request):
+    """Get featured stories for homepage (served from the shared featured snapshot)"""
+    stories = await featured_stories_snapshot.get(db, build_featured_stories)
+    headers = {"ETag": featured_stories_snapshot.etag, "Cache-Control": "public, max-age=30"}
+    if featured_stories_snapshot.not_modified(request.headers.get("if-none-match")):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(content=stories, headers=headers)
+
+STORY_SEARCH_MAX_PAGE = 10
+
+@api_router.get("/stories/search")
+async def search_stories(q: str, tag: Optional[str] = None, page: int = 1, limit: int = 12):
+    """Relevance-ranked full-text search over approved stories, with tag facets.
+    
+    Declared before /stories/{story_id} so "search" is not taken for an id."""
+    q = q.strip()
+    if not q:
+        raise HTTPException(status_code=400, detail="Search query is required")
+    if limit < 1 or limit > 50:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 50")
+    if page < 1 or page > STORY_SEARCH_MAX_PAGE:
+        raise HTTPException(status_code=400, detail=f"page must be between 1 and {STORY_SEARCH_MAX_PAGE}")
+    
+    match = {"$text": {"$search": q}, "status": "approved"}
+    results_match = {"tags": tag} if tag else {}
+    pipeline = [
+        {"$match": match},
+        {"$addFields": {"score": {"$meta": "textScore"}}},
+        {"$project": STORY_LIST_PROJECTION},
+        {"$facet": {
+            "stories": [
+                {"$match": results_match},
+                {"$sort": {"score": -1, "published_at": -1}},
+                {"$skip": (page - 1) * limit},
+                {"$limit": limit}
+            ],
+            "total": [{"$match": results_match}, {"$count": "count"}],
+            # Facets cover every match so the tag filter can be switched without a new query
+            "tags": [
+                {"$unwind": "$tags"},
+                {"$group": {"_id": "$tags", "count": {"$sum": 1}}},
+                {"$sort": {"count": -1, "_id": 1}}
+            ]
+        }}
+    ]
+    result = (await db.stories.aggregate(pipeline).to_list(1))[0]
+    
+    stories = []
+    for story in result["stories"]:
+        story = parse_from_mongo(story)
+        if story.get("is_anonymous", True):
+            story["author_name"] = "Anonymous"
+        stories.append(story)
+    total = result["total"][0]["count"] if result["total"] else 0
+    
+    return {
+        "query": q,
+        "stories": stories,
+        "total": total,
+        "page": page,
+        "limit": limit,
+        "has_more": page * limit < total and page < STORY_SEARCH_MAX_PAGE,
+        "tags": [{"tag": t["_id"], "count": t["count"]} for t in result["tags"]]
+    }
+
 @api_router.get("/stories/{story_id}")
-async def get_story(story_id: str):
+async def get_story(story_id: str, request: Request):
     """Get a single approved story"""
-    story = await db.stories.find_one({"id": story_id, "status": "approved"})
+    story = await db.stories.find_one({"id": story_id, "status": "approved"}, STORY_PUBLIC_PROJECTION)
     if not story:
         raise HTTPException(status_code=404, detail="Story not found")
+    if "body_html" not in story:
+        # Approved before rendering moved to approval time: render it now, once
+        source = await db.stories.find_one({"id": story_id}, {"_id": 0, "body": 1}) or {}
+        rendered = render_story(source.get("body", ""))
+        await db.stories.update_one({"id": story_id, "body_html": {"$exists": False}}, {"$set": rendered})
+        story.update(rendered)
     
     story = parse_from_mongo(story)
     if story.get("is_anonymous", True):
         story["author_name"] = "Anonymous"
-    story.pop("author_email", None)
+    
+    current_user = await get_current_user_optional(request)
+    story["user_resonated"] = bool(current_user) and (
+        await db.story_resonances.find_one({"user_id": current_user.id, "story_id": story_id}, {"_id": 1})
+        or await db.stories.find_one({"id": story_id, "resonated_by": current_user.id}, {"_id": 1})
+    ) is not None
     
     return story
 
+@api_router.get("/stories/{story_id}/related")
+async def get_related_stories(story_id: str):
+    """Stories to read next, precomputed from tag and text similarity"""
+    return await related_stories.get_related(db, story_id)
+
 # --- Authenticated Story Endpoints ---
 
 @api_router.post("/stories")
@@ -3143,9 +3509,10 @@ async def submit_story(story_data: StoryCreate, current_user: User = Depends(get
         raise HTTPException(status_code=400, detail="You must consent to the terms to submit a story")
     
     # Validate tags are from allowed list
-    for tag in story_data.tags:
-        if tag not in HEALTH_TOPIC_TAGS:
-            raise HTTPException(status_code=400, detail=f"Invalid tag: {tag}. Must be one of: {HEALTH_TOPIC_TAGS}")
+    invalid_tags = await tag_registry.invalid_tags(db, story_data.tags)
+    if invalid_tags:
+        allowed_tags = sorted(await tag_registry.allowed(db))
+        raise HTTPException(status_code=400, detail=f"Invalid tag: {invalid_tags[0]}. Must be one of: {allowed_tags}")
     
     # Validate university if provided
     if story_data.university and story_data.university not in CANADIAN_UNIVERSITIES:
@@ -3166,6 +3533,7 @@ async def submit_story(story_data: StoryCreate, current_user: User = Depends(get
     )
     
     await db.stories.insert_one(prepare_for_mongo(story.dict()))
+    await story_counters.record_transition(db, None, {"status": story.status, "tags": story.tags})
     print(f"✅ New story submitted: '{story.title}' by {current_user.email}")
     
     return {"message": "Story submitted successfully! It will be reviewed before publication.", "story_id": story.id}
@@ -3173,7 +3541,7 @@ async def submit_story(story_data: StoryCreate, current_user: User = Depends(get
 @api_router.get("/stories/my/submissions")
 async def get_my_stories(current_user: User = Depends(get_current_user)):
     """Get current user's submitted stories"""
-    cursor = db.stories.find({"author_id": current_user.id}).sort("created_at", -1)
+    cursor = db.stories.find({"author_id": current_user.id}, STORY_PRIVATE_PROJECTION).sort("created_at", -1)
     stories = []
     async for story in cursor:
         stories.append(parse_from_mongo(story))
@@ -3197,9 +3565,9 @@ async def update_my_story(story_id: str, story_data: StoryUpdate, current_user:
     if story_data.body is not None:
         update_data["body"] = story_data.body
     if story_data.tags is not None:
-        for tag in story_data.tags:
-            if tag not in HEALTH_TOPIC_TAGS:
-                raise HTTPException(status_code=400, detail=f"Invalid tag: {tag}")
+        invalid_tags = await tag_registry.invalid_tags(db, story_data.tags)
+        if invalid_tags:
+            raise HTTPException(status_code=400, detail=f"Invalid tag: {invalid_tags[0]}")
         update_data["tags"] = story_data.tags
     if story_data.is_anonymous is not None:
         update_data["is_anonymous"] = story_data.is_anonymous
@@ -3214,9 +3582,13 @@ async def update_my_story(story_id: str, story_data: StoryUpdate, current_user:
         update_data["admin_feedback"] = None
     
     if update_data:
-        await db.stories.update_one({"id": story_id}, {"$set": update_data})
+        result = await db.stories.update_one(story_counters.unchanged(story), {"$set": update_data})
+        if result.matched_count == 0:
+            raise HTTPException(status_code=409, detail="Story was changed in the meantime. Please reload and try again.")
     
-    updated = await db.stories.find_one({"id": story_id})
+    updated = await db.stories.find_one({"id": story_id}, STORY_PRIVATE_PROJECTION)
+    if update_data and result.modified_count:
+        await story_counters.record_transition(db, story, updated)
     return parse_from_mongo(updated)
 
 @api_router.delete("/stories/{story_id}")
@@ -3229,7 +3601,11 @@ async def delete_my_story(story_id: str, current_user: User = Depends(get_curren
     if story["status"] == "approved":
         raise HTTPException(status_code=400, detail="Cannot delete an approved story. Please contact admin.")
     
-    await db.stories.delete_one({"id": story_id})
+    result = await db.stories.delete_one(story_counters.unchanged(story))
+    if result.deleted_count == 0:
+        raise HTTPException(status_code=409, detail="Story was changed in the meantime. Please reload and try again.")
+    await db.story_resonances.delete_many({"story_id": story_id})
+    await story_counters.record_transition(db, story, None)
     return {"message": "Story deleted successfully"}
 
 # --- Resonance (Reaction) Endpoint ---
@@ -3237,70 +3613,104 @@ async def delete_my_story(story_id: str, current_user: User = Depends(get_curren
 @api_router.post("/stories/{story_id}/resonate")
 async def toggle_resonance(story_id: str, current_user: User = Depends(get_current_user)):
     """Toggle 'This resonated with me' on a story"""
-    story = await db.stories.find_one({"id": story_id, "status": "approved"})
+    story = await db.stories.find_one({"id": story_id, "status": "approved"}, {"_id": 0, "id": 1})
     if not story:
         raise HTTPException(status_code=404, detail="Story not found")
     
-    resonated_by = story.get("resonated_by", [])
-    
-    if current_user.id in resonated_by:
-        # Remove resonance
-        await db.stories.update_one(
-            {"id": story_id},
-            {
-                "$pull": {"resonated_by": current_user.id},
-                "$inc": {"resonance_count": -1}
-            }
-        )
-        action = "removed"
+    edge = {"story_id": story_id, "user_id": current_user.id}
+    removed = (await db.story_resonances.delete_one(edge)).deleted_count or (await db.stories.update_one(
+        # Not migrated yet: the resonance is still in the legacy array
+        {"id": story_id, "resonated_by": current_user.id},
+        {"$pull": {"resonated_by": current_user.id}}
+    )).modified_count
+    if removed:
+        delta, action = -1, "removed"
     else:
-        # Add resonance
-        await db.stories.update_one(
-            {"id": story_id},
-            {
-                "$push": {"resonated_by": current_user.id},
-                "$inc": {"resonance_count": 1}
-            }
-        )
-        action = "added"
+        try:
+            await db.story_resonances.insert_one({**edge, "created_at": datetime.now(timezone.utc).isoformat()})
+            delta, action = 1, "added"
+        except DuplicateKeyError:
+            # A concurrent request from the same user already added it
+            delta, action = 0, "added"
+    
+    updated = await db.stories.find_one_and_update(
+        {"id": story_id},
+        {"$inc": {"resonance_count": delta}},
+        projection={"_id": 0, "resonance_count": 1},
+        return_document=ReturnDocument.AFTER
+    )
     
-    updated = await db.stories.find_one({"id": story_id})
+    # Resonance counts decide the non-pinned featured slots and are shown on every card
+    featured = featured_stories_snapshot.value
+    if delta and (featured is None or any(s["id"] == story_id for s in featured)
+                  or not all(s.get("is_featured") for s in featured)):
+        await refresh_featured_stories()
     return {
         "message": f"Resonance {action}",
-        "resonance_count": updated.get("resonance_count", 0),
+        "resonance_count": max(updated.get("resonance_count", 0), 0) if updated else 0,
         "user_resonated": action == "added"
     }
 
+@api_router.get("/stories/my/resonances")
+async def get_my_resonances(story_ids: str, current_user: User = Depends(get_current_user)):
+    """Which of the given stories (comma-separated ids, e.g. the current page) the user resonated with"""
+    ids = [story_id for story_id in story_ids.split(",") if story_id][:100]
+    edges = await db.story_resonances.find(
+        {"user_id": current_user.id, "story_id": {"$in": ids}},
+        {"_id": 0, "story_id": 1}
+    ).to_list(length=len(ids))
+    legacy = await db.stories.find(
+        {"id": {"$in": ids}, "resonated_by": current_user.id}, {"_id": 0, "id": 1}
+    ).to_list(length=len(ids))
+    resonated = {edge["story_id"] for edge in edges} | {story["id"] for story in legacy}
+    return {"story_ids": [story_id for story_id in ids if story_id in resonated]}
+
 # --- Health Tags Endpoints ---
 
-@api_router.get("/tags")
-async def get_health_tags():
-    """Get all active health topic tags"""
-    # First check if tags exist in database
-    tags_count = await db.health_tags.count_documents({})
-    
-    if tags_count == 0:
-        # Seed default tags
-        for tag_name in HEALTH_TOPIC_TAGS:
-            tag = HealthTag(
-                name=tag_name,
-                slug=slugify(tag_name),
-                description=f"Stories about {tag_name.lower()}",
-                is_active=True
-            )
-            await db.health_tags.insert_one(prepare_for_mongo(tag.dict()))
-        print("✅ Seeded default health topic tags")
-    
-    cursor = db.health_tags.find({"is_active": True}).sort("name", 1)
-    tags = []
-    async for tag in cursor:
-        # Get story count for this tag
-        story_count = await db.stories.count_documents({"status": "approved", "tags": tag["name"]})
-        tag["story_count"] = story_count
-        tags.append(parse_from_mongo(tag))
-    
+health_tags_snapshot = SharedSnapshot("health_tags")
+
+async def seed_health_tags():
+    """Insert the default health topic tags into an empty health_tags collection (startup)"""
+    if await db.health_tags.find_one({}, {"_id": 1}):
+        return
+    await db.health_tags.insert_many([
+        prepare_for_mongo(HealthTag(
+            name=tag_name,
+            slug=slugify(tag_name),
+            description=f"Stories about {tag_name.lower()}",
+            is_active=True
+        ).dict())
+        for tag_name in HEALTH_TOPIC_TAGS
+    ])
+    print("✅ Seeded default health topic tags")
+
+async def build_health_tags(database) -> List[dict]:
+    """Active tags with their approved story counts (from the story counters)"""
+    tags = await database.health_tags.find({"is_active": True}, {"_id": 0}).sort("name", 1).to_list(length=None)
+    counts = await story_counters.get_tag_counts(database, "approved")
+    for tag in tags:
+        tag["story_count"] = counts.get(tag["name"], 0)
     return tags
 
+async def refresh_health_tags(registry: bool = False):
+    """Republish the tag list after a change in approved stories, and with
+    registry=True also the allowed-tag set after a tag edit"""
+    try:
+        await health_tags_snapshot.publish(db, await build_health_tags(db))
+        if registry:
+            await tag_registry.refresh(db)
+    except Exception as e:
+        print(f"⚠️ Health tags refresh failed: {e}")
+
+@api_router.get("/tags")
+async def get_health_tags(request: Request):
+    """Get all active health topic tags (served from the shared tags snapshot)"""
+    tags = await health_tags_snapshot.get(db, build_health_tags)
+    headers = {"ETag": health_tags_snapshot.etag, "Cache-Control": "public, max-age=60"}
+    if health_tags_snapshot.not_modified(request.headers.get("if-none-match")):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(content=tags, headers=headers)
+
 # --- Admin Story Management Endpoints ---
 
 @api_router.get("/admin/stories")
@@ -3319,30 +3729,21 @@ async def admin_get_all_stories(
         query["status"] = status
     
     skip = (page - 1) * limit
-    cursor = db.stories.find(query).sort("created_at", -1).skip(skip).limit(limit)
-    stories = []
-    async for story in cursor:
-        stories.append(parse_from_mongo(story))
-    
-    total = await db.stories.count_documents(query)
+    # Page fetch and the maintained status counters in parallel
+    docs, counts = await asyncio.gather(
+        db.stories.find(query, STORY_PRIVATE_PROJECTION).sort("created_at", -1).skip(skip).limit(limit).to_list(length=limit),
+        story_counters.get_status_counts(db)
+    )
+    stories = [parse_from_mongo(story) for story in docs]
     
-    # Get counts by status
-    pending_count = await db.stories.count_documents({"status": "pending"})
-    approved_count = await db.stories.count_documents({"status": "approved"})
-    rejected_count = await db.stories.count_documents({"status": "rejected"})
-    edit_requested_count = await db.stories.count_documents({"status": "edit_requested"})
+    total = counts.get(status, 0) if status else sum(counts.values())
     
     return {
         "stories": stories,
         "total": total,
         "page": page,
         "limit": limit,
-        "counts": {
-            "pending": pending_count,
-            "approved": approved_count,
-            "rejected": rejected_count,
-            "edit_requested": edit_requested_count
-        }
+        "counts": counts
     }
 
 @api_router.put("/admin/stories/{story_id}/status")
@@ -3370,14 +3771,26 @@ async def admin_update_story_status(
     if action.status == "approved":
         update_data["published_at"] = datetime.now(timezone.utc).isoformat()
         update_data["admin_feedback"] = None
+        # Excerpt, reading time and sanitized HTML are computed once here, not per view
+        update_data.update(render_story(story["body"]))
     elif action.status == "edit_requested":
         update_data["admin_feedback"] = action.feedback
     elif action.status == "rejected":
         update_data["admin_feedback"] = action.feedback
     
-    await db.stories.update_one({"id": story_id}, {"$set": update_data})
-    
-    updated = await db.stories.find_one({"id": story_id})
+    # Conditional on the state we read: of two concurrent moderations only one
+    # applies, so the counters move once
+    result = await db.stories.update_one(story_counters.unchanged(story), {"$set": update_data})
+    if result.matched_count == 0:
+        raise HTTPException(status_code=409, detail="Story was moderated in the meantime. Please reload and try again.")
+    
+    updated = await db.stories.find_one({"id": story_id}, STORY_PRIVATE_PROJECTION)
+    if result.modified_count:
+        await story_counters.record_transition(db, story, updated)
+    if "approved" in (story["status"], action.status):
+        await refresh_featured_stories()
+        await refresh_health_tags()
+        await refresh_related_stories(story_id)
     print(f"✅ Story '{story['title']}' status updated to {action.status} by admin {current_user.email}")
     
     return parse_from_mongo(updated)
@@ -3397,6 +3810,7 @@ async def admin_toggle_featured(story_id: str, current_user: User = Depends(get_
     
     new_featured_status = not story.get("is_featured", False)
     await db.stories.update_one({"id": story_id}, {"$set": {"is_featured": new_featured_status}})
+    await refresh_featured_stories()
     
     return {"message": f"Story {'featured' if new_featured_status else 'unfeatured'}", "is_featured": new_featured_status}
 
@@ -3415,6 +3829,7 @@ async def admin_create_tag(tag_data: HealthTagCreate, current_user: User = Depen
             {"name": tag_data.name},
             {"$set": {"description": tag_data.description, "is_active": tag_data.is_active}}
         )
+        await refresh_health_tags(registry=True)
         return {"message": "Tag updated", "action": "updated"}
     
     # Create new tag
@@ -3425,10 +3840,7 @@ async def admin_create_tag(tag_data: HealthTagCreate, current_user: User = Depen
         is_active=tag_data.is_active
     )
     await db.health_tags.insert_one(prepare_for_mongo(tag.dict()))
-    
-    # Add to allowed list
-    if tag_data.name not in HEALTH_TOPIC_TAGS:
-        HEALTH_TOPIC_TAGS.append(tag_data.name)
+    await refresh_health_tags(registry=True)
     
     return {"message": "Tag created", "action": "created", "tag": tag.dict()}
 
@@ -3441,6 +3853,7 @@ async def admin_retire_tag(tag_name: str, current_user: User = Depends(get_curre
     result = await db.health_tags.update_one({"name": tag_name}, {"$set": {"is_active": False}})
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Tag not found")
+    await refresh_health_tags(registry=True)
     
     return {"message": f"Tag '{tag_name}' retired"}
 
@@ -3452,38 +3865,38 @@ async def admin_get_analytics(current_user: User = Depends(get_current_user)):
     if current_user.user_type != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
     
-    total_submitted = await db.stories.count_documents({})
-    total_approved = await db.stories.count_documents({"status": "approved"})
-    total_rejected = await db.stories.count_documents({"status": "rejected"})
-    total_pending = await db.stories.count_documents({"status": "pending"})
-    
-    # Get total resonance count
-    pipeline = [
+    # Status and tag totals come from the maintained counters; only the
+    # resonance sum needs the stories collection. All three run concurrently.
+    resonance_pipeline = [
         {"$match": {"status": "approved"}},
         {"$group": {"_id": None, "total_resonance": {"$sum": "$resonance_count"}}}
     ]
-    resonance_result = await db.stories.aggregate(pipeline).to_list(1)
+    counts, tag_counts, resonance_result = await asyncio.gather(
+        story_counters.get_status_counts(db),
+        story_counters.get_tag_counts(db, "approved"),
+        db.stories.aggregate(resonance_pipeline).to_list(1)
+    )
     total_resonance = resonance_result[0]["total_resonance"] if resonance_result else 0
-    
-    # Get most used tags
-    tag_pipeline = [
-        {"$match": {"status": "approved"}},
-        {"$unwind": "$tags"},
-        {"$group": {"_id": "$tags", "count": {"$sum": 1}}},
-        {"$sort": {"count": -1}},
-        {"$limit": 10}
-    ]
-    tag_stats = await db.stories.aggregate(tag_pipeline).to_list(10)
+    top_tags = sorted(tag_counts.items(), key=lambda item: (-item[1], item[0]))[:10]
     
     return {
-        "total_submitted": total_submitted,
-        "total_approved": total_approved,
-        "total_rejected": total_rejected,
-        "total_pending": total_pending,
+        "total_submitted": sum(counts.values()),
+        "total_approved": counts["approved"],
+        "total_rejected": counts["rejected"],
+        "total_pending": counts["pending"],
         "total_resonance": total_resonance,
-        "top_tags": [{"tag": t["_id"], "count": t["count"]} for t in tag_stats]
+        "top_tags": [{"tag": tag, "count": count} for tag, count in top_tags]
     }
 
+@api_router.get("/admin/analytics/daily")
+async def admin_get_daily_analytics(days: int = 30, current_user: User = Depends(get_current_user)):
+    """Per-day activity time series for dashboard charts (served from daily rollups)"""
+    if current_user.user_type != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    series = await daily_rollups.get_series(db, days)
+    return {"days": len(series), "metrics": list(daily_rollups.METRICS), "series": series}
+
 @api_router.get("/universities")
 async def get_universities():
     """Get list of Canadian universities for story submission"""
@@ -3500,6 +3913,130 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+background_tasks: List[asyncio.Task] = []
+
+async def run_periodically(name: str, interval_seconds: int, job):
+    """Run `job` forever, sleeping `interval_seconds` between runs; failures are logged, not fatal"""
+    while True:
+        try:
+            result = await job()
+            logger.info(f"Background job {name} finished: {result}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Background job {name} failed: {e}")
+        await asyncio.sleep(interval_seconds)
+
+STARTUP_LEASE_SECONDS = 300
+
+async def run_startup_step(name: str, step):
+    """Run one startup step; a failure is logged and the remaining steps still run"""
+    try:
+        await step()
+    except Exception as e:
+        logger.error(f"Startup step '{name}' failed: {e}")
+
+async def create_story_indexes():
+    await db.story_resonances.create_index([("user_id", 1), ("story_id", 1)], unique=True)
+    await db.story_resonances.create_index([("story_id", 1)])
+    # Keyset paging for /stories: (sort field, id) with and without a tag filter
+    for sort_field in ("published_at", "resonance_count"):
+        await db.stories.create_index([("status", 1), (sort_field, -1), ("id", -1)])
+        await db.stories.create_index([("status", 1), ("tags", 1), (sort_field, -1), ("id", -1)])
+    # Story search: one text index per collection, title and tags weigh most
+    await db.stories.create_index(
+        [("title", "text"), ("tags", "text"), ("body", "text")],
+        weights={"title": 10, "tags": 5, "body": 1},
+        name="stories_text"
+    )
+    # Moderation queue pages
+    await db.stories.create_index([("status", 1), ("created_at", -1)])
+
+async def create_nsr_identifier_index():
+    await sequences.seed_nsr_counters(db)
+    await sequences.ensure_identifier_index(db)
+
+async def run_once_per_deploy():
+    """Startup steps that must not run in several workers at once (index
+    rebuilds, seeding); the worker that gets the lease runs them"""
+    if not await job_leases.acquire(db, "startup", STARTUP_LEASE_SECONDS):
+        return
+    try:
+        for name, step in [
+            ("journal search indexes", lambda: journal_search.ensure_indexes(db)),
+            ("story counter seed", lambda: story_counters.seed(db)),
+            ("health tag seed", seed_health_tags),
+            ("NSR identifier index (run backfill_identifiers.py)", create_nsr_identifier_index),
+        ]:
+            await run_startup_step(name, step)
+    finally:
+        await job_leases.release(db, "startup")
+
+@app.on_event("startup")
+async def startup_db_client():
+    payments.start()
+    # Backfills and story counter recounts are not run here (the counters are
+    # only seeded when empty); see backfill_derived_fields.py
+    for name, step in [
+        ("trending indexes", lambda: trending.ensure_indexes(db)),
+        ("follow suggestion indexes", lambda: follow_graph.ensure_indexes(db)),
+        ("research match indexes", lambda: research_matching.ensure_indexes(db)),
+        ("story indexes", create_story_indexes),
+        ("story counter indexes", lambda: story_counters.ensure_indexes(db)),
+        ("daily rollup indexes", lambda: daily_rollups.ensure_indexes(db)),
+        ("related story indexes", lambda: related_stories.ensure_indexes(db)),
+        # Feed pages and /social/feed/since polls (covered: id and created_at only)
+        ("feed indexes", lambda: db.posts.create_index([("visibility", 1), ("created_at", -1), ("id", 1)])),
+        ("near duplicate indexes", lambda: near_duplicates.ensure_indexes(db)),
+        ("document text indexes", lambda: document_text.ensure_indexes(db)),
+        ("webhook inbox indexes", lambda: webhook_inbox.ensure_indexes(db)),
+        ("once-per-deploy steps", run_once_per_deploy),
+        ("health tag snapshot", lambda: refresh_health_tags(registry=True)),
+        ("featured stories snapshot", refresh_featured_stories),
+        ("catalog snapshots", lambda: refresh_catalog_snapshots(posters=True, articles=True)),
+    ]:
+        await run_startup_step(name, step)
+    
+    background_tasks.append(asyncio.create_task(run_periodically(
+        "trending_prune",
+        trending.PRUNE_INTERVAL_SECONDS,
+        lambda: trending.prune_buckets(db)
+    )))
+    background_tasks.append(asyncio.create_task(run_periodically(
+        "follow_suggestions",
+        follow_graph.REFRESH_INTERVAL_SECONDS,
+        lambda: follow_graph.refresh_suggestions(db)
+    )))
+    background_tasks.append(asyncio.create_task(run_periodically(
+        "research_matches",
+        research_matching.REFRESH_INTERVAL_SECONDS,
+        lambda: research_matching.matcher.run(db)
+    )))
+    background_tasks.append(asyncio.create_task(run_periodically(
+        "related_stories",
+        related_stories.REFRESH_INTERVAL_SECONDS,
+        lambda: related_stories.related_index.run(db)
+    )))
+    background_tasks.append(asyncio.create_task(run_periodically(
+        "daily_rollups",
+        daily_rollups.ROLLUP_INTERVAL_SECONDS,
+        lambda: daily_rollups.run_rollup(db)
+    )))
+    background_tasks.append(asyncio.create_task(run_periodically(
+        "document_text",
+        document_text.EXTRACT_INTERVAL_SECONDS,
+        lambda: document_text.run_pending(db, fs)
+    )))
+    background_tasks.append(asyncio.create_task(run_periodically(
+        "webhook_inbox",
+        webhook_inbox.POLL_INTERVAL_SECONDS,
+        lambda: webhook_inbox.process_pending(db, handle_stripe_event)
+    )))
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    for task in background_tasks:
+        task.cancel()
+    document_text.shutdown()
+    await payments.close()
     client.close()
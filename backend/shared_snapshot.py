@@ -0,0 +1,71 @@
+"""
+CURE - Shared Snapshots
+Small precomputed values (homepage slots, tag lists, ...) stored in one Mongo
+document each and mirrored in every worker's memory. Writers publish a new
+value after the event that changed it; readers serve from memory and only
+re-read the version stamp every few seconds, so all workers converge quickly
+without querying the source collections on each request.
+"""
+
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+
+SNAPSHOT_COLLECTION = "site_cache"
+DEFAULT_REVALIDATE_SECONDS = 5.0
+
+
+class SharedSnapshot:
+    """One named value, versioned in `site_cache` and cached per process"""
+
+    def __init__(self, name: str, revalidate_seconds: float = DEFAULT_REVALIDATE_SECONDS):
+        self.name = name
+        self.revalidate_seconds = revalidate_seconds
+        self.version: Optional[int] = None
+        self.value: Any = None
+        self._checked_until = 0.0
+
+    @property
+    def etag(self) -> Optional[str]:
+        return f'W/"{self.name}-{self.version}"' if self.version is not None else None
+
+    def _store(self, version: int, value: Any):
+        self.version = version
+        self.value = value
+        self._checked_until = time.monotonic() + self.revalidate_seconds
+
+    async def publish(self, db: AsyncIOMotorDatabase, value: Any) -> int:
+        """Replace the shared value and bump its version; returns the new version"""
+        doc = await db[SNAPSHOT_COLLECTION].find_one_and_update(
+            {"_id": self.name},
+            {"$set": {"value": value}, "$inc": {"version": 1}},
+            projection={"version": 1},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        self._store(doc["version"], value)
+        return doc["version"]
+
+    async def get(self, db: AsyncIOMotorDatabase,
+                  build: Callable[[AsyncIOMotorDatabase], Awaitable[Any]]) -> Any:
+        """Current value; `build` computes and publishes it if nobody has yet"""
+        if self.version is not None and time.monotonic() < self._checked_until:
+            return self.value
+
+        stamp = await db[SNAPSHOT_COLLECTION].find_one({"_id": self.name}, {"version": 1})
+        if stamp is None:
+            await self.publish(db, await build(db))
+        elif stamp["version"] != self.version:
+            doc = await db[SNAPSHOT_COLLECTION].find_one({"_id": self.name})
+            self._store(doc["version"], doc["value"])
+        else:
+            self._checked_until = time.monotonic() + self.revalidate_seconds
+        return self.value
+
+    def not_modified(self, if_none_match: Optional[str]) -> bool:
+        """True when the client's If-None-Match already names the current version"""
+        if not if_none_match or self.etag is None:
+            return False
+        return self.etag in [tag.strip() for tag in if_none_match.split(",")]
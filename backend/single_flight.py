@@ -0,0 +1,60 @@
+"""
+CURE - Single-Flight Cache
+Short-TTL, per-process cache for upstream lookups that many requests ask for
+at once (e.g. several tabs polling one checkout session). Concurrent callers
+for the same key share a single in-flight call, and its result is reused
+until it expires. The call runs as its own task, so it finishes (and is
+cached) even if the caller that started it is cancelled. Failures are shared
+with the callers that were waiting but are never cached.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class SingleFlightCache:
+    def __init__(self, ttl_seconds: float, max_entries: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._values: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+
+    def _fresh(self, key: Hashable):
+        entry = self._values.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del self._values[key]
+            return False, None
+        return True, value
+
+    def _store(self, key: Hashable, value: Any):
+        self._values[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._values.move_to_end(key)
+        while len(self._values) > self.max_entries:
+            self._values.popitem(last=False)
+
+    async def _run(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            value = await fetch()
+        finally:
+            del self._in_flight[key]
+        self._store(key, value)
+        return value
+
+    async def get(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        hit, value = self._fresh(key)
+        if hit:
+            return value
+        task = self._in_flight.get(key)
+        if task is None:
+            # A task of its own, so the call outlives whichever caller started it
+            task = asyncio.get_running_loop().create_task(self._run(key, fetch))
+            # Every caller may have gone; mark a failure retrieved anyway
+            task.add_done_callback(lambda done: done.cancelled() or done.exception())
+            self._in_flight[key] = task
+        # Shielded so one caller's cancellation doesn't cancel the shared call
+        return await asyncio.shield(task)
@@ -9,6 +9,8 @@ from datetime import datetime, timezone
 from motor.motor_asyncio import AsyncIOMotorDatabase
 import re
 
+import trending
+from post_hydrator import PostHydrator
 from social_models import (
     Post, PostCreate, PostResponse, Comment, CommentCreate,
     Follow, Circle, CircleCreate, CircleMember, Notification,
@@ -33,44 +35,6 @@ def extract_mentions(text: str) -> List[str]:
     return list(set(re.findall(r'@(\w+)', text)))
 
 
-async def get_post_with_author(db: AsyncIOMotorDatabase, post_id: str, current_user_id: Optional[str] = None) -> Optional[PostResponse]:
-    """Get post with author details and engagement status"""
-    post = await db.posts.find_one({"id": post_id})
-    if not post:
-        return None
-    
-    author = await db.users.find_one({"id": post["author_id"]})
-    if not author:
-        return None
-    
-    # Check if current user liked this post
-    is_liked = False
-    is_following = False
-    if current_user_id:
-        like = await db.likes.find_one({"post_id": post_id, "user_id": current_user_id})
-        is_liked = like is not None
-        
-        follow = await db.follows.find_one({"follower_id": current_user_id, "followed_id": post["author_id"]})
-        is_following = follow is not None
-    
-    return PostResponse(
-        id=post["id"],
-        author_id=post["author_id"],
-        author_name=author.get("name", "Unknown"),
-        author_role=author.get("role", "student"),
-        author_picture=author.get("profile_picture"),
-        author_university=author.get("university"),
-        text=post["text"],
-        attachments=post.get("attachments", []),
-        tags=post.get("tags", []),
-        visibility=post.get("visibility", "public"),
-        metrics=post.get("metrics", {"likes": 0, "comments": 0, "reposts": 0, "views": 0}),
-        created_at=post.get("created_at"),
-        is_liked=is_liked,
-        is_following_author=is_following
-    )
-
-
 async def create_notification(db: AsyncIOMotorDatabase, user_id: str, type: str, actor_id: str, 
                               post_id: Optional[str] = None, comment_id: Optional[str] = None):
     """Create a notification for a user"""
@@ -119,6 +83,7 @@ async def create_post(
     )
     
     await db.posts.insert_one(post.dict())
+    await trending.record_tags(db, post.tags, post.created_at, 1)
     
     # Create notifications for mentions
     mentions = extract_mentions(post_data.text)
@@ -127,7 +92,7 @@ async def create_post(
         if mentioned_user:
             await create_notification(db, mentioned_user["id"], "mention", current_user.id, post.id)
     
-    return await get_post_with_author(db, post.id, current_user.id)
+    return await PostHydrator(db).hydrate_one(post.dict(), current_user.id)
 
 
 @social_router.get("/posts/{post_id}", response_model=PostResponse)
@@ -138,7 +103,8 @@ async def get_post(
 ):
     """Get a single post by ID"""
     current_user_id = current_user.id if current_user else None
-    post = await get_post_with_author(db, post_id, current_user_id)
+    raw_post = await db.posts.find_one({"id": post_id}, {"_id": 0})
+    post = await PostHydrator(db).hydrate_one(raw_post, current_user_id) if raw_post else None
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
     
@@ -169,6 +135,7 @@ async def delete_post(
     await db.posts.delete_one({"id": post_id})
     await db.comments.delete_many({"post_id": post_id})
     await db.likes.delete_many({"post_id": post_id})
+    await trending.record_tags(db, post.get("tags", []), post.get("created_at"), -1)
     
     return {"message": "Post deleted successfully"}
 
@@ -235,13 +202,9 @@ async def get_feed(
     if has_more:
         posts = posts[:limit]
     
-    # Enrich with author details
+    # Enrich with author details and viewer state in batched queries
     current_user_id = current_user.id if current_user else None
-    post_responses = []
-    for post in posts:
-        post_response = await get_post_with_author(db, post["id"], current_user_id)
-        if post_response:
-            post_responses.append(post_response)
+    post_responses = await PostHydrator(db).hydrate(posts, current_user_id)
     
     next_cursor = posts[-1]["created_at"].isoformat() if posts and has_more else None
     
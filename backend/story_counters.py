@@ -0,0 +1,129 @@
+"""
+Vital Signs - Story Counters
+Story totals per status and per (status, tag), kept up to date on every
+submission, edit, moderation decision and deletion so list endpoints and the
+admin dashboard never have to count the stories collection.
+"""
+
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReplaceOne, UpdateOne
+
+COUNTER_COLLECTION = "story_counters"
+STORY_STATUSES = ("pending", "approved", "rejected", "edit_requested")
+
+
+def counter_id(status: str, tag: Optional[str] = None) -> str:
+    return status if tag is None else f"{status}|{tag}"
+
+
+def _story_counters(story: Optional[Dict[str, Any]]) -> Counter:
+    """Counter keys a story contributes to: its status, and its status per tag"""
+    if not story:
+        return Counter()
+    status = story.get("status", "pending")
+    keys = Counter({(status, None): 1})
+    for tag in set(story.get("tags") or []):
+        keys[(status, tag)] += 1
+    return keys
+
+
+def unchanged(story: Dict[str, Any]) -> Dict[str, Any]:
+    """Filter matching the story only while its counted fields are as read.
+
+    Updates and deletes use it so that of two concurrent requests only the one
+    that actually changed the story records the transition.
+    """
+    return {"id": story["id"], "status": story.get("status"), "tags": story.get("tags")}
+
+
+async def record_transition(db: AsyncIOMotorDatabase, before: Optional[Dict[str, Any]],
+                            after: Optional[Dict[str, Any]]):
+    """Move a story's contribution from its `before` state to its `after` state.
+
+    Pass before=None for a new story and after=None for a deleted one. Only the
+    `status` and `tags` fields are read. Call it only after a write filtered
+    with `unchanged(before)` went through.
+    """
+    deltas = _story_counters(after)
+    deltas.subtract(_story_counters(before))
+    operations = [
+        UpdateOne(
+            {"_id": counter_id(status, tag)},
+            {"$inc": {"count": delta}, "$set": {"status": status, "tag": tag}},
+            upsert=True
+        )
+        for (status, tag), delta in sorted(deltas.items(), key=lambda item: counter_id(*item[0]))
+        if delta
+    ]
+    if operations:
+        await db[COUNTER_COLLECTION].bulk_write(operations, ordered=False)
+
+
+async def get_count(db: AsyncIOMotorDatabase, status: str, tag: Optional[str] = None) -> int:
+    doc = await db[COUNTER_COLLECTION].find_one({"_id": counter_id(status, tag)}, {"count": 1})
+    return max(doc["count"], 0) if doc else 0
+
+
+async def get_status_counts(db: AsyncIOMotorDatabase) -> Dict[str, int]:
+    """Story total for every moderation status"""
+    docs = await db[COUNTER_COLLECTION].find(
+        {"_id": {"$in": list(STORY_STATUSES)}}, {"count": 1}
+    ).to_list(length=len(STORY_STATUSES))
+    counts = {status: 0 for status in STORY_STATUSES}
+    counts.update({doc["_id"]: max(doc["count"], 0) for doc in docs})
+    return counts
+
+
+async def get_tag_counts(db: AsyncIOMotorDatabase, status: str = "approved") -> Dict[str, int]:
+    """Story total per tag for one status"""
+    docs = await db[COUNTER_COLLECTION].find(
+        {"status": status, "tag": {"$ne": None}}, {"_id": 0, "tag": 1, "count": 1}
+    ).to_list(length=None)
+    return {doc["tag"]: doc["count"] for doc in docs if doc["count"] > 0}
+
+
+async def rebuild(db: AsyncIOMotorDatabase) -> int:
+    """Recount everything from the stories collection (backfill_derived_fields.py).
+
+    Not safe to run while stories are being moderated: increments applied
+    between the aggregate and the replace are lost.
+    """
+    status_totals = await db.stories.aggregate([
+        {"$group": {"_id": {"$ifNull": ["$status", "pending"]}, "count": {"$sum": 1}}}
+    ]).to_list(length=None)
+    tag_totals = await db.stories.aggregate([
+        {"$unwind": "$tags"},
+        {"$group": {
+            "_id": {"status": {"$ifNull": ["$status", "pending"]}, "tag": "$tags", "story": "$id"}
+        }},
+        {"$group": {"_id": {"status": "$_id.status", "tag": "$_id.tag"}, "count": {"$sum": 1}}}
+    ]).to_list(length=None)
+
+    counters: List[Dict[str, Any]] = [
+        {"_id": counter_id(row["_id"]), "status": row["_id"], "tag": None, "count": row["count"]}
+        for row in status_totals
+    ] + [
+        {"_id": counter_id(row["_id"]["status"], row["_id"]["tag"]), "status": row["_id"]["status"],
+         "tag": row["_id"]["tag"], "count": row["count"]}
+        for row in tag_totals
+    ]
+    if counters:
+        await db[COUNTER_COLLECTION].bulk_write(
+            [ReplaceOne({"_id": c["_id"]}, c, upsert=True) for c in counters], ordered=False
+        )
+    await db[COUNTER_COLLECTION].delete_many({"_id": {"$nin": [c["_id"] for c in counters]}})
+    return len(counters)
+
+
+async def seed(db: AsyncIOMotorDatabase) -> int:
+    """Count the stories once when no counters exist yet (first deploy; startup)"""
+    if await db[COUNTER_COLLECTION].find_one({}, {"_id": 1}):
+        return 0
+    return await rebuild(db)
+
+
+async def ensure_indexes(db: AsyncIOMotorDatabase):
+    await db[COUNTER_COLLECTION].create_index([("status", 1), ("tag", 1)])
@@ -0,0 +1,129 @@
+"""
+Vital Signs - Story Rendering
+Derived fields computed once when a story is approved: a plain-text excerpt,
+word count and reading time for list cards, and a sanitized HTML body for the
+story page (stories approved before this get them on their first page view).
+Bodies are either HTML from the editor or plain text with blank lines between
+paragraphs.
+"""
+
+import html
+import re
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+EXCERPT_CHARS = 220
+WORDS_PER_MINUTE = 200
+
+ALLOWED_TAGS = frozenset({
+    "p", "br", "hr", "strong", "b", "em", "i", "u", "s", "blockquote",
+    "ul", "ol", "li", "h2", "h3", "h4", "a",
+})
+VOID_TAGS = frozenset({"br", "hr"})
+# Elements dropped together with everything inside them
+DROP_CONTENT_TAGS = frozenset({"script", "style", "iframe", "object", "embed", "template", "noscript"})
+SAFE_URL_SCHEMES = frozenset({"http", "https", "mailto"})
+
+TAG_PATTERN = re.compile(r"<[^>]+>")
+# Tags that separate words; inline tags (em, a, ...) are removed without a gap
+BLOCK_TAG_PATTERN = re.compile(r"</?(?:p|br|hr|li|ul|ol|h[1-6]|div|blockquote)\b[^>]*>", re.IGNORECASE)
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def looks_like_html(body: str) -> bool:
+    return bool(TAG_PATTERN.search(body or ""))
+
+
+class _Sanitizer(HTMLParser):
+    """Allowlist sanitizer: keeps ALLOWED_TAGS, safe links and text; escapes the rest"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.out: List[str] = []
+        self.open_tags: List[str] = []
+        self.dropping = 0
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]):
+        if tag in DROP_CONTENT_TAGS:
+            self.dropping += 1
+            return
+        if self.dropping or tag not in ALLOWED_TAGS:
+            return
+        if tag == "a":
+            href = dict(attrs).get("href") or ""
+            if urlparse(href.strip()).scheme.lower() not in SAFE_URL_SCHEMES:
+                self.out.append("<a>")
+            else:
+                self.out.append(f'<a href="{html.escape(href.strip(), quote=True)}" rel="nofollow noopener" target="_blank">')
+        else:
+            self.out.append(f"<{tag}>")
+        if tag not in VOID_TAGS:
+            self.open_tags.append(tag)
+
+    def handle_startendtag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]):
+        if tag in VOID_TAGS and not self.dropping:
+            self.out.append(f"<{tag}>")
+
+    def handle_endtag(self, tag: str):
+        if tag in DROP_CONTENT_TAGS:
+            self.dropping = max(0, self.dropping - 1)
+            return
+        if self.dropping or tag not in self.open_tags:
+            return
+        # Close anything left open inside this element first
+        while self.open_tags:
+            open_tag = self.open_tags.pop()
+            self.out.append(f"</{open_tag}>")
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data: str):
+        if not self.dropping:
+            self.out.append(html.escape(data, quote=False))
+
+    def result(self) -> str:
+        self.close()
+        return "".join(self.out) + "".join(f"</{tag}>" for tag in reversed(self.open_tags))
+
+
+def sanitize_html(body: str) -> str:
+    sanitizer = _Sanitizer()
+    sanitizer.feed(body)
+    return sanitizer.result()
+
+
+def render_body(body: str) -> str:
+    """Sanitized HTML for the story page"""
+    if looks_like_html(body):
+        return sanitize_html(body)
+    paragraphs = [p.strip() for p in re.split(r"\n\s*\n", body or "") if p.strip()]
+    return "".join(
+        "<p>" + html.escape(p, quote=False).replace("\n", "<br>") + "</p>" for p in paragraphs
+    )
+
+
+def plain_text(body: str) -> str:
+    text = body or ""
+    if looks_like_html(text):
+        text = TAG_PATTERN.sub("", BLOCK_TAG_PATTERN.sub(" ", text))
+    return WHITESPACE_PATTERN.sub(" ", html.unescape(text)).strip()
+
+
+def make_excerpt(text: str, limit: int = EXCERPT_CHARS) -> str:
+    if len(text) <= limit:
+        return text
+    cut = text[:limit].rsplit(" ", 1)[0] or text[:limit]
+    return cut.rstrip(" ,.;:") + "…"
+
+
+def render_story(body: str) -> Dict[str, Any]:
+    """Fields stored on a story when it is approved"""
+    text = plain_text(body)
+    word_count = len(text.split())
+    return {
+        "excerpt": make_excerpt(text),
+        "word_count": word_count,
+        "reading_minutes": max(1, round(word_count / WORDS_PER_MINUTE)),
+        "body_html": render_body(body),
+    }
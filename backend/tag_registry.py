@@ -0,0 +1,44 @@
+"""
+Vital Signs - Health Tag Registry
+The set of tags a story may use, read from `health_tags` and shared by every
+worker through a SharedSnapshot. Validation is a set lookup against the
+worker's copy; admins' tag edits reach other workers within one
+revalidation interval.
+"""
+
+from typing import FrozenSet, Iterable, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from shared_snapshot import DEFAULT_REVALIDATE_SECONDS, SharedSnapshot
+
+
+async def _active_tag_names(db: AsyncIOMotorDatabase) -> List[str]:
+    return sorted(await db.health_tags.distinct("name", {"is_active": True}))
+
+
+class TagRegistry:
+    """Active health tag names, cached per process and versioned across workers"""
+
+    def __init__(self, default_tags: Iterable[str], revalidate_seconds: float = DEFAULT_REVALIDATE_SECONDS):
+        # Used only until health_tags has been seeded
+        self.default_tags = frozenset(default_tags)
+        self.snapshot = SharedSnapshot("health_tag_registry", revalidate_seconds)
+        self._version: Optional[int] = None
+        self._names: FrozenSet[str] = frozenset()
+
+    async def allowed(self, db: AsyncIOMotorDatabase) -> FrozenSet[str]:
+        names = await self.snapshot.get(db, _active_tag_names)
+        if self.snapshot.version != self._version:
+            self._version = self.snapshot.version
+            self._names = frozenset(names)
+        return self._names or self.default_tags
+
+    async def invalid_tags(self, db: AsyncIOMotorDatabase, tags: Iterable[str]) -> List[str]:
+        """Tags not in the registry, in the order given"""
+        allowed = await self.allowed(db)
+        return [tag for tag in tags if tag not in allowed]
+
+    async def refresh(self, db: AsyncIOMotorDatabase):
+        """Republish after a tag is created, reactivated or retired"""
+        await self.snapshot.publish(db, await _active_tag_names(db))
@@ -0,0 +1,145 @@
+"""
+CURE - Text Vectors
+Small TF-IDF vectorizer on NumPy shared by the matching and recommendation
+services. Rows are sparse and L2-normalised so a dot product is cosine
+similarity.
+"""
+
+import math
+import re
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# (column indices, values) of one sparse row
+SparseRow = Tuple[np.ndarray, np.ndarray]
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset("""
+a about after all also am an and any are as at be been but by can could did do does
+for from had has have he her his how i if in into is it its just me more my no not
+of on or our out she so some such than that the their them then there these they
+this to too up us was we were what when which who will with would you your
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with stopwords and single characters removed"""
+    return [
+        token for token in TOKEN_PATTERN.findall((text or "").lower())
+        if len(token) > 1 and token not in STOPWORDS
+    ]
+
+
+def normalized_row(columns: Iterable[int], values: Iterable[float]) -> SparseRow:
+    """Sparse row scaled to unit length (all-zero rows stay zero)"""
+    columns = np.asarray(list(columns), dtype=np.int32)
+    values = np.asarray(list(values), dtype=np.float32)
+    norm = np.linalg.norm(values)
+    if norm > 0:
+        values = values / norm
+    return columns, values
+
+
+class SparseRows:
+    """Rows of a sparse matrix, kept as one (columns, values) pair per row.
+
+    Edits touch a single row. Scoring concatenates the rows into flat arrays
+    once (reused until the next edit) and sums the products with a bincount,
+    so the cost follows the number of non-zeros, not rows x vocabulary.
+    """
+
+    def __init__(self, rows: Iterable[SparseRow] = ()):
+        self.rows: List[SparseRow] = list(rows)
+        self._flat: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray, int]] = None
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __getitem__(self, i: int) -> SparseRow:
+        return self.rows[i]
+
+    def __setitem__(self, i: int, row: SparseRow):
+        self.rows[i] = row
+        self._flat = None
+
+    def append(self, row: SparseRow):
+        self.rows.append(row)
+        self._flat = None
+
+    def pop(self, i: int) -> SparseRow:
+        self._flat = None
+        return self.rows.pop(i)
+
+    def _arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, int]:
+        if self._flat is None:
+            lengths = np.fromiter((columns.size for columns, _ in self.rows), dtype=np.int64, count=len(self.rows))
+            owners = np.repeat(np.arange(len(self.rows)), lengths)
+            if lengths.sum():
+                columns = np.concatenate([columns for columns, _ in self.rows])
+                values = np.concatenate([values for _, values in self.rows])
+            else:
+                columns = np.empty(0, dtype=np.int32)
+                values = np.empty(0, dtype=np.float32)
+            self._flat = (owners, columns, values, int(columns.max(initial=-1)) + 1)
+        return self._flat
+
+    def dot(self, row: SparseRow) -> np.ndarray:
+        """Dot product of every stored row with `row`"""
+        owners, columns, values, width = self._arrays()
+        row_columns, row_values = row
+        dense = np.zeros(max(width, int(row_columns.max(initial=-1)) + 1), dtype=np.float32)
+        dense[row_columns] = row_values
+        scores = np.bincount(owners, weights=values * dense[columns], minlength=len(self.rows))
+        return scores.astype(np.float32)
+
+
+class TfidfModel:
+    """Vocabulary and smoothed IDF weights fitted on a token corpus"""
+
+    def __init__(self, vocabulary: Dict[str, int], idf: np.ndarray):
+        self.vocabulary = vocabulary
+        self.idf = idf
+
+    @classmethod
+    def fit(cls, documents: Sequence[Sequence[str]]) -> "TfidfModel":
+        document_frequency: Dict[str, int] = {}
+        for tokens in documents:
+            for token in set(tokens):
+                document_frequency[token] = document_frequency.get(token, 0) + 1
+
+        vocabulary = {token: i for i, token in enumerate(sorted(document_frequency))}
+        n_docs = len(documents)
+        idf = np.empty(len(vocabulary), dtype=np.float32)
+        for token, i in vocabulary.items():
+            idf[i] = math.log((1 + n_docs) / (1 + document_frequency[token])) + 1.0
+        return cls(vocabulary, idf)
+
+    def transform_one(self, tokens: Sequence[str]) -> SparseRow:
+        """Sparse TF-IDF row; tokens unseen at fit time are ignored"""
+        counts: Dict[int, int] = {}
+        for token in tokens:
+            column = self.vocabulary.get(token)
+            if column is not None:
+                counts[column] = counts.get(column, 0) + 1
+        columns = np.fromiter(sorted(counts), dtype=np.int32, count=len(counts))
+        # Sublinear term frequency keeps long profiles from dominating
+        weights = np.log1p(np.array([counts[c] for c in columns], dtype=np.float32)) * self.idf[columns]
+        return normalized_row(columns, weights)
+
+    def transform(self, documents: Iterable[Sequence[str]]) -> SparseRows:
+        """One sparse row per document, in order"""
+        return SparseRows(self.transform_one(tokens) for tokens in documents)
+
+
+def top_k(scores: np.ndarray, k: int, exclude: int = -1) -> List[Tuple[int, float]]:
+    """Indices and scores of the k best positive entries, best first"""
+    scores = scores.astype(np.float32, copy=True)
+    if 0 <= exclude < scores.size:
+        scores[exclude] = -np.inf
+    candidates = np.flatnonzero(scores > 0)
+    if candidates.size > k:
+        candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+    order = np.lexsort((candidates, -scores[candidates]))
+    return [(int(i), float(scores[i])) for i in candidates[order]]
@@ -0,0 +1,113 @@
+"""
+CURE Social - Trending Tags
+Per-tag hashtag counts kept in hourly buckets so trending topics can be
+computed over a sliding window without scanning the posts collection.
+"""
+
+import time
+from datetime import datetime, timezone, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+
+BUCKET_COLLECTION = "tag_buckets"
+DEFAULT_WINDOW_HOURS = 24
+MAX_WINDOW_HOURS = 24 * 7
+CACHE_TTL_SECONDS = 60
+PRUNE_INTERVAL_SECONDS = 3600
+
+# (window_hours, limit) -> (expires_at, results)
+_trending_cache: Dict[Tuple[int, int], Tuple[float, List[Dict[str, Any]]]] = {}
+
+
+def normalize_tag(tag: str) -> str:
+    """Normalize a hashtag so '#AI' and '#ai' count as the same topic"""
+    return tag.strip().lstrip("#").lower()
+
+
+def bucket_key(moment: datetime) -> str:
+    """ISO timestamp of the start of the hour containing `moment`"""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    moment = moment.astimezone(timezone.utc)
+    return moment.replace(minute=0, second=0, microsecond=0).isoformat()
+
+
+def prune_cutoff(now: Optional[datetime] = None, older_than_hours: int = MAX_WINDOW_HOURS) -> str:
+    """Buckets before this key can no longer fall inside any trending window"""
+    return bucket_key((now or datetime.now(timezone.utc)) - timedelta(hours=older_than_hours))
+
+
+async def ensure_indexes(db: AsyncIOMotorDatabase):
+    """Indexes backing bucket upserts and window scans"""
+    await db[BUCKET_COLLECTION].create_index([("tag", 1), ("bucket", 1)], unique=True)
+    await db[BUCKET_COLLECTION].create_index([("bucket", 1)])
+
+
+async def record_tags(db: AsyncIOMotorDatabase, tags: Iterable[str], created_at: Any, delta: int = 1,
+                      now: Optional[datetime] = None):
+    """Add `delta` to the hourly bucket of every tag on a post.
+
+    Called with +1 when a post is created and -1 when it is deleted, using the
+    post's own created_at so the decrement lands in the same bucket. Deleting a
+    post older than the longest window is a no-op: its bucket has been (or is
+    about to be) pruned, and a decrement would only recreate it as a negative.
+    """
+    if isinstance(created_at, str):
+        created_at = datetime.fromisoformat(created_at)
+    if created_at is None:
+        created_at = datetime.now(timezone.utc)
+
+    normalized = {normalize_tag(tag) for tag in tags if tag and normalize_tag(tag)}
+    if not normalized:
+        return
+
+    bucket = bucket_key(created_at)
+    if delta < 0 and bucket < prune_cutoff(now):
+        return
+    operations = [
+        UpdateOne(
+            {"tag": tag, "bucket": bucket},
+            {"$inc": {"count": delta}},
+            upsert=True
+        )
+        for tag in sorted(normalized)
+    ]
+    await db[BUCKET_COLLECTION].bulk_write(operations, ordered=False)
+    _trending_cache.clear()
+
+
+async def get_trending(db: AsyncIOMotorDatabase, window_hours: int = DEFAULT_WINDOW_HOURS,
+                       limit: int = 10, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """Top `limit` tags by post count over the last `window_hours` hours"""
+    window_hours = max(1, min(window_hours, MAX_WINDOW_HOURS))
+    cache_key = (window_hours, limit)
+    cached = _trending_cache.get(cache_key)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+
+    now = now or datetime.now(timezone.utc)
+    # Include the current, partially filled hour in the window
+    window_start = bucket_key(now - timedelta(hours=window_hours - 1))
+
+    pipeline = [
+        {"$match": {"bucket": {"$gte": window_start}}},
+        {"$group": {"_id": "$tag", "count": {"$sum": "$count"}}},
+        {"$match": {"count": {"$gt": 0}}},
+        {"$sort": {"count": -1, "_id": 1}},
+        {"$limit": limit}
+    ]
+    rows = await db[BUCKET_COLLECTION].aggregate(pipeline).to_list(limit)
+    results = [{"tag": row["_id"], "count": row["count"]} for row in rows]
+
+    _trending_cache[cache_key] = (time.monotonic() + CACHE_TTL_SECONDS, results)
+    return results
+
+
+async def prune_buckets(db: AsyncIOMotorDatabase, older_than_hours: int = MAX_WINDOW_HOURS,
+                        now: Optional[datetime] = None):
+    """Drop buckets that can no longer fall inside any trending window (run hourly)"""
+    cutoff = prune_cutoff(now, older_than_hours)
+    result = await db[BUCKET_COLLECTION].delete_many({"bucket": {"$lt": cutoff}})
+    return result.deleted_count
@@ -0,0 +1,148 @@
+"""
+CURE - Webhook Inbox
+Verified webhook events are stored in `webhook_events` under the provider's
+event id and acknowledged straight away; a background worker applies them
+later. The event id is the document _id, so a redelivered event is recognised
+and dropped on insert.
+
+Workers claim one event at a time with an atomic update and a lease, so each
+event is applied by a single worker; a crashed worker's lease expires and the
+event is picked up again. Failures are retried with exponential backoff and
+parked as "dead" after MAX_ATTEMPTS for a person to look at (and re-drive
+with replay_webhooks.py). Lease expiries count as attempts too, so an event
+whose handler hangs or kills its worker ends up dead as well.
+"""
+
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+INBOX_COLLECTION = "webhook_events"
+POLL_INTERVAL_SECONDS = int(os.environ.get("WEBHOOK_INBOX_POLL_SECONDS", 5))
+MAX_ATTEMPTS = 8
+BASE_RETRY_SECONDS = 30
+MAX_RETRY_SECONDS = 3600
+LEASE_SECONDS = 120
+BATCH_SIZE = 50
+
+PENDING, PROCESSING, DONE, DEAD = "pending", "processing", "done", "dead"
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """30s, 1m, 2m, 4m... capped at an hour"""
+    return timedelta(seconds=min(BASE_RETRY_SECONDS * 2 ** max(attempts - 1, 0), MAX_RETRY_SECONDS))
+
+
+async def record(db: AsyncIOMotorDatabase, event_id: str, provider: str, event_type: str,
+                 payload: Dict[str, Any], now: Optional[datetime] = None) -> bool:
+    """Store a new event; False when this event id was already received"""
+    now = now or datetime.now(timezone.utc)
+    try:
+        await db[INBOX_COLLECTION].insert_one({
+            "_id": event_id,
+            "provider": provider,
+            "event_type": event_type,
+            "payload": payload,
+            "status": PENDING,
+            "attempts": 0,
+            "received_at": now.isoformat(),
+            "next_attempt_at": now.isoformat(),
+        })
+    except DuplicateKeyError:
+        return False
+    return True
+
+
+async def _claim(db: AsyncIOMotorDatabase, now: datetime,
+                 event_ids: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+    stamp = now.isoformat()
+    query: Dict[str, Any] = {"$or": [
+        {"status": PENDING, "next_attempt_at": {"$lte": stamp}},
+        {"status": PROCESSING, "lease_until": {"$lt": stamp}},
+    ]}
+    if event_ids is not None:
+        query["_id"] = {"$in": event_ids}
+    return await db[INBOX_COLLECTION].find_one_and_update(
+        query,
+        {"$set": {"status": PROCESSING, "lease_until": (now + timedelta(seconds=LEASE_SECONDS)).isoformat()},
+         "$inc": {"attempts": 1}},
+        sort=[("next_attempt_at", 1)],
+        return_document=ReturnDocument.AFTER
+    )
+
+
+async def process_pending(db: AsyncIOMotorDatabase,
+                          handler: Callable[[Dict[str, Any]], Awaitable[None]],
+                          now: Optional[datetime] = None,
+                          event_ids: Optional[List[str]] = None) -> int:
+    """Apply due events with `handler` (only `event_ids`, when given); returns
+    how many were claimed"""
+    claimed = 0
+    while claimed < BATCH_SIZE:
+        current = now or datetime.now(timezone.utc)
+        event = await _claim(db, current, event_ids)
+        if event is None:
+            break
+        claimed += 1
+        if event["attempts"] > MAX_ATTEMPTS:
+            # Reclaimed after its lease ran out once too often
+            await db[INBOX_COLLECTION].update_one({"_id": event["_id"]}, {
+                "$set": {"status": DEAD, "last_error": f"lease expired after {MAX_ATTEMPTS} attempts"},
+                "$unset": {"lease_until": ""},
+            })
+            print(f"☠️ Webhook event {event['_id']} abandoned after {MAX_ATTEMPTS} attempts")
+            continue
+        try:
+            await handler(event)
+        except Exception as e:
+            dead = event["attempts"] >= MAX_ATTEMPTS
+            await db[INBOX_COLLECTION].update_one({"_id": event["_id"]}, {
+                "$set": {
+                    "status": DEAD if dead else PENDING,
+                    "last_error": str(e)[:500],
+                    "next_attempt_at": (current + retry_delay(event["attempts"])).isoformat(),
+                },
+                "$unset": {"lease_until": ""},
+            })
+            print(f"{'☠️' if dead else '⚠️'} Webhook event {event['_id']} failed (attempt {event['attempts']}): {e}")
+            continue
+        await db[INBOX_COLLECTION].update_one({"_id": event["_id"]}, {
+            "$set": {"status": DONE, "processed_at": datetime.now(timezone.utc).isoformat()},
+            "$unset": {"lease_until": "", "last_error": ""},
+        })
+    return claimed
+
+
+def is_paid_checkout(event: Dict[str, Any]) -> bool:
+    """A completed checkout whose payment went through (async methods such as
+    bank debits complete the session before the money arrives)"""
+    return event["event_type"] == "checkout.session.completed" and \
+        event["payload"].get("payment_status") == "paid"
+
+
+async def has_paid_checkout(db: AsyncIOMotorDatabase, session_id: str) -> bool:
+    """Whether a verified paid-checkout event was received for a session"""
+    return await db[INBOX_COLLECTION].find_one({
+        "payload.session_id": session_id,
+        "event_type": "checkout.session.completed",
+        "payload.payment_status": "paid",
+    }, {"_id": 1}) is not None
+
+
+async def requeue(db: AsyncIOMotorDatabase, query: Dict[str, Any]) -> int:
+    """Put stored events back in the queue with a fresh attempt budget"""
+    result = await db[INBOX_COLLECTION].update_many(query, {
+        "$set": {"status": PENDING, "attempts": 0, "next_attempt_at": datetime.now(timezone.utc).isoformat()},
+        "$unset": {"lease_until": "", "last_error": ""},
+    })
+    return result.modified_count
+
+
+async def ensure_indexes(db: AsyncIOMotorDatabase):
+    await db[INBOX_COLLECTION].create_index([("status", 1), ("next_attempt_at", 1)])
+    await db[INBOX_COLLECTION].create_index([("status", 1), ("lease_until", 1)])
+    await db[INBOX_COLLECTION].create_index([("payload.session_id", 1)])
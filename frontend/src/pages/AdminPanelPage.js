@@ -402,6 +402,22 @@ const AdminPanelPage = () => {
 // Poster Management Tab Component
 
 
+// Earlier submissions flagged as near-duplicates at submission time
+const DuplicateNotice = ({ candidates }) => (
+  candidates && candidates.length > 0 ? (
+    <div className="duplicate-notice">
+      <strong>Possible duplicate of:</strong>
+      <ul>
+        {candidates.map((candidate) => (
+          <li key={candidate.id}>
+            {candidate.title} ({candidate.status}, {Math.round(candidate.similarity * 100)}% similar)
+          </li>
+        ))}
+      </ul>
+    </div>
+  ) : null
+);
+
 // Article Management Tab Component
 const ArticleManagementTab = ({ articles, onReview, onMarkPayment, onDelete }) => (
   <div className="admin-section">
@@ -425,6 +441,8 @@ const ArticleManagementTab = ({ articles, onReview, onMarkPayment, onDelete }) =
               </div>
             </div>
             
+            <DuplicateNotice candidates={article.duplicate_candidates} />
+            
             <div className="poster-details">
               <div className="poster-authors">
                 <strong>Authors:</strong> {article.authors}
@@ -514,6 +532,8 @@ const PosterManagementTab = ({ posters, onReview, onDelete, onMarkPayment }) =>
               </div>
             </div>
             
+            <DuplicateNotice candidates={poster.duplicate_candidates} />
+            
             <div className="poster-details">
               <div className="poster-authors">
                 <strong>Authors:</strong> {poster.authors.join(', ')}
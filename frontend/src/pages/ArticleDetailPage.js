@@ -194,7 +194,7 @@ const ArticleDetailPage = () => {
         {article.pdf_url && (
           <div className="article-section">
             <a
-              href={article.pdf_url}
+              href={`${API}/journal/articles/${article.id}/pdf?download=true`}
               target="_blank"
               rel="noopener noreferrer"
               className="download-pdf-button"
@@ -42,13 +42,19 @@ const CureJournalPage = () => {
     navigate('/submit-article');
   };
 
-  const handleReadArticle = (article) => {
+  const handleReadArticle = async (article) => {
     if (article.cure_identifier) {
       navigate(`/journal/article/${article.cure_identifier}`);
     } else {
-      // Fallback for old articles without identifier
-      setSelectedArticle(article);
-      setShowArticleModal(true);
+      // Fallback for old articles without identifier; the list only has summaries
+      try {
+        const response = await axios.get(`${API}/journal/articles/${article.id}`);
+        setSelectedArticle(response.data);
+        setShowArticleModal(true);
+      } catch (error) {
+        console.error('Error loading article:', error);
+        toast.error('Failed to load article');
+      }
     }
   };
 
@@ -128,7 +134,7 @@ const CureJournalPage = () => {
                   <span>{article.authors}</span>
                 </div>
                 
-                <p className="article-abstract">{article.abstract}</p>
+                <p className="article-abstract">{article.excerpt}</p>
                 
                 {article.keywords && (
                   <div className="article-keywords">
@@ -90,7 +90,7 @@ const PosterJournalPage = () => {
         <span className="poster-university">{poster.university}</span>
         <span className="poster-program">{poster.program}</span>
       </div>
-      <p className="poster-abstract">{poster.abstract}</p>
+      <p className="poster-abstract">{poster.excerpt}</p>
       <div className="poster-keywords">
         {poster.keywords.map((keyword, index) => (
           <span key={index} className="keyword-tag">{keyword}</span>
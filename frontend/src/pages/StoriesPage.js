@@ -4,13 +4,8 @@ import { useNavigate, useSearchParams } from 'react-router-dom';
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
 
-const stripHtml = (s) => (s || '').replace(/<[^>]*>/g, '');
-const truncate = (s, n = 200) => {
-  const t = stripHtml(s);
-  return t.length <= n ? t : t.slice(0, n).trim() + '…';
-};
 const formatDate = (d) => d ? new Date(d).toLocaleDateString('en-US', { month: 'short', day: 'numeric' }).toUpperCase() : '';
-const readTime = (text) => `${Math.max(1, Math.round(stripHtml(text).split(/\s+/).length / 200))} MIN READ`;
+const readTime = (minutes) => `${minutes || 1} MIN READ`;
 
 const StoriesPage = () => {
   const navigate = useNavigate();
@@ -19,7 +14,7 @@ const StoriesPage = () => {
   const [stories, setStories] = useState([]);
   const [tags, setTags] = useState([]);
   const [loading, setLoading] = useState(true);
-  const [page, setPage] = useState(1);
+  const [nextCursor, setNextCursor] = useState(null);
   const [hasMore, setHasMore] = useState(false);
   const [total, setTotal] = useState(0);
 
@@ -30,18 +25,19 @@ const StoriesPage = () => {
     fetch(`${API}/tags`).then(r => r.ok ? r.json() : []).then(setTags).catch(() => {});
   }, []);
 
-  useEffect(() => { fetchStories(1); /* eslint-disable-next-line */ }, [selectedTag, sort]);
+  useEffect(() => { fetchStories(null); /* eslint-disable-next-line */ }, [selectedTag, sort]);
 
-  const fetchStories = async (n) => {
+  const fetchStories = async (cursor) => {
     setLoading(true);
     try {
-      let url = `${API}/stories?page=${n}&limit=10&sort=${sort}`;
+      let url = `${API}/stories?limit=10&sort=${sort}`;
       if (selectedTag) url += `&tag=${encodeURIComponent(selectedTag)}`;
+      if (cursor) url += `&cursor=${encodeURIComponent(cursor)}`;
       const res = await fetch(url);
       if (res.ok) {
         const data = await res.json();
-        setStories(n === 1 ? data.stories : [...stories, ...data.stories]);
-        setPage(n);
+        setStories(cursor ? [...stories, ...data.stories] : data.stories);
+        setNextCursor(data.next_cursor);
         setHasMore(data.has_more);
         setTotal(data.total);
       }
@@ -107,7 +103,7 @@ const StoriesPage = () => {
       <section>
         <div className="vs-container">
           <div className="vs-story-list">
-            {loading && page === 1 && [1, 2, 3].map(i => (
+            {loading && stories.length === 0 && [1, 2, 3].map(i => (
               <div key={i} className="vs-loading-row">
                 <div className="vs-skeleton vs-skel-tag" />
                 <div className="vs-skeleton vs-skel-title" />
@@ -137,9 +133,9 @@ const StoriesPage = () => {
                   {s.tags?.slice(0, 3).map(t => <span key={t} className="vs-chip">{t}</span>)}
                 </div>
                 <h3 className="vs-story-card-title">{s.title}</h3>
-                <p className="vs-story-card-excerpt">{truncate(s.body, 220)}</p>
+                <p className="vs-story-card-excerpt">{s.excerpt}</p>
                 <div className="vs-story-card-footer">
-                  <span>— {s.author_name || 'Anonymous'} · {readTime(s.body)}</span>
+                  <span>— {s.author_name || 'Anonymous'} · {readTime(s.reading_minutes)}</span>
                   <span className="right">
                     {formatDate(s.published_at)}
                     <span className="vs-story-card-arrow">→</span>
@@ -154,7 +150,7 @@ const StoriesPage = () => {
               <button
                 className="vs-btn vs-btn--ghost"
                 disabled={loading}
-                onClick={() => fetchStories(page + 1)}
+                onClick={() => fetchStories(nextCursor)}
               >
                 {loading ? 'Loading…' : 'Load more →'}
               </button>
@@ -11,10 +11,7 @@ const formatDate = (d) => d ? new Date(d).toLocaleDateString('en-US', {
   month: 'long', day: 'numeric', year: 'numeric'
 }).toUpperCase() : '';
 
-const readTime = (text) => {
-  const w = (text || '').replace(/<[^>]*>/g, '').split(/\s+/).length;
-  return `${Math.max(1, Math.round(w / 200))} MIN READ`;
-};
+const readTime = (minutes) => `${minutes || 1} MIN READ`;
 
 const StoryDetailPage = () => {
   const { storyId } = useParams();
@@ -26,12 +23,14 @@ const StoryDetailPage = () => {
   const [resonating, setResonating] = useState(false);
   const [copied, setCopied] = useState(false);
 
-  useEffect(() => { fetchStory(); /* eslint-disable-next-line */ }, [storyId]);
+  useEffect(() => { fetchStory(); /* eslint-disable-next-line */ }, [storyId, token]);
 
   const fetchStory = async () => {
     setLoading(true);
     try {
-      const res = await fetch(`${API}/stories/${storyId}`);
+      const res = await fetch(`${API}/stories/${storyId}`, {
+        headers: token ? { Authorization: `Bearer ${token}` } : {},
+      });
       if (res.ok) setStory(await res.json());
       else if (res.status === 404) { toast.error('Story not found'); navigate('/stories'); }
     } finally { setLoading(false); }
@@ -63,13 +62,8 @@ const StoryDetailPage = () => {
     setTimeout(() => setCopied(false), 1800);
   };
 
-  const renderBody = (body) => {
-    if (!body) return null;
-    if (body.includes('<') && body.includes('>')) {
-      return <div dangerouslySetInnerHTML={{ __html: body }} />;
-    }
-    return body.split(/\n\n+/).map((p, i) => <p key={i}>{p}</p>);
-  };
+  // body_html is sanitized server-side when the story is approved (or first read)
+  const renderBody = (bodyHtml) => bodyHtml ? <div dangerouslySetInnerHTML={{ __html: bodyHtml }} /> : null;
 
   if (loading) {
     return (
@@ -116,14 +110,14 @@ const StoryDetailPage = () => {
         <div className="vs-article-meta">
           <span>— BY {(story.author_name || 'ANONYMOUS').toUpperCase()}</span>
           <span className="dot">·</span>
-          <span>{readTime(story.body)}</span>
+          <span>{readTime(story.reading_minutes)}</span>
           <span className="dot">·</span>
           <span>{formatDate(story.published_at)}</span>
           {story.university && (<><span className="dot">·</span><span>{story.university.toUpperCase()}</span></>)}
         </div>
 
         <div className="vs-article-body">
-          {renderBody(story.body)}
+          {renderBody(story.body_html)}
         </div>
 
         <div className="vs-article-end">
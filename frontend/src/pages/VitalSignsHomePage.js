@@ -5,19 +5,11 @@ import { useAuth } from '../hooks/useAuth';
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
 
-const stripHtml = (s) => (s || '').replace(/<[^>]*>/g, '');
-const truncate = (s, n = 180) => {
-  const t = stripHtml(s);
-  return t.length <= n ? t : t.slice(0, n).trim() + '…';
-};
 const formatDate = (d) => {
   if (!d) return '';
   return new Date(d).toLocaleDateString('en-US', { month: 'short', day: 'numeric' }).toUpperCase();
 };
-const readTime = (text) => {
-  const w = stripHtml(text).split(/\s+/).length;
-  return `${Math.max(1, Math.round(w / 200))} MIN READ`;
-};
+const readTime = (minutes) => `${minutes || 1} MIN READ`;
 
 const VitalSignsHomePage = () => {
   const navigate = useNavigate();
@@ -108,9 +100,9 @@ const VitalSignsHomePage = () => {
                   {s.tags?.slice(0, 2).map(t => <span key={t} className="vs-chip">{t}</span>)}
                 </div>
                 <h3 className="vs-story-card-title">{s.title}</h3>
-                <p className="vs-story-card-excerpt">{truncate(s.body, 200)}</p>
+                <p className="vs-story-card-excerpt">{s.excerpt}</p>
                 <div className="vs-story-card-footer">
-                  <span>— {s.author_name || 'Anonymous'} · {readTime(s.body)}</span>
+                  <span>— {s.author_name || 'Anonymous'} · {readTime(s.reading_minutes)}</span>
                   <span className="right">
                     {formatDate(s.published_at)}
                     <span className="vs-story-card-arrow">→</span>
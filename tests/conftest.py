@@ -0,0 +1,8 @@
+import sys
+from pathlib import Path
+
+# Backend modules import their siblings by name, exactly as they do when the
+# app is started from inside backend/
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
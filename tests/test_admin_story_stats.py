@@ -0,0 +1,120 @@
+import pytest
+
+import server
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, field, direction):
+        self.docs.sort(key=lambda d: d[field], reverse=direction < 0)
+        return self
+
+    def skip(self, count):
+        self.docs = self.docs[count:]
+        return self
+
+    def limit(self, count):
+        self.docs = self.docs[:count]
+        return self
+
+    async def to_list(self, length):
+        return self.docs if length is None else self.docs[:length]
+
+
+class FakeStories:
+    """Page reads and the resonance sum only; counting stories is not supported"""
+
+    def __init__(self, docs):
+        self.docs = docs
+
+    def find(self, query, projection=None):
+        return FakeCursor([dict(d) for d in self.docs if all(d.get(k) == v for k, v in query.items())])
+
+    def aggregate(self, pipeline):
+        status = pipeline[0]["$match"]["status"]
+        total = sum(d.get("resonance_count", 0) for d in self.docs if d["status"] == status)
+        return FakeCursor([{"_id": None, "total_resonance": total}])
+
+
+class FakeCounters:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def find(self, query, projection=None):
+        if "_id" in query:
+            return FakeCursor([d for d in self.docs if d["_id"] in query["_id"]["$in"]])
+        return FakeCursor([d for d in self.docs if d["status"] == query["status"] and d["tag"] is not None])
+
+
+class FakeDB:
+    def __init__(self):
+        self.stories = FakeStories([
+            {"id": "s1", "status": "pending", "created_at": "2026-03-01T10:00:00+00:00"},
+            {"id": "s2", "status": "pending", "created_at": "2026-03-02T10:00:00+00:00"},
+            {"id": "s3", "status": "approved", "created_at": "2026-03-03T10:00:00+00:00", "resonance_count": 5},
+        ])
+        self.story_counters = FakeCounters([
+            {"_id": "pending", "status": "pending", "tag": None, "count": 2},
+            {"_id": "approved", "status": "approved", "tag": None, "count": 1},
+            {"_id": "approved|Grief", "status": "approved", "tag": "Grief", "count": 1},
+            {"_id": "approved|Anxiety", "status": "approved", "tag": "Anxiety", "count": 1},
+            {"_id": "approved|Burnout", "status": "approved", "tag": "Burnout", "count": 2},
+        ])
+
+    def __getitem__(self, name):
+        return getattr(self, name)
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    fake_database = FakeDB()
+    monkeypatch.setattr(server, "db", fake_database)
+    return fake_database
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+def make_user(user_type):
+    return server.User(id=f"{user_type}-id", email=f"{user_type}@example.com", name=user_type, user_type=user_type)
+
+
+@pytest.mark.anyio
+async def test_moderation_queue_totals_come_from_the_counters(fake_db):
+    result = await server.admin_get_all_stories(status="pending", page=1, limit=1, current_user=make_user("admin"))
+
+    assert [s["id"] for s in result["stories"]] == ["s2"]
+    assert result["total"] == 2
+    assert result["counts"] == {"pending": 2, "approved": 1, "rejected": 0, "edit_requested": 0}
+
+    everything = await server.admin_get_all_stories(status=None, page=2, limit=2, current_user=make_user("admin"))
+    assert everything["total"] == 3 and [s["id"] for s in everything["stories"]] == ["s1"]
+
+
+@pytest.mark.anyio
+async def test_analytics_reads_counters_and_sums_resonance(fake_db):
+    result = await server.admin_get_analytics(current_user=make_user("admin"))
+
+    assert result == {
+        "total_submitted": 3,
+        "total_approved": 1,
+        "total_rejected": 0,
+        "total_pending": 2,
+        "total_resonance": 5,
+        "top_tags": [
+            {"tag": "Burnout", "count": 2},
+            {"tag": "Anxiety", "count": 1},
+            {"tag": "Grief", "count": 1},
+        ],
+    }
+
+
+@pytest.mark.anyio
+async def test_story_dashboards_are_admin_only(fake_db):
+    with pytest.raises(server.HTTPException) as error:
+        await server.admin_get_analytics(current_user=make_user("student"))
+    assert error.value.status_code == 403
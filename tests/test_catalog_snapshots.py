@@ -0,0 +1,65 @@
+import gzip
+import json
+
+import pytest
+
+import catalog_snapshots
+from catalog_snapshots import StaticSnapshot
+
+
+class FakeRequest:
+    def __init__(self, **headers):
+        self.headers = {key.replace("_", "-"): value for key, value in headers.items()}
+
+
+def test_accepted_encoding_respects_quality():
+    available = {"identity": b"", "gzip": b"", "br": b""}
+    assert catalog_snapshots.accepted_encoding("gzip, deflate, br", available) == "br"
+    assert catalog_snapshots.accepted_encoding("br;q=0, gzip", available) == "gzip"
+    assert catalog_snapshots.accepted_encoding("br", {"identity": b"", "gzip": b""}) == "identity"
+    assert catalog_snapshots.accepted_encoding(None, available) == "identity"
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.mark.anyio
+async def test_serves_precompressed_bytes_with_per_coding_etag(tmp_path):
+    snapshot = StaticSnapshot("posters", directory=tmp_path)
+    assert await snapshot.response(FakeRequest()) is None
+
+    payload = [{"id": "p1", "title": "Café posters"}]
+    await snapshot.publish(payload)
+    plain = await snapshot.response(FakeRequest())
+    zipped = await snapshot.response(FakeRequest(accept_encoding="gzip;q=1, br;q=0"))
+
+    assert json.loads(plain.body) == payload
+    assert zipped.headers["content-encoding"] == "gzip"
+    assert json.loads(gzip.decompress(zipped.body)) == payload
+    assert plain.headers["etag"] != zipped.headers["etag"]
+    assert zipped.headers["vary"] == "Accept-Encoding"
+
+    cached = await snapshot.response(FakeRequest(accept_encoding="gzip;q=1, br;q=0",
+                                           if_none_match=zipped.headers["etag"]))
+    assert cached.status_code == 304
+
+
+@pytest.mark.anyio
+async def test_new_version_swaps_pointer_and_prunes_old_files(tmp_path):
+    snapshot = StaticSnapshot("journal_articles", directory=tmp_path)
+    first = snapshot.write([1])
+    second = snapshot.write([1, 2])
+    third = snapshot.write([1, 2, 3])
+
+    # Another worker's instance picks the new version up from disk
+    reader = StaticSnapshot("journal_articles", directory=tmp_path)
+    assert json.loads((await reader.response(FakeRequest())).body) == [1, 2, 3]
+
+    names = {path.name for path in tmp_path.iterdir()}
+    assert not any(first in name for name in names)
+    assert any(second in name for name in names) and any(third in name for name in names)
+    # Rendering an unchanged list keeps the current files
+    assert snapshot.write([1, 2, 3]) == third
+    assert {path.name for path in tmp_path.iterdir()} == names
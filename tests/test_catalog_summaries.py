@@ -0,0 +1,117 @@
+import pytest
+from types import SimpleNamespace
+
+import server
+
+
+def project(doc, projection):
+    """Inclusion projections (with $substrCP) or exclusion projections"""
+    if any(value == 1 or isinstance(value, dict) for value in projection.values()):
+        out = {}
+        for field, value in projection.items():
+            if isinstance(value, dict):
+                source, start, length = value["$substrCP"]
+                out[field] = doc.get(source.lstrip("$"), "")[start:start + length]
+            elif value and field in doc:
+                out[field] = doc[field]
+        return out
+    return {k: v for k, v in doc.items() if projection.get(k, 1)}
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def to_list(self, length):
+        return self.docs[:length]
+
+
+class FakeCollection:
+    def __init__(self, docs):
+        self.docs = docs
+        self.projections = []
+
+    def _matching(self, query):
+        return [d for d in self.docs if all(d.get(k) == v for k, v in query.items())]
+
+    def find(self, query, projection=None):
+        self.projections.append(projection)
+        return FakeCursor([project(d, projection) for d in self._matching(query)])
+
+    async def find_one(self, query, projection=None):
+        docs = self._matching(query)
+        return project(docs[0], projection) if docs else None
+
+
+def poster(poster_id, university, **extra):
+    return {
+        "_id": f"mongo-{poster_id}", "id": poster_id, "title": f"Poster {poster_id}", "authors": ["Ada"],
+        "abstract": "A" * 500, "keywords": ["neuro"], "university": university, "program": "MD",
+        "poster_url": f"file-{poster_id}", "submitted_by": "u1", "submitter_email": "ada@example.com",
+        "status": "approved", "submitted_at": "2025-11-03T10:00:00+00:00", "payment_status": "completed",
+        "payment_link": "https://pay.example/abc", "stripe_session_id": "cs_123",
+        "reviewer_comments": "Looks good", "lsh_bands": ["b1"], "body_text": "full text", **extra,
+    }
+
+
+class FakeDB:
+    def __init__(self):
+        self.poster_submissions = FakeCollection([
+            poster("p1", "McGill University"),
+            poster("p2", "York University"),
+            poster("p3", "McGill University", payment_status="pending"),
+        ])
+        self.journal_articles = FakeCollection([{
+            "_id": "mongo-a1", "id": "a1", "cure_identifier": "NSR.2026.001", "title": "Article",
+            "authors": "Ada, Grace", "abstract": "short abstract", "keywords": "mri", "university": "McGill University",
+            "program": "MD", "article_type": "review", "publication_year": 2026, "status": "published",
+            "submitted_at": "2025-12-30T10:00:00+00:00", "payment_status": "completed",
+            "stripe_session_id": "cs_456", "reviewer_comments": "Accept", "submitted_by": "u1",
+        }])
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    fake_database = FakeDB()
+    monkeypatch.setattr(server, "db", fake_database)
+    return fake_database
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.mark.anyio
+async def test_poster_list_reads_only_card_fields(fake_db):
+    posters = await server.get_posters(SimpleNamespace(headers={}), university="McGill University")
+
+    assert [p.id for p in posters] == ["p1"]
+    card = posters[0].model_dump()
+    assert card["excerpt"] == "A" * server.SUMMARY_EXCERPT_CHARS and card["year"] == 2025
+    assert "abstract" not in card and "payment_link" not in card
+    # Payment, review and index fields never leave Mongo for a list
+    read = fake_db.poster_submissions.projections[0]
+    assert not {"payment_link", "stripe_session_id", "reviewer_comments", "lsh_bands", "body_text"} & set(read)
+
+
+@pytest.mark.anyio
+async def test_article_list_uses_publication_year(fake_db):
+    articles = await server.list_article_summaries()
+
+    assert len(articles) == 1
+    card = articles[0].model_dump()
+    assert card["year"] == 2026 and card["excerpt"] == "short abstract"
+    assert card["cure_identifier"] == "NSR.2026.001" and card["article_type"] == "review"
+    assert "stripe_session_id" not in fake_db.journal_articles.projections[0]
+
+
+@pytest.mark.anyio
+async def test_poster_detail_serves_the_full_public_poster(fake_db):
+    full = await server.get_poster("p1")
+    assert full.abstract == "A" * 500
+    assert full.payment_link is None and full.stripe_session_id is None and full.submitter_email is None
+
+    with pytest.raises(server.HTTPException) as error:
+        await server.get_poster("p3")
+    assert error.value.status_code == 404
@@ -0,0 +1,94 @@
+from datetime import date, datetime, timezone
+
+import pytest
+
+import daily_rollups
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def to_list(self, length):
+        return self.docs
+
+
+class FakeCollection:
+    def __init__(self, docs=None):
+        self.docs = [dict(d) for d in docs or []]
+        self.matches = []
+
+    def aggregate(self, pipeline):
+        match, group = pipeline[0]["$match"], pipeline[1]["$group"]
+        self.matches.append(match)
+        field = group["_id"]["$substrBytes"][0][1:]
+        totals = {}
+        for doc in self.docs:
+            value = doc.get(field)
+            if not isinstance(value, str) or not (match[field]["$gte"] <= value < match[field]["$lt"]):
+                continue
+            if any(doc.get(k) != v for k, v in match.items() if k != field):
+                continue
+            amount = group["total"]["$sum"]
+            amount = doc[amount[1:]] if isinstance(amount, str) else amount
+            totals[value[:10]] = totals.get(value[:10], 0) + amount
+        return FakeCursor([{"_id": day, "total": total} for day, total in totals.items()])
+
+    def find(self, query):
+        return FakeCursor([d for d in self.docs if d["_id"] >= query["_id"]["$gte"]])
+
+    async def find_one(self, query):
+        return next((dict(d) for d in self.docs if d["_id"] == query["_id"]), None)
+
+    async def bulk_write(self, operations, ordered=True):
+        for op in operations:
+            self.docs = [d for d in self.docs if d["_id"] != op._filter["_id"]] + [dict(op._doc)]
+
+    async def update_one(self, query, update, upsert=False):
+        self.docs = [d for d in self.docs if d["_id"] != query["_id"]] + [{"_id": query["_id"], **update["$set"]}]
+
+
+class FakeDB:
+    def __init__(self):
+        self.stories = FakeCollection([
+            {"created_at": "2026-03-01T09:00:00+00:00", "published_at": "2026-03-02T10:00:00+00:00", "status": "approved"},
+            {"created_at": "2026-03-02T11:00:00+00:00", "status": "pending"},
+        ])
+        self.story_resonances = FakeCollection([{"created_at": "2026-03-02T12:00:00+00:00"}])
+        self.users = FakeCollection([{"created_at": "2026-02-28T08:00:00+00:00"}])
+        self.posts = FakeCollection()
+        self.payment_transactions = FakeCollection([
+            {"completed_at": "2026-03-02T13:00:00+00:00", "payment_status": "completed", "amount": 25.0},
+        ])
+        self.daily_rollups = FakeCollection()
+        self.rollup_state = FakeCollection()
+
+    def __getitem__(self, name):
+        return getattr(self, name)
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.mark.anyio
+async def test_backfill_then_incremental_run_only_reads_from_watermark_day():
+    db = FakeDB()
+    await daily_rollups.run_rollup(db, now=datetime(2026, 3, 2, 18, tzinfo=timezone.utc))
+
+    series = await daily_rollups.get_series(db, days=4, today=date(2026, 3, 3))
+    assert [d["day"] for d in series] == ["2026-02-28", "2026-03-01", "2026-03-02", "2026-03-03"]
+    assert series[0]["signups"] == 1
+    assert series[1]["story_submissions"] == 1
+    assert series[2]["story_approvals"] == 1 and series[2]["resonances"] == 1
+    assert series[2]["payment_revenue"] == 25.0 and series[2]["payments_completed"] == 1
+    assert series[3]["story_submissions"] == 0
+
+    db.posts.docs.append({"created_at": "2026-03-03T07:00:00+00:00"})
+    await daily_rollups.run_rollup(db, now=datetime(2026, 3, 3, 9, tzinfo=timezone.utc))
+
+    assert db.posts.matches[-1]["created_at"]["$gte"] == "2026-03-02"
+    series = await daily_rollups.get_series(db, days=2, today=date(2026, 3, 3))
+    assert series[0]["story_approvals"] == 1  # the re-read day keeps its totals
+    assert series[1]["posts"] == 1
@@ -0,0 +1,162 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from bson import ObjectId
+
+import document_text
+
+
+class FakeSubmissions:
+    def __init__(self, docs, file_field):
+        self.docs = docs
+        self.file_field = file_field
+        self.queries = []
+
+    def _pending(self, doc, query):
+        if doc.get(self.file_field) in query[self.file_field]["$nin"]:
+            return False
+        if doc.get("text_source") != query["text_source"]:
+            return False
+        retry_at = doc.get("text_retry_at")
+        return retry_at is None or retry_at <= query["$or"][1]["text_retry_at"]["$lte"]
+
+    async def find_one_and_update(self, query, update, projection=None, return_document=None):
+        self.queries.append(query)
+        for doc in self.docs:
+            if self._pending(doc, query):
+                doc.update(update["$set"])
+                for field, amount in update["$inc"].items():
+                    doc[field] = doc.get(field, 0) + amount
+                return dict(doc)
+        return None
+
+    async def update_one(self, query, update):
+        for doc in self.docs:
+            if all(doc.get(field) == value for field, value in query.items()):
+                doc.update(update.get("$set", {}))
+                for field in update.get("$unset", {}):
+                    doc.pop(field, None)
+
+
+class FakeTexts:
+    def __init__(self):
+        self.docs = {}
+
+    async def find_one(self, query):
+        return self.docs.get(query["_id"])
+
+    async def replace_one(self, query, doc, upsert=False):
+        self.docs[query["_id"]] = doc
+
+
+class FakeGridOut:
+    def __init__(self, data):
+        self.data = data
+
+    async def read(self):
+        return self.data
+
+
+class FakeFS:
+    def __init__(self, files):
+        self.files = files
+
+    async def open_download_stream(self, file_id):
+        return FakeGridOut(self.files[str(file_id)])
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.mark.anyio
+async def test_extracts_each_distinct_file_once(monkeypatch):
+    calls = []
+
+    def fake_extract(data):
+        calls.append(data)
+        return {"status": "ok", "text": f"text of {len(data)} bytes", "pages": 1}
+
+    monkeypatch.setattr(document_text, "PdfReader", object())
+    monkeypatch.setattr(document_text, "extract_pdf_text", fake_extract)
+
+    pdf, image = str(ObjectId()), str(ObjectId())
+    copy = str(ObjectId())
+    fs = FakeFS({pdf: b"%PDF-1.7 paper", copy: b"%PDF-1.7 paper", image: b"\x89PNG"})
+    articles = FakeSubmissions([
+        {"id": "a1", "pdf_url": pdf},
+        {"id": "a2", "pdf_url": copy},
+        {"id": "a3", "pdf_url": None},
+    ], "pdf_url")
+    posters = FakeSubmissions([{"id": "p1", "poster_url": image}], "poster_url")
+    texts = FakeTexts()
+    db = {"journal_articles": articles, "poster_submissions": posters, "document_texts": texts}
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        assert await document_text.run_pending(db, fs, executor) == 3
+        assert await document_text.run_pending(db, fs, executor) == 0
+
+    # Same bytes under two file ids are parsed once
+    assert len(calls) == 1 and len(texts.docs) == 1
+    assert articles.docs[0]["body_text"] == articles.docs[1]["body_text"] == "text of 14 bytes"
+    assert articles.docs[0]["content_sha256"] in texts.docs
+    assert "text_source" not in articles.docs[2]
+    assert posters.docs[0]["text_source"] == image and posters.docs[0]["body_text"] == ""
+    assert "text_attempts" not in articles.docs[0]
+    # Plain field conditions, answerable from the compound index
+    assert "$expr" not in articles.queries[0] and articles.queries[0]["text_source"] is None
+
+    # A replaced file (text_source unset with it) is extracted again
+    revised = str(ObjectId())
+    fs.files[revised] = b"%PDF-1.7 revised paper"
+    articles.docs[0]["pdf_url"] = revised
+    del articles.docs[0]["text_source"]
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        assert await document_text.run_pending(db, fs, executor) == 1
+    assert articles.docs[0]["text_source"] == revised
+    assert articles.docs[0]["body_text"] == "text of 22 bytes"
+
+
+@pytest.mark.anyio
+async def test_failures_are_retried_then_given_up(monkeypatch):
+    monkeypatch.setattr(document_text, "PdfReader", object())
+    monkeypatch.setattr(document_text, "MAX_ATTEMPTS", 2)
+    monkeypatch.setattr(document_text, "extract_pdf_text",
+                        lambda data: {"status": "failed", "text": "", "error": "encrypted"})
+
+    pdf = str(ObjectId())
+    articles = FakeSubmissions([{"id": "a1", "pdf_url": pdf}], "pdf_url")
+    texts = FakeTexts()
+    db = {"journal_articles": articles, "poster_submissions": FakeSubmissions([], "poster_url"),
+          "document_texts": texts}
+    fs = FakeFS({pdf: b"%PDF-1.7 locked"})
+    article = articles.docs[0]
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        assert await document_text.run_pending(db, fs, executor) == 1
+        assert article["text_error"] == "encrypted" and article["text_attempts"] == 1
+        assert "text_source" not in article and texts.docs == {}
+        # Waiting out the backoff
+        assert await document_text.run_pending(db, fs, executor) == 0
+
+        article["text_retry_at"] = "2000-01-01T00:00:00+00:00"
+        assert await document_text.run_pending(db, fs, executor) == 1
+    assert article["text_source"] == pdf and article["body_text"] == ""
+    assert article["text_error"] == "encrypted" and "text_attempts" not in article
+
+
+@pytest.mark.anyio
+async def test_skips_everything_without_pypdf(monkeypatch):
+    monkeypatch.setattr(document_text, "PdfReader", None)
+    db = {"journal_articles": FakeSubmissions([{"id": "a1", "pdf_url": "x"}], "pdf_url")}
+    assert await document_text.run_pending(db, FakeFS({})) == 0
+
+
+def test_failed_parse_is_recorded(monkeypatch):
+    def broken_reader(stream):
+        raise ValueError("not a pdf")
+
+    monkeypatch.setattr(document_text, "PdfReader", broken_reader)
+    result = document_text.extract_pdf_text(b"%PDF garbage")
+    assert result["status"] == "failed" and result["text"] == ""
@@ -0,0 +1,110 @@
+import pytest
+from types import SimpleNamespace
+
+import server
+
+
+def matches(doc, query):
+    for key, condition in query.items():
+        value = doc.get(key)
+        if isinstance(condition, dict):
+            if "$gt" in condition and not (value is not None and value > condition["$gt"]):
+                return False
+            if "$in" in condition and value not in condition["$in"]:
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, field, direction):
+        self.docs.sort(key=lambda d: d[field], reverse=direction < 0)
+        return self
+
+    def limit(self, count):
+        self.docs = self.docs[:count]
+        return self
+
+    async def to_list(self, length):
+        return self.docs[:length]
+
+
+class FakeCollection:
+    def __init__(self, docs=None):
+        self.docs = docs or []
+        self.projections = []
+
+    def find(self, query, projection=None):
+        self.projections.append(projection)
+        return FakeCursor([dict(d) for d in self.docs if matches(d, query)])
+
+
+class FakeDB:
+    def __init__(self):
+        self.posts = FakeCollection([
+            {"id": f"p{i}", "author_id": "u1", "visibility": "public", "text": "hello",
+             "created_at": f"2026-03-01T12:0{i}:00+00:00"}
+            for i in range(1, 5)
+        ])
+        self.follows = FakeCollection()
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    fake_database = FakeDB()
+    monkeypatch.setattr(server, "db", fake_database)
+    return fake_database
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+def anonymous_request():
+    return SimpleNamespace(headers={})
+
+
+@pytest.mark.anyio
+async def test_feed_since_returns_newer_ids_newest_first(fake_db):
+    result = await server.get_feed_since(anonymous_request(), cursor="2026-03-01T12:02:00+00:00")
+
+    assert result == {
+        "count": 2,
+        "has_more": False,
+        "ids": ["p4", "p3"],
+        "head": "2026-03-01T12:04:00+00:00",
+    }
+    # Answered from the covered index fields only
+    assert fake_db.posts.projections == [{"_id": 0, "id": 1, "created_at": 1}]
+
+
+@pytest.mark.anyio
+async def test_feed_since_caps_ids_and_flags_more(fake_db, monkeypatch):
+    monkeypatch.setattr(server, "FEED_SINCE_MAX_IDS", 2)
+    result = await server.get_feed_since(anonymous_request(), cursor="2026-03-01T00:00:00+00:00")
+
+    assert result["count"] == 2 and result["has_more"] is True
+    assert result["ids"] == ["p4", "p3"]
+
+
+@pytest.mark.anyio
+async def test_feed_since_is_204_when_nothing_is_new(fake_db):
+    response = await server.get_feed_since(anonymous_request(), cursor="2026-03-01T12:04:00+00:00")
+    assert response.status_code == 204 and response.body == b""
+
+
+@pytest.mark.anyio
+async def test_following_feed_without_follows_is_204_without_reading_posts(fake_db, monkeypatch):
+    async def signed_in(request):
+        return server.User(id="viewer", email="viewer@example.com", name="Viewer", user_type="student")
+
+    monkeypatch.setattr(server, "get_current_user_optional", signed_in)
+    response = await server.get_feed_since(anonymous_request(), cursor="2026-03-01T00:00:00+00:00", mode="following")
+
+    assert response.status_code == 204
+    assert fake_db.posts.projections == []
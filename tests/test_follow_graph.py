@@ -0,0 +1,105 @@
+import pytest
+
+import follow_graph
+from follow_graph import FollowGraph
+
+
+def build_graph():
+    users = ["ana", "ben", "cal", "dee", "eve", "fay"]
+    follows = [
+        ("ana", "ben"), ("ana", "cal"),
+        ("ben", "dee"), ("cal", "dee"),   # dee is followed by two of ana's follows
+        ("cal", "eve"),
+        ("dee", "ana"),
+    ]
+    universities = {"ana": "McGill University", "fay": "McGill University", "eve": "York University"}
+    memberships = [("neuro", "ana"), ("neuro", "eve"), ("neuro", "fay")]
+    return FollowGraph(users, follows, universities, memberships)
+
+
+def test_ranks_by_mutuals_then_circles_then_university():
+    graph = build_graph()
+    suggestions = graph.suggestions_for(graph.index["ana"], top_n=10)
+
+    assert [s["user_id"] for s in suggestions] == ["dee", "eve", "fay"]
+    dee, eve, fay = suggestions
+    assert dee["mutual_follows"] == 2
+    assert eve["mutual_follows"] == 1 and eve["shared_circles"] == 1
+    assert fay["shared_circles"] == 1 and fay["shared_university"] is True
+
+
+def test_excludes_self_and_already_followed():
+    graph = build_graph()
+    suggested = {s["user_id"] for s in graph.suggestions_for(graph.index["dee"], top_n=10)}
+    assert "dee" not in suggested
+    assert "ana" not in suggested
+    assert {"ben", "cal"} <= suggested
+
+
+def test_top_n_truncates_and_isolated_users_are_omitted():
+    graph = build_graph()
+    assert len(graph.suggestions_for(graph.index["ana"], top_n=1)) == 1
+
+    results = FollowGraph(["solo", "ana"], [], {}, []).compute_all()
+    assert results == {}
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def to_list(self, length):
+        return self.docs
+
+
+class FakeCollection:
+    def __init__(self, docs=None):
+        self.docs = docs or []
+        self.deleted = []
+
+    def find(self, query, projection=None):
+        return FakeCursor(self.docs)
+
+    async def bulk_write(self, operations, ordered=True):
+        self.docs.extend(op._doc for op in operations)
+
+    async def delete_many(self, query):
+        self.deleted.append(query)
+
+
+class FakeDB:
+    def __init__(self):
+        self.users = FakeCollection([{"id": "ana"}, {"id": "ben"}, {"id": "cal"}])
+        self.follows = FakeCollection([
+            {"follower_id": "ana", "followed_id": "ben"}, {"follower_id": "ben", "followed_id": "cal"},
+        ])
+        self.circle_members = FakeCollection()
+        self.follow_suggestions = FakeCollection()
+
+    def __getitem__(self, name):
+        return getattr(self, name)
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.mark.anyio
+async def test_only_the_lease_holder_rewrites_suggestions(monkeypatch):
+    held = {"value": False}
+
+    async def acquire(db, name, ttl_seconds):
+        assert name == follow_graph.LEASE_NAME
+        return held["value"]
+
+    monkeypatch.setattr(follow_graph.job_leases, "acquire", acquire)
+    db = FakeDB()
+
+    assert await follow_graph.refresh_suggestions(db) == 0
+    assert db.follow_suggestions.docs == [] and db.follow_suggestions.deleted == []
+
+    held["value"] = True
+    assert await follow_graph.refresh_suggestions(db) == 1
+    assert db.follow_suggestions.docs[0]["user_id"] == "ana"
+    assert db.follow_suggestions.docs[0]["suggestions"][0]["user_id"] == "cal"
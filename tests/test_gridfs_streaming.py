@@ -0,0 +1,78 @@
+import pytest
+from bson import ObjectId
+from starlette.requests import Request
+
+from gridfs_streaming import parse_range, stream_gridfs_file
+
+FILE_ID = str(ObjectId())
+PAYLOAD = bytes(range(256)) * 1024  # 256 KB, several chunks
+
+
+class FakeGridOut:
+    def __init__(self, data):
+        self.data = data
+        self.length = len(data)
+        self.metadata = {"content_type": "application/pdf"}
+        self.position = 0
+
+    def seek(self, position):
+        self.position = position
+
+    async def read(self, size):
+        chunk = self.data[self.position:self.position + size]
+        self.position += len(chunk)
+        return chunk
+
+
+class FakeBucket:
+    async def open_download_stream(self, file_id):
+        return FakeGridOut(PAYLOAD)
+
+
+def make_request(**headers):
+    raw = [(k.replace("_", "-").encode(), v.encode()) for k, v in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+
+async def body(response):
+    return b"".join([chunk async for chunk in response.body_iterator])
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+def test_parse_range_forms():
+    assert parse_range(None, 100) is None
+    assert parse_range("bytes=0-9", 100) == (0, 9)
+    assert parse_range("bytes=90-", 100) == (90, 99)
+    assert parse_range("bytes=-10", 100) == (90, 99)
+    assert parse_range("bytes=50-500", 100) == (50, 99)
+    assert parse_range("bytes=0-1,5-6", 100) is None
+    with pytest.raises(ValueError):
+        parse_range("bytes=100-", 100)
+
+
+@pytest.mark.anyio
+async def test_full_and_partial_responses():
+    full = await stream_gridfs_file(FakeBucket(), FILE_ID, make_request(), "a.pdf")
+    assert full.status_code == 200
+    assert full.headers["content-length"] == str(len(PAYLOAD))
+    assert await body(full) == PAYLOAD
+
+    partial = await stream_gridfs_file(FakeBucket(), FILE_ID, make_request(range="bytes=70000-200000"), "a.pdf")
+    assert partial.status_code == 206
+    assert partial.headers["content-range"] == f"bytes 70000-200000/{len(PAYLOAD)}"
+    assert await body(partial) == PAYLOAD[70000:200001]
+
+
+@pytest.mark.anyio
+async def test_revalidation_and_unsatisfiable_range():
+    first = await stream_gridfs_file(FakeBucket(), FILE_ID, make_request(), "a.pdf")
+    cached = await stream_gridfs_file(FakeBucket(), FILE_ID, make_request(if_none_match=first.headers["etag"]), "a.pdf")
+    assert cached.status_code == 304
+
+    bad = await stream_gridfs_file(FakeBucket(), FILE_ID, make_request(range=f"bytes={len(PAYLOAD)}-"), "a.pdf")
+    assert bad.status_code == 416
+    assert bad.headers["content-range"] == f"bytes */{len(PAYLOAD)}"
@@ -0,0 +1,117 @@
+import json
+
+import pytest
+from types import SimpleNamespace
+
+import server
+from shared_snapshot import SharedSnapshot
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, field, direction):
+        self.docs.sort(key=lambda d: d[field], reverse=direction < 0)
+        return self
+
+    async def to_list(self, length):
+        return self.docs
+
+
+class FakeCollection:
+    def __init__(self, docs=None):
+        self.docs = docs or []
+        self.reads = 0
+
+    def find(self, query, projection=None):
+        self.reads += 1
+        if "tag" in query:
+            # story_counters.get_tag_counts
+            return FakeCursor([dict(d) for d in self.docs if d["status"] == query["status"] and d["tag"]])
+        return FakeCursor([dict(d) for d in self.docs if d.get("is_active") == query["is_active"]])
+
+
+class FakeSiteCache:
+    def __init__(self):
+        self.docs = {}
+
+    async def find_one(self, query, projection=None):
+        return self.docs.get(query["_id"])
+
+    async def find_one_and_update(self, query, update, projection=None, upsert=False, return_document=None):
+        doc = self.docs.setdefault(query["_id"], {"_id": query["_id"], "version": 0})
+        doc.update(update["$set"])
+        doc["version"] += update["$inc"]["version"]
+        return dict(doc)
+
+
+class FakeDB:
+    # No stories collection: /tags must not count stories
+    def __init__(self):
+        self.health_tags = FakeCollection([
+            {"name": "Anxiety", "is_active": True},
+            {"name": "Grief", "is_active": True},
+            {"name": "Retired", "is_active": False},
+        ])
+        self.story_counters = FakeCollection([
+            {"_id": "approved|Anxiety", "status": "approved", "tag": "Anxiety", "count": 3},
+            {"_id": "pending|Grief", "status": "pending", "tag": "Grief", "count": 2},
+        ])
+        self.site_cache = FakeSiteCache()
+
+    def __getitem__(self, name):
+        return getattr(self, name)
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    fake_database = FakeDB()
+    monkeypatch.setattr(server, "db", fake_database)
+    monkeypatch.setattr(server, "health_tags_snapshot", SharedSnapshot("health_tags"))
+    return fake_database
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+def request(etag=None):
+    return SimpleNamespace(headers={"if-none-match": etag} if etag else {})
+
+
+@pytest.mark.anyio
+async def test_tags_carry_approved_counts_from_the_counters(fake_db):
+    response = await server.get_health_tags(request())
+
+    assert json.loads(response.body) == [
+        {"name": "Anxiety", "is_active": True, "story_count": 3},
+        {"name": "Grief", "is_active": True, "story_count": 0},
+    ]
+    assert response.headers["etag"] == 'W/"health_tags-1"'
+
+
+@pytest.mark.anyio
+async def test_tags_are_served_from_the_snapshot_with_etag(fake_db, monkeypatch):
+    first = await server.get_health_tags(request())
+    reads = fake_db.health_tags.reads
+
+    # Another worker picks up the published value without rebuilding it
+    monkeypatch.setattr(server, "health_tags_snapshot", SharedSnapshot("health_tags"))
+    second = await server.get_health_tags(request())
+    assert second.body == first.body and fake_db.health_tags.reads == reads
+
+    cached = await server.get_health_tags(request(first.headers["etag"]))
+    assert cached.status_code == 304 and cached.headers["etag"] == first.headers["etag"]
+
+
+@pytest.mark.anyio
+async def test_refresh_republishes_new_counts(fake_db):
+    await server.get_health_tags(request())
+    fake_db.story_counters.docs[0]["count"] = 4
+    await server.refresh_health_tags()
+
+    response = await server.get_health_tags(request())
+    assert json.loads(response.body)[0]["story_count"] == 4
+    assert response.headers["etag"] == 'W/"health_tags-2"'
@@ -0,0 +1,50 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+import job_leases
+
+NOW = datetime(2024, 6, 1, 12, 0, tzinfo=timezone.utc)
+
+
+class FakeLeases:
+    def __init__(self):
+        self.docs = {}
+
+    async def update_one(self, query, update, upsert=False):
+        doc = self.docs.get(query["_id"])
+        if doc is None:
+            self.docs[query["_id"]] = dict(update["$set"])
+            return
+        holder, expired = query["$or"]
+        if doc["holder"] != holder["holder"] and not doc["expires_at"] < expired["expires_at"]["$lt"]:
+            # Upsert would insert a second document with the same _id
+            raise DuplicateKeyError("duplicate")
+        doc.update(update["$set"])
+
+    async def delete_one(self, query):
+        if self.docs.get(query["_id"], {}).get("holder") == query["holder"]:
+            del self.docs[query["_id"]]
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.mark.anyio
+async def test_one_holder_until_the_lease_expires():
+    db = {job_leases.LEASE_COLLECTION: FakeLeases()}
+
+    assert await job_leases.acquire(db, "rebuild", 60, holder="a", now=NOW)
+    assert not await job_leases.acquire(db, "rebuild", 60, holder="b", now=NOW + timedelta(seconds=30))
+    # Renewing pushes the expiry out
+    assert await job_leases.acquire(db, "rebuild", 60, holder="a", now=NOW + timedelta(seconds=45))
+    assert not await job_leases.acquire(db, "rebuild", 60, holder="b", now=NOW + timedelta(seconds=90))
+
+    assert await job_leases.acquire(db, "rebuild", 60, holder="b", now=NOW + timedelta(seconds=106))
+    await job_leases.release(db, "rebuild", holder="a")
+    assert db[job_leases.LEASE_COLLECTION].docs["rebuild"]["holder"] == "b"
+    await job_leases.release(db, "rebuild", holder="b")
+    assert await job_leases.acquire(db, "rebuild", 60, holder="a", now=NOW + timedelta(seconds=107))
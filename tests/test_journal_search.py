@@ -0,0 +1,85 @@
+import pytest
+
+import journal_search
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def to_list(self, length=None):
+        return self.docs
+
+
+class FakeArticles:
+    def __init__(self, facet_result):
+        self.facet_result = facet_result
+        self.pipelines = []
+
+    def aggregate(self, pipeline):
+        self.pipelines.append(pipeline)
+        return FakeCursor([self.facet_result])
+
+
+class FakeDB:
+    def __init__(self, articles):
+        self.journal_articles = articles
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+def test_search_fields_split_trim_and_dedupe():
+    fields = journal_search.search_fields({
+        "authors": " Ada Lovelace, Alan  Turing;ada lovelace ,",
+        "keywords": "Oncology, CRISPR , oncology",
+    })
+    assert fields["author_list"] == ["Ada Lovelace", "Alan Turing"]
+    assert fields["keyword_list"] == ["oncology", "crispr"]
+    assert journal_search.search_fields({"authors": "Solo"})["keyword_list"] == []
+
+
+def test_publication_year_prefers_identifier():
+    assert journal_search.publication_year({"cure_identifier": "NSR.2023.004", "reviewed_at": "2024-01-02T00:00:00+00:00"}) == 2023
+    assert journal_search.publication_year({"reviewed_at": "2024-01-02T00:00:00+00:00"}) == 2024
+    assert journal_search.publication_year({}) is None
+
+
+def test_cursor_round_trip_and_rejects_garbage():
+    cursor = journal_search.encode_cursor(1.25, "a-1")
+    assert journal_search.decode_cursor(cursor) == (1.25, "a-1")
+    with pytest.raises(ValueError):
+        journal_search.decode_cursor("not-a-cursor")
+
+
+def test_facets_ignore_their_own_filter():
+    pipeline = journal_search.build_pipeline("heart", {"university": "MIT", "article_type": None}, None, 10)
+    assert pipeline[0]["$match"]["$text"] == {"$search": "heart"}
+    facets = pipeline[-1]["$facet"]
+    assert facets["articles"][0] == {"$match": {"university": "MIT"}}
+    assert facets["universities"][0] == {"$match": {}}
+    assert facets["years"][0] == {"$match": {"university": "MIT"}}
+
+
+@pytest.mark.anyio
+async def test_search_pages_by_score_then_id():
+    rows = [{"id": "a", "score": 3.0}, {"id": "b", "score": 2.0}, {"id": "c", "score": 2.0}]
+    articles = FakeArticles({
+        "articles": rows,
+        "total": [{"count": 7}],
+        "universities": [{"_id": "MIT", "count": 4}, {"_id": None, "count": 1}],
+        "article_types": [],
+        "years": [{"_id": 2024, "count": 7}],
+    })
+    result = await journal_search.search(FakeDB(articles), "heart", {}, limit=2)
+
+    assert [a["id"] for a in result["articles"]] == ["a", "b"]
+    assert result["has_more"] and result["total"] == 7
+    assert result["facets"]["universities"] == [{"value": "MIT", "count": 4}]
+    assert journal_search.decode_cursor(result["next_cursor"]) == (2.0, "b")
+
+    await journal_search.search(FakeDB(articles), "heart", {}, cursor=result["next_cursor"], limit=2)
+    after = articles.pipelines[-1][-1]["$facet"]["articles"][1]["$match"]["$or"]
+    assert after == [{"score": {"$lt": 2.0}}, {"score": 2.0, "id": {"$gt": "b"}}]
@@ -0,0 +1,16 @@
+from leased_index import stale_lists
+
+
+def test_stale_lists_are_those_listing_the_change_or_beaten_by_it():
+    top = {
+        "a": [("x", 0.9), ("changed", 0.5)],  # lists it
+        "b": [("x", 0.9), ("y", 0.8)],        # full, weakest beaten
+        "c": [("x", 0.9), ("y", 0.6)],        # full, weakest not beaten
+        "d": [("x", 0.9)],                    # room left, any score enters
+    }
+    ids = ["a", "b", "c", "d", "changed"]
+    scores = [0.1, 0.85, 0.5, 0.2, 1.0]
+
+    assert stale_lists(ids, top, 2, "changed", scores, exclude="changed") == ["a", "b", "d"]
+    # Removed entries score zero and only leave the lists holding them
+    assert stale_lists(ids[:4], top, 2, "changed", [0.0] * 4) == ["a"]
@@ -0,0 +1,76 @@
+import pytest
+
+import near_duplicates
+
+ABSTRACT = (
+    "We measured the effect of sleep deprivation on working memory in undergraduate "
+    "students over a twelve week semester using repeated n-back tasks and actigraphy, "
+    "and found that short sleep predicted lower accuracy on the hardest conditions."
+)
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def to_list(self, length=None):
+        return self.docs
+
+
+class FakeCollection:
+    def __init__(self, docs):
+        self.docs = docs
+        self.queries = []
+
+    def find(self, query, projection=None):
+        self.queries.append(query)
+        bands = set(query["lsh_bands"]["$in"])
+        excluded = query.get("id", {}).get("$ne")
+        return FakeCursor([
+            doc for doc in self.docs
+            if bands & set(doc.get("lsh_bands", [])) and doc["id"] != excluded
+        ])
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+def test_signature_similarity_tracks_overlap():
+    original = near_duplicates.signature(ABSTRACT)
+    edited = near_duplicates.signature(ABSTRACT.replace("twelve week", "ten week"))
+    unrelated = near_duplicates.signature("Protein folding kinetics of engineered enzymes under thermal stress conditions")
+
+    assert len(original) == near_duplicates.NUM_PERMUTATIONS
+    assert near_duplicates.similarity(original, original) == 1.0
+    assert near_duplicates.similarity(original, edited) >= near_duplicates.SIMILARITY_THRESHOLD
+    assert near_duplicates.similarity(original, unrelated) < 0.2
+    assert near_duplicates.signature("") is None
+
+
+def test_lsh_index_returns_near_duplicates_only():
+    index = near_duplicates.LshIndex()
+    index.add("a", near_duplicates.signature(ABSTRACT))
+    index.add("b", near_duplicates.signature("Marine microplastics in coastal sediment cores from three estuaries"))
+
+    matches = index.query(near_duplicates.signature(ABSTRACT + " Replication data are available."))
+    assert [doc_id for doc_id, _ in matches] == ["a"]
+
+
+@pytest.mark.anyio
+async def test_check_submission_flags_earlier_resubmission():
+    earlier = {"id": "p1", "title": "Sleep and memory", "abstract": ABSTRACT, "status": "rejected"}
+    earlier.update(near_duplicates.fingerprint(earlier))
+    other = {"id": "p2", "title": "Coral bleaching", "abstract": "Reef temperature anomalies and bleaching events"}
+    other.update(near_duplicates.fingerprint(other))
+    collection = FakeCollection([earlier, other])
+    db = {"poster_submissions": collection}
+
+    new = {"id": "p3", "title": "Sleep and memory", "abstract": ABSTRACT.replace("students", "learners")}
+    fields = await near_duplicates.check_submission(db, "poster_submissions", new)
+
+    assert len(fields["lsh_bands"]) == near_duplicates.BANDS
+    assert [c["id"] for c in fields["duplicate_candidates"]] == ["p1"]
+    assert fields["duplicate_candidates"][0]["status"] == "rejected"
+    assert collection.queries[0]["id"] == {"$ne": "p3"}
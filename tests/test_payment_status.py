@@ -0,0 +1,132 @@
+from types import SimpleNamespace
+
+import pytest
+
+import payment_status
+from single_flight import SingleFlightCache
+
+
+class FakeCollection:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def _matches(self, doc, query):
+        for field, value in query.items():
+            current = doc
+            for part in field.split("."):
+                current = (current or {}).get(part)
+            if isinstance(value, dict):
+                if current == value["$ne"]:
+                    return False
+            elif current != value:
+                return False
+        return True
+
+    async def find_one(self, query, projection=None):
+        return next((dict(d) for d in self.docs if self._matches(d, query)), None)
+
+    async def update_one(self, query, update):
+        for doc in self.docs:
+            if self._matches(doc, query):
+                doc.update(update["$set"])
+                return
+
+
+class FakeDB:
+    def __init__(self, events=()):
+        self.payment_transactions = FakeCollection([{
+            "session_id": "cs_1", "payment_status": "pending", "checkout_status": "open",
+            "amount": 25.0, "currency": "usd",
+        }])
+        self.webhook_events = FakeCollection(list(events))
+
+    def __getitem__(self, name):
+        return getattr(self, name)
+
+
+def checkout_event(payment_status):
+    return {"_id": "evt_1", "event_type": "checkout.session.completed",
+            "payload": {"session_id": "cs_1", "payment_status": payment_status}}
+
+
+class Payments:
+    def __init__(self, db, stripe_status=None):
+        self.db = db
+        self.stripe_status = stripe_status
+        self.stripe_calls = 0
+        self.completed = []
+
+    async def fetch_status(self):
+        self.stripe_calls += 1
+        if isinstance(self.stripe_status, Exception):
+            raise self.stripe_status
+        return self.stripe_status
+
+    async def complete_payment(self, transaction, source="Status check"):
+        self.completed.append(source)
+        await self.db.payment_transactions.update_one(
+            {"session_id": transaction["session_id"]},
+            {"$set": {"payment_status": "completed", "checkout_status": "complete"}}
+        )
+        return True
+
+    async def check(self):
+        transaction = await self.db.payment_transactions.find_one({"session_id": "cs_1"})
+        return await payment_status.check(self.db, transaction, self.fetch_status,
+                                          self.complete_payment, SingleFlightCache(ttl_seconds=60))
+
+
+def stripe_status(payment_status, status="open"):
+    return SimpleNamespace(status=status, payment_status=payment_status, amount_total=2500, currency="usd")
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.mark.anyio
+async def test_paid_webhook_in_inbox_completes_without_asking_stripe():
+    db = FakeDB([checkout_event("paid")])
+    payments = Payments(db)
+
+    result = await payments.check()
+
+    assert result == {"status": "complete", "payment_status": "completed", "amount": 25.0, "currency": "usd"}
+    assert payments.completed == ["Webhook"] and payments.stripe_calls == 0
+
+
+@pytest.mark.anyio
+async def test_completed_but_unpaid_webhook_is_not_treated_as_payment():
+    db = FakeDB([checkout_event("unpaid")])
+    payments = Payments(db, stripe_status("unpaid", status="complete"))
+
+    result = await payments.check()
+
+    assert result["payment_status"] == "unpaid" and payments.completed == []
+    assert payments.stripe_calls == 1
+    assert db.payment_transactions.docs[0]["checkout_status"] == "complete"
+
+
+@pytest.mark.anyio
+async def test_stripe_failure_falls_back_to_stored_status(caplog):
+    db = FakeDB()
+    payments = Payments(db, RuntimeError("rate limited"))
+
+    with caplog.at_level("WARNING", logger="payment_status"):
+        result = await payments.check()
+
+    assert result == {"status": "open", "payment_status": "pending", "amount": 25.0, "currency": "usd"}
+    assert payments.stripe_calls == 1 and payments.completed == []
+    assert "rate limited" in caplog.text
+
+
+@pytest.mark.anyio
+async def test_paid_stripe_status_completes_payment():
+    db = FakeDB()
+    payments = Payments(db, stripe_status("paid", status="complete"))
+
+    result = await payments.check()
+
+    assert result["payment_status"] == "paid" and result["amount"] == 25.0
+    assert payments.completed == ["Status check"]
@@ -0,0 +1,121 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import stripe
+
+import payments_client
+from payments_client import PaymentsClient
+
+
+class StandInStripe(BaseHTTPRequestHandler):
+    """Answers session retrievals; fails the first `failures` requests with a retryable 503"""
+
+    protocol_version = "HTTP/1.1"
+    failures = 0
+    requests = []
+
+    def do_GET(self):
+        StandInStripe.requests.append(self.client_address[1])
+        if StandInStripe.failures > 0:
+            StandInStripe.failures -= 1
+            self._send(503, {"error": {"message": "try again"}}, {"Stripe-Should-Retry": "true"})
+            return
+        session_id = self.path.rsplit("/", 1)[-1]
+        self._send(200, {"id": session_id, "object": "checkout.session", "payment_status": "paid"})
+
+    def _send(self, status, body, headers=None):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stand_in():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInStripe)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    StandInStripe.failures = 0
+    StandInStripe.requests = []
+    saved = (stripe.api_base, stripe.api_key, stripe.max_network_retries, stripe.default_http_client)
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    stripe.api_base, stripe.api_key, stripe.max_network_retries, stripe.default_http_client = saved
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+class FakeCheckout:
+    def __init__(self, api_key, webhook_url):
+        self.webhook_url = webhook_url
+
+
+class ModuleApiCheckout(FakeCheckout):
+    """A checkout helper that calls Stripe through the SDK's module-level API"""
+
+    async def get_checkout_status(self, session_id):
+        return await stripe.checkout.Session.retrieve_async(session_id)
+
+
+@pytest.mark.anyio
+async def test_reuses_one_connection_and_retries(stand_in):
+    payments = PaymentsClient("sk_test_123", FakeCheckout, api_base=stand_in, max_retries=2)
+    payments.start()
+    try:
+        first = stripe.checkout.Session.retrieve("cs_1")
+        second = stripe.checkout.Session.retrieve("cs_2")
+        assert (first.id, second.payment_status) == ("cs_1", "paid")
+        # Keep-alive: both calls travelled over the same pooled connection
+        assert len(set(StandInStripe.requests)) == 1
+
+        StandInStripe.failures = 1
+        retried = await stripe.checkout.Session.retrieve_async("cs_3")
+        assert retried.id == "cs_3"
+        assert len(StandInStripe.requests) == 4
+    finally:
+        await payments.close()
+    assert stripe.default_http_client is None
+
+
+@pytest.mark.anyio
+async def test_checkout_status_goes_through_the_pooled_transport(stand_in):
+    payments = PaymentsClient("sk_test_123", ModuleApiCheckout, api_base=stand_in, max_retries=2)
+    payments.start()
+    try:
+        checkout = payments.checkout("https://a.example/api/webhook/stripe")
+        StandInStripe.failures = 1
+        first = await checkout.get_checkout_status("cs_1")
+        second = await payments.checkout("https://b.example/api/webhook/stripe").get_checkout_status("cs_2")
+        assert (first.id, second.payment_status) == ("cs_1", "paid")
+        # The retried 503 and both helpers' calls shared one pooled connection
+        assert len(StandInStripe.requests) == 3
+        assert len(set(StandInStripe.requests)) == 1
+    finally:
+        await payments.close()
+
+
+@pytest.mark.anyio
+async def test_checkout_helpers_are_cached_and_bounded(stand_in, monkeypatch):
+    monkeypatch.setattr(payments_client, "MAX_CACHED_CHECKOUTS", 2)
+    payments = PaymentsClient("sk_test_123", FakeCheckout, api_base=stand_in)
+    try:
+        first = payments.checkout("https://a.example/api/webhook/stripe")
+        assert payments.checkout("https://a.example/api/webhook/stripe") is first
+        payments.checkout("https://b.example/api/webhook/stripe")
+        payments.checkout("https://c.example/api/webhook/stripe")
+        assert payments.checkout("https://a.example/api/webhook/stripe") is not first
+    finally:
+        await payments.close()
@@ -0,0 +1,90 @@
+import pytest
+
+from post_hydrator import PostHydrator
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def to_list(self, length):
+        return self.docs
+
+
+class FakeCollection:
+    def __init__(self, docs):
+        self.docs = docs
+        self.queries = []
+
+    def find(self, query, projection=None):
+        self.queries.append(query)
+
+        def matches(doc):
+            for key, value in query.items():
+                if isinstance(value, dict):
+                    if doc.get(key) not in value["$in"]:
+                        return False
+                elif doc.get(key) != value:
+                    return False
+            return True
+
+        return FakeCursor([dict(d) for d in self.docs if matches(d)])
+
+
+class FakeDB:
+    def __init__(self):
+        self.users = FakeCollection([
+            {"id": "u1", "name": "Ada", "role": "professor", "university": "McGill University"},
+            {"id": "u2", "name": "Grace", "role": "student"},
+        ])
+        self.likes = FakeCollection([{"post_id": "p2", "user_id": "viewer"}])
+        self.follows = FakeCollection([{"follower_id": "viewer", "followed_id": "u1"}])
+
+
+def make_post(post_id, author_id):
+    return {"id": post_id, "author_id": author_id, "text": f"post {post_id}",
+            "created_at": "2026-03-01T12:00:00+00:00"}
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.mark.anyio
+async def test_hydrate_uses_one_query_per_collection():
+    db = FakeDB()
+    posts = [make_post(f"p{i}", "u1" if i % 2 else "u2") for i in range(1, 21)]
+
+    hydrated = await PostHydrator(db).hydrate(posts, "viewer")
+
+    assert len(hydrated) == 20
+    assert (len(db.users.queries), len(db.likes.queries), len(db.follows.queries)) == (1, 1, 1)
+    by_id = {p.id: p for p in hydrated}
+    assert by_id["p1"].author_name == "Ada" and by_id["p1"].is_following_author
+    assert by_id["p2"].is_liked and not by_id["p2"].is_following_author
+    assert [p.id for p in hydrated] == [p["id"] for p in posts]
+
+
+@pytest.mark.anyio
+async def test_anonymous_viewer_skips_engagement_lookups_and_orphans():
+    db = FakeDB()
+    hydrated = await PostHydrator(db).hydrate([make_post("p1", "u1"), make_post("p9", "deleted")])
+
+    assert [p.id for p in hydrated] == ["p1"]
+    assert not hydrated[0].is_liked
+    assert db.likes.queries == [] and db.follows.queries == []
+
+
+@pytest.mark.anyio
+async def test_annotate_keeps_stored_fields_and_tolerates_deleted_author():
+    db = FakeDB()
+    post = {**make_post("p1", "u1"), "author_type": "professor", "updated_at": "2026-03-02T08:00:00+00:00"}
+    annotated = await PostHydrator(db).annotate(post, "viewer")
+
+    assert annotated["author_type"] == "professor" and annotated["updated_at"] == post["updated_at"]
+    assert annotated["author_name"] == "Ada" and annotated["is_following_author"]
+    assert not annotated["is_liked"]
+
+    orphan = await PostHydrator(db).annotate(make_post("p9", "deleted"))
+    assert orphan["author_name"] == "Unknown" and orphan["author_role"] == "student"
@@ -0,0 +1,125 @@
+import pytest
+
+import job_leases
+import related_stories
+from related_stories import RelatedStories
+
+
+def matches(doc, query):
+    for key, value in query.items():
+        if isinstance(value, dict) and "$lt" in value:
+            if not doc.get(key) < value["$lt"]:
+                return False
+        elif doc.get(key) != value:
+            return False
+    return True
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def to_list(self, length):
+        return self.docs
+
+
+class FakeCollection:
+    def __init__(self, docs=None):
+        self.docs = [dict(d) for d in docs or []]
+
+    def find(self, query, projection=None):
+        return FakeCursor([dict(d) for d in self.docs if matches(d, query)])
+
+    async def find_one(self, query, projection=None):
+        return next((dict(d) for d in self.docs if matches(d, query)), None)
+
+    async def bulk_write(self, operations, ordered=True):
+        for op in operations:
+            self.docs = [d for d in self.docs if not matches(d, op._filter)] + [dict(op._doc)]
+
+    async def delete_many(self, query):
+        self.docs = [d for d in self.docs if not matches(d, query)]
+
+    async def delete_one(self, query):
+        await self.delete_many(query)
+
+    async def update_one(self, query, update, upsert=False):
+        await self.delete_many(query)
+        self.docs.append({"_id": query["_id"], **update["$set"]})
+
+
+def story(story_id, title, body, tags, status="approved"):
+    return {"id": story_id, "title": title, "body": body, "tags": tags, "status": status,
+            "excerpt": body[:40], "author_email": "secret@example.com"}
+
+
+class FakeDB:
+    def __init__(self):
+        self.stories = FakeCollection([
+            story("s1", "Living with migraines", "<p>Migraine attacks and aura every week</p>", ["Chronic Illness"]),
+            story("s2", "My migraine diary", "Tracking migraine triggers, aura and sleep", ["Chronic Illness"]),
+            story("s3", "Caring for my father", "Caregiving after his stroke", ["Caregiving"]),
+            story("s4", "Another migraine story", "Migraine aura and triggers", ["Chronic Illness"], status="pending"),
+        ])
+        self.related_stories = FakeCollection()
+        self.related_story_updates = FakeCollection()
+
+    def __getitem__(self, name):
+        return getattr(self, name)
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.mark.anyio
+async def test_rebuild_links_similar_approved_stories_only():
+    db = FakeDB()
+    await RelatedStories().rebuild(db)
+
+    related = await related_stories.get_related(db, "s1")
+    assert [r["id"] for r in related] == ["s2"]
+    assert "author_email" not in related[0]
+    assert await related_stories.get_related(db, "s3") == []
+    assert await related_stories.get_related(db, "s4") == []
+
+
+@pytest.mark.anyio
+async def test_approval_and_unapproval_patch_neighbour_lists():
+    db = FakeDB()
+    index = RelatedStories()
+    await index.rebuild(db)
+
+    db.stories.docs[3]["status"] = "approved"
+    await index.refresh_story(db, "s4")
+    assert {r["id"] for r in await related_stories.get_related(db, "s1")} == {"s2", "s4"}
+    assert {r["id"] for r in await related_stories.get_related(db, "s4")} == {"s1", "s2"}
+
+    db.stories.docs[1]["status"] = "rejected"
+    await index.refresh_story(db, "s2")
+    assert [r["id"] for r in await related_stories.get_related(db, "s1")] == ["s4"]
+    assert await related_stories.get_related(db, "s2") == []
+
+
+@pytest.mark.anyio
+async def test_job_applies_queued_moderation_changes_only_with_the_lease(monkeypatch):
+    db = FakeDB()
+    index = RelatedStories()
+    lease = {"held": True}
+
+    async def acquire(db, name, ttl_seconds):
+        return lease["held"]
+
+    monkeypatch.setattr(job_leases, "acquire", acquire)
+    await index.run(db)
+
+    db.stories.docs[3]["status"] = "approved"
+    await related_stories.mark_dirty(db, "s4")
+    await index.run(db)
+    assert {r["id"] for r in await related_stories.get_related(db, "s1")} == {"s2", "s4"}
+    assert db.related_story_updates.docs == []
+
+    lease["held"] = False
+    assert await index.run(db) == 0
+    assert index.model is None
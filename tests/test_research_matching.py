@@ -0,0 +1,162 @@
+import pytest
+from types import SimpleNamespace
+
+import job_leases
+import research_matching
+from research_matching import ResearchMatcher
+
+
+def matches(doc, query):
+    for key, value in query.items():
+        if isinstance(value, dict) and "$in" in value:
+            if doc.get(key) not in value["$in"]:
+                return False
+        elif isinstance(value, dict) and "$lt" in value:
+            if not doc.get(key) < value["$lt"]:
+                return False
+        elif doc.get(key) != value:
+            return False
+    return True
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def to_list(self, length):
+        return self.docs if length is None else self.docs[:length]
+
+
+class FakeCollection:
+    def __init__(self, docs=None):
+        self.docs = [dict(d) for d in docs or []]
+
+    def find(self, query, projection=None):
+        return FakeCursor([dict(d) for d in self.docs if matches(d, query)])
+
+    async def find_one(self, query, projection=None):
+        for doc in self.docs:
+            if matches(doc, query):
+                return dict(doc)
+        return None
+
+    async def bulk_write(self, operations, ordered=True):
+        for op in operations:
+            self.docs = [d for d in self.docs if not matches(d, op._filter)]
+            self.docs.append(dict(op._doc))
+
+    async def delete_many(self, query):
+        self.docs = [d for d in self.docs if not matches(d, query)]
+        return SimpleNamespace(deleted_count=0)
+
+    async def delete_one(self, query):
+        return await self.delete_many(query)
+
+    async def update_one(self, query, update, upsert=False):
+        await self.delete_many(query)
+        self.docs.append({"_id": query["_id"], **update["$set"]})
+
+
+class FakeDB:
+    def __init__(self):
+        self.users = FakeCollection([
+            {"id": "s1", "name": "Sam", "university": "McGill University"},
+            {"id": "s2", "name": "Kai", "university": "York University"},
+            {"id": "p1", "name": "Dr. Neuro", "university": "McGill University"},
+            {"id": "p2", "name": "Dr. Genome", "university": "Western University"},
+        ])
+        self.student_network = FakeCollection([
+            {"id": "sp1", "user_id": "s1", "research_interests": ["Neuroscience", "Brain imaging"],
+             "skills": ["MRI analysis"], "public_profile": True},
+            {"id": "sp2", "user_id": "s2", "research_interests": ["Genomics"],
+             "skills": ["CRISPR", "sequencing"], "public_profile": True},
+        ])
+        self.professor_network = FakeCollection([
+            {"id": "pp1", "user_id": "p1", "department": "Neurology", "research_areas": ["Neuroscience", "MRI"],
+             "lab_description": "Brain imaging lab", "accepting_students": True},
+            {"id": "pp2", "user_id": "p2", "department": "Biology", "research_areas": ["Genomics", "CRISPR"],
+             "lab_description": "Sequencing and gene editing", "accepting_students": False},
+        ])
+        self.research_matches = FakeCollection()
+        self.research_match_updates = FakeCollection()
+
+    def __getitem__(self, name):
+        return getattr(self, name)
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.mark.anyio
+async def test_rebuild_matches_students_to_closest_lab():
+    db = FakeDB()
+    await ResearchMatcher().rebuild(db)
+
+    s1 = await research_matching.get_matches(db, "s1")
+    assert s1["role"] == "student"
+    assert [m["user_id"] for m in s1["matches"]] == ["p1"]
+    assert s1["matches"][0]["name"] == "Dr. Neuro"
+
+    p2 = await research_matching.get_matches(db, "p2", role="professor")
+    assert [m["user_id"] for m in p2["matches"]] == ["s2"]
+
+
+@pytest.mark.anyio
+async def test_refresh_profile_patches_both_sides():
+    db = FakeDB()
+    matcher = ResearchMatcher()
+    await matcher.rebuild(db)
+
+    # Kai switches to neuroscience: his list and the neuro lab's list both change
+    db.student_network.docs[1].update({"research_interests": ["Neuroscience"], "skills": ["MRI analysis"]})
+    await matcher.refresh_profile(db, "student", "s2")
+
+    s2 = await research_matching.get_matches(db, "s2")
+    assert [m["user_id"] for m in s2["matches"]] == ["p1"]
+    p1 = await research_matching.get_matches(db, "p1")
+    assert {m["user_id"] for m in p1["matches"]} == {"s1", "s2"}
+    p2 = await research_matching.get_matches(db, "p2")
+    assert p2["matches"] == []
+
+
+@pytest.mark.anyio
+async def test_refresh_removed_profile_drops_it_everywhere():
+    db = FakeDB()
+    matcher = ResearchMatcher()
+    await matcher.rebuild(db)
+
+    db.professor_network.docs = [d for d in db.professor_network.docs if d["user_id"] != "p1"]
+    await matcher.refresh_profile(db, "professor", "p1")
+
+    assert await research_matching.get_matches(db, "p1") is None
+    s1 = await research_matching.get_matches(db, "s1")
+    assert s1["matches"] == []
+
+
+@pytest.mark.anyio
+async def test_only_the_lease_holder_writes_and_it_applies_queued_edits(monkeypatch):
+    db = FakeDB()
+    leader, follower = ResearchMatcher(), ResearchMatcher()
+    holders = {"leader": True, "follower": False}
+
+    async def acquire(db, name, ttl_seconds):
+        return holders[current]
+
+    monkeypatch.setattr(job_leases, "acquire", acquire)
+
+    current = "leader"
+    assert await leader.run(db) == 4
+    current = "follower"
+    assert await follower.run(db) == 0
+    assert follower.model is None
+
+    db.student_network.docs[1].update({"research_interests": ["Neuroscience"], "skills": ["MRI analysis"]})
+    await research_matching.mark_dirty(db, "student", "s2")
+    current = "leader"
+    await leader.run(db)
+
+    s2 = await research_matching.get_matches(db, "s2")
+    assert [m["user_id"] for m in s2["matches"]] == ["p1"]
+    assert db.research_match_updates.docs == []
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+import sequences
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def __aiter__(self):
+        self._iter = iter(self.docs)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iter)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class FakeCounters:
+    def __init__(self):
+        self.docs = {}
+
+    async def find_one_and_update(self, query, update, upsert=False, return_document=None):
+        await asyncio.sleep(0)
+        doc = self.docs.setdefault(query["_id"], {"_id": query["_id"], "seq": 0})
+        doc["seq"] += update["$inc"]["seq"]
+        return dict(doc)
+
+    async def bulk_write(self, operations, ordered=True):
+        for op in operations:
+            doc = self.docs.setdefault(op._filter["_id"], {"_id": op._filter["_id"], "seq": 0})
+            doc["seq"] = max(doc["seq"], op._doc["$max"]["seq"])
+
+
+class FakeArticles:
+    def __init__(self, identifiers):
+        self.docs = [{"cure_identifier": identifier} for identifier in identifiers]
+
+    def find(self, query, projection=None):
+        return FakeCursor(self.docs)
+
+
+class FakeDB:
+    def __init__(self, identifiers=()):
+        self.counters = FakeCounters()
+        self.journal_articles = FakeArticles(identifiers)
+
+    def __getitem__(self, name):
+        return getattr(self, name)
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.mark.anyio
+async def test_concurrent_allocations_get_distinct_numbers_per_year():
+    db = FakeDB()
+    ids = await asyncio.gather(*[sequences.next_nsr_identifier(db, 2026) for _ in range(5)])
+
+    assert sorted(ids) == [f"NSR.2026.00{n}" for n in range(1, 6)]
+    assert await sequences.next_nsr_identifier(db, 2027) == "NSR.2027.001"
+
+
+@pytest.mark.anyio
+async def test_seed_continues_after_highest_issued_identifier():
+    db = FakeDB(["NSR.2025.007", "NSR.2025.012", "NSR.2026.003", "CURE.2024.001"])
+    assert await sequences.seed_nsr_counters(db) == {2025: 12, 2026: 3}
+    await sequences.seed_nsr_counters(db)  # re-running never lowers a counter
+
+    assert await sequences.next_nsr_identifier(db, 2025) == "NSR.2025.013"
+    assert await sequences.next_nsr_identifier(db, 2026) == "NSR.2026.004"
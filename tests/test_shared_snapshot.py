@@ -0,0 +1,75 @@
+import pytest
+
+import shared_snapshot
+from shared_snapshot import SharedSnapshot
+
+
+class FakeSiteCache:
+    def __init__(self):
+        self.docs = {}
+        self.reads = 0
+
+    async def find_one(self, query, projection=None):
+        self.reads += 1
+        doc = self.docs.get(query["_id"])
+        return dict(doc) if doc else None
+
+    async def find_one_and_update(self, query, update, projection=None, upsert=False, return_document=None):
+        doc = self.docs.setdefault(query["_id"], {"_id": query["_id"], "version": 0})
+        doc.update(update["$set"])
+        doc["version"] += update["$inc"]["version"]
+        return dict(doc)
+
+
+class FakeDB:
+    def __init__(self):
+        self.site_cache = FakeSiteCache()
+
+    def __getitem__(self, name):
+        return getattr(self, name)
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.mark.anyio
+async def test_first_reader_builds_and_later_reads_stay_in_memory():
+    db = FakeDB()
+    builds = []
+
+    async def build(database):
+        builds.append(1)
+        return ["a", "b"]
+
+    snapshot = SharedSnapshot("featured", revalidate_seconds=60)
+    assert await snapshot.get(db, build) == ["a", "b"]
+    reads = db.site_cache.reads
+    assert await snapshot.get(db, build) == ["a", "b"]
+
+    assert len(builds) == 1
+    assert db.site_cache.reads == reads
+    assert snapshot.not_modified('W/"featured-1"')
+    assert not snapshot.not_modified('W/"featured-0"')
+
+
+@pytest.mark.anyio
+async def test_other_workers_pick_up_published_versions(monkeypatch):
+    db = FakeDB()
+    clock = [100.0]
+    monkeypatch.setattr(shared_snapshot.time, "monotonic", lambda: clock[0])
+
+    async def build(database):
+        return "v1"
+
+    writer = SharedSnapshot("tags", revalidate_seconds=5)
+    reader = SharedSnapshot("tags", revalidate_seconds=5)
+    await writer.get(db, build)
+    assert await reader.get(db, build) == "v1"
+
+    await writer.publish(db, "v2")
+    assert await reader.get(db, build) == "v1"  # still within its revalidation window
+    clock[0] += 6
+    assert await reader.get(db, build) == "v2"
+    assert reader.etag == writer.etag
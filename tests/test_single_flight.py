@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+from single_flight import SingleFlightCache
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.mark.anyio
+async def test_concurrent_callers_share_one_call_and_result_is_cached():
+    cache = SingleFlightCache(ttl_seconds=60)
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"payment_status": "unpaid"}
+
+    results = await asyncio.gather(*(cache.get("cs_1", fetch) for _ in range(20)))
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+
+    await cache.get("cs_1", fetch)
+    assert len(calls) == 1
+    await cache.get("cs_2", fetch)
+    assert len(calls) == 2
+
+
+@pytest.mark.anyio
+async def test_expired_entries_are_refetched():
+    cache = SingleFlightCache(ttl_seconds=0)
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return len(calls)
+
+    assert await cache.get("cs_1", fetch) == 1
+    assert await cache.get("cs_1", fetch) == 2
+
+
+@pytest.mark.anyio
+async def test_failures_reach_every_waiter_but_are_not_cached():
+    cache = SingleFlightCache(ttl_seconds=60)
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        await asyncio.sleep(0.01)
+        if len(attempts) == 1:
+            raise RuntimeError("rate limited")
+        return "paid"
+
+    results = await asyncio.gather(*(cache.get("cs_1", flaky) for _ in range(5)), return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert await cache.get("cs_1", flaky) == "paid"
+    assert len(attempts) == 2
+
+
+@pytest.mark.anyio
+async def test_cache_is_bounded():
+    cache = SingleFlightCache(ttl_seconds=60, max_entries=2)
+
+    async def fetch():
+        return object()
+
+    first = await cache.get("a", fetch)
+    await cache.get("b", fetch)
+    await cache.get("c", fetch)
+    assert await cache.get("a", fetch) is not first
+
+
+@pytest.mark.anyio
+async def test_cancelling_the_first_caller_does_not_fail_the_others():
+    cache = SingleFlightCache(ttl_seconds=60)
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "paid"
+
+    leader = asyncio.ensure_future(cache.get("cs_1", fetch))
+    await asyncio.sleep(0)
+    waiters = [asyncio.ensure_future(cache.get("cs_1", fetch)) for _ in range(3)]
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await asyncio.gather(*waiters) == ["paid"] * 3
+    assert leader.cancelled()
+    assert await cache.get("cs_1", fetch) == "paid" and len(calls) == 1
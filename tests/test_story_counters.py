@@ -0,0 +1,137 @@
+import pytest
+
+import story_counters
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def to_list(self, length):
+        return self.docs
+
+
+class FakeCounters:
+    def __init__(self):
+        self.docs = {}
+
+    async def bulk_write(self, operations, ordered=True):
+        for op in operations:
+            doc = self.docs.setdefault(op._filter["_id"], {"_id": op._filter["_id"], "count": 0})
+            doc["count"] += op._doc["$inc"]["count"]
+            doc.update(op._doc["$set"])
+
+    async def find_one(self, query, projection=None):
+        return self.docs.get(query["_id"])
+
+    def find(self, query, projection=None):
+        if "_id" in query:
+            return FakeCursor([self.docs[i] for i in query["_id"]["$in"] if i in self.docs])
+        return FakeCursor([
+            d for d in self.docs.values()
+            if d["status"] == query["status"] and d["tag"] is not None
+        ])
+
+
+class FakeDB:
+    def __init__(self):
+        self.story_counters = FakeCounters()
+
+    def __getitem__(self, name):
+        return getattr(self, name)
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.mark.anyio
+async def test_transitions_move_status_and_tag_totals():
+    db = FakeDB()
+    draft = {"status": "pending", "tags": ["Anxiety", "Caregiving"]}
+    await story_counters.record_transition(db, None, draft)
+    await story_counters.record_transition(db, None, {"status": "pending", "tags": ["Anxiety"]})
+
+    approved = {"status": "approved", "tags": ["Anxiety", "Caregiving"]}
+    await story_counters.record_transition(db, draft, approved)
+
+    assert await story_counters.get_count(db, "approved") == 1
+    assert await story_counters.get_count(db, "approved", "Anxiety") == 1
+    assert await story_counters.get_count(db, "pending", "Anxiety") == 1
+    assert await story_counters.get_status_counts(db) == {
+        "pending": 1, "approved": 1, "rejected": 0, "edit_requested": 0
+    }
+
+    await story_counters.record_transition(db, approved, None)
+    assert await story_counters.get_tag_counts(db, "approved") == {}
+    assert await story_counters.get_tag_counts(db, "pending") == {"Anxiety": 1}
+
+
+@pytest.mark.anyio
+async def test_edit_that_keeps_status_only_touches_changed_tags():
+    db = FakeDB()
+    before = {"status": "pending", "tags": ["Anxiety"]}
+    await story_counters.record_transition(db, None, before)
+    await story_counters.record_transition(db, before, {"status": "pending", "tags": ["Grief"]})
+
+    assert await story_counters.get_count(db, "pending") == 1
+    assert await story_counters.get_tag_counts(db, "pending") == {"Grief": 1}
+
+
+class FakeAggregate:
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def to_list(self, length):
+        return self.rows
+
+
+class FakeStories:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def aggregate(self, pipeline):
+        if pipeline[0].get("$unwind"):
+            pairs = {(d["status"], tag, d["id"]) for d in self.docs for tag in d["tags"]}
+            totals = {}
+            for status, tag, _ in pairs:
+                totals[(status, tag)] = totals.get((status, tag), 0) + 1
+            return FakeAggregate([{"_id": {"status": s, "tag": t}, "count": c} for (s, t), c in totals.items()])
+        totals = {}
+        for d in self.docs:
+            totals[d["status"]] = totals.get(d["status"], 0) + 1
+        return FakeAggregate([{"_id": s, "count": c} for s, c in totals.items()])
+
+
+class FakeSeedCounters(FakeCounters):
+    async def find_one(self, query, projection=None):
+        if not query:
+            return next(iter(self.docs.values()), None)
+        return await super().find_one(query, projection)
+
+    async def bulk_write(self, operations, ordered=True):
+        for op in operations:
+            self.docs[op._filter["_id"]] = dict(op._doc)
+
+    async def delete_many(self, query):
+        keep = query["_id"]["$nin"]
+        self.docs = {k: v for k, v in self.docs.items() if k in keep}
+
+
+@pytest.mark.anyio
+async def test_seed_counts_stories_only_when_there_are_no_counters():
+    db = FakeDB()
+    db.story_counters = FakeSeedCounters()
+    db.stories = FakeStories([
+        {"id": "s1", "status": "approved", "tags": ["Anxiety", "Anxiety"]},
+        {"id": "s2", "status": "pending", "tags": []},
+    ])
+
+    assert await story_counters.seed(db) == 3
+    assert await story_counters.get_count(db, "approved", "Anxiety") == 1
+    assert await story_counters.get_count(db, "pending") == 1
+
+    db.stories.docs.append({"id": "s3", "status": "pending", "tags": []})
+    assert await story_counters.seed(db) == 0
+    assert await story_counters.get_count(db, "pending") == 1
@@ -0,0 +1,76 @@
+import pytest
+from types import SimpleNamespace
+
+import server
+
+
+def matches(doc, query):
+    for key, condition in query.items():
+        if isinstance(condition, dict):
+            if (key in doc) != condition["$exists"]:
+                return False
+        elif doc.get(key) != condition:
+            return False
+    return True
+
+
+def project(doc, projection):
+    if any(projection.values()):
+        return {k: doc[k] for k, keep in projection.items() if keep and k in doc}
+    return {k: v for k, v in doc.items() if projection.get(k, 1)}
+
+
+class FakeStories:
+    def __init__(self, docs):
+        self.docs = docs
+        self.updates = []
+
+    async def find_one(self, query, projection=None):
+        for doc in self.docs:
+            if matches(doc, query):
+                return project(doc, projection)
+        return None
+
+    async def update_one(self, query, update):
+        self.updates.append(query)
+        for doc in self.docs:
+            if matches(doc, query):
+                doc.update(update["$set"])
+
+
+class FakeDB:
+    def __init__(self):
+        self.stories = FakeStories([
+            # Approved before excerpts and body_html were computed at approval
+            {"_id": "m1", "id": "s1", "status": "approved", "title": "Night shifts", "is_anonymous": True,
+             "author_email": "sam@example.com", "body": "First night.\n\nSecond & last."},
+        ])
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    fake_database = FakeDB()
+    monkeypatch.setattr(server, "db", fake_database)
+    return fake_database
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.mark.anyio
+async def test_story_approved_before_rendering_is_rendered_on_first_read(fake_db):
+    request = SimpleNamespace(headers={})
+    story = await server.get_story("s1", request)
+
+    assert story["body_html"] == "<p>First night.</p><p>Second &amp; last.</p>"
+    assert story["excerpt"] == "First night. Second & last." and story["reading_minutes"] == 1
+    assert story["author_name"] == "Anonymous" and story["user_resonated"] is False
+    assert "body" not in story and "author_email" not in story
+
+    # Stored, so the next read (and the list cards) use it
+    stored = fake_db.stories.docs[0]
+    assert stored["body_html"] == story["body_html"] and stored["excerpt"] == story["excerpt"]
+    await server.get_story("s1", request)
+    assert len(fake_db.stories.updates) == 1
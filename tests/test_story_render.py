@@ -0,0 +1,37 @@
+from story_render import make_excerpt, plain_text, render_story, sanitize_html
+
+
+def test_sanitizer_keeps_formatting_and_drops_scripts_and_handlers():
+    dirty = ('<p onclick="steal()">Hello <strong>world</strong><script>alert(1)</script></p>'
+             '<a href="javascript:alert(1)">bad</a><a href="https://cure.ca">good</a><img src=x onerror=y>')
+    clean = sanitize_html(dirty)
+
+    assert clean.startswith("<p>Hello <strong>world</strong></p>")
+    assert "script" not in clean and "onclick" not in clean and "img" not in clean
+    assert "<a>bad</a>" in clean
+    assert '<a href="https://cure.ca" rel="nofollow noopener" target="_blank">good</a>' in clean
+
+
+def test_sanitizer_closes_unbalanced_tags():
+    assert sanitize_html("<blockquote><em>quote") == "<blockquote><em>quote</em></blockquote>"
+
+
+def test_plain_text_story_renders_paragraphs_and_reading_time():
+    body = "First paragraph: 1 < 2 & stuff.\n\nSecond one\ncontinues here. " + "word " * 400
+    rendered = render_story(body)
+
+    assert rendered["body_html"].startswith("<p>First paragraph: 1 &lt; 2 &amp; stuff.</p><p>Second one<br>continues")
+    assert rendered["word_count"] == 411
+    assert rendered["reading_minutes"] == 2
+    assert len(rendered["excerpt"]) <= 221 and rendered["excerpt"].endswith("…")
+
+
+def test_excerpt_of_html_story_is_plain_text():
+    rendered = render_story("<p>Short &amp; <em>sweet</em>.</p>")
+    assert rendered["excerpt"] == "Short & sweet."
+    assert make_excerpt("one two three", limit=9) == "one two…"
+
+
+def test_plain_text_separates_blocks_but_not_inline_tags():
+    body = "<h2>Title</h2><p>One <a href='https://cure.ca'>link</a>, <b>bold</b>.</p><ul><li>a</li><li>b</li></ul>x<br>y"
+    assert plain_text(body) == "Title One link, bold. a b x y"
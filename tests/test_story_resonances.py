@@ -0,0 +1,137 @@
+import pytest
+from types import SimpleNamespace
+
+from pymongo.errors import DuplicateKeyError
+
+import server
+
+
+def matches(doc, query):
+    for key, condition in query.items():
+        value = doc.get(key)
+        if isinstance(condition, dict):
+            if value not in condition["$in"]:
+                return False
+        elif isinstance(value, list):
+            if condition not in value:
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def to_list(self, length):
+        return self.docs[:length]
+
+
+class FakeCollection:
+    def __init__(self, docs=None):
+        self.docs = docs or []
+
+    async def find_one(self, query, projection=None):
+        return next((dict(d) for d in self.docs if matches(d, query)), None)
+
+    def find(self, query, projection=None):
+        return FakeCursor([dict(d) for d in self.docs if matches(d, query)])
+
+    async def insert_one(self, doc):
+        if any(d["story_id"] == doc["story_id"] and d["user_id"] == doc["user_id"] for d in self.docs):
+            raise DuplicateKeyError("duplicate edge")
+        self.docs.append(dict(doc))
+
+    async def delete_one(self, query):
+        for doc in self.docs:
+            if matches(doc, query):
+                self.docs.remove(doc)
+                return SimpleNamespace(deleted_count=1)
+        return SimpleNamespace(deleted_count=0)
+
+    async def update_one(self, query, update):
+        for doc in self.docs:
+            if matches(doc, query):
+                for field, value in update["$pull"].items():
+                    doc[field] = [v for v in doc[field] if v != value]
+                return SimpleNamespace(modified_count=1)
+        return SimpleNamespace(modified_count=0)
+
+    async def find_one_and_update(self, query, update, projection=None, return_document=None):
+        for doc in self.docs:
+            if matches(doc, query):
+                for field, amount in update["$inc"].items():
+                    doc[field] = doc.get(field, 0) + amount
+                return dict(doc)
+        return None
+
+
+class FakeDB:
+    def __init__(self):
+        self.stories = FakeCollection([
+            {"id": "s1", "status": "approved", "resonance_count": 0},
+            # Approved before resonances became edges; migrate_stories.py not run yet
+            {"id": "s2", "status": "approved", "resonance_count": 1, "resonated_by": ["legacy"]},
+        ])
+        self.story_resonances = FakeCollection()
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    fake_database = FakeDB()
+    monkeypatch.setattr(server, "db", fake_database)
+    refreshed = []
+
+    async def refresh_featured_stories():
+        refreshed.append(1)
+
+    monkeypatch.setattr(server, "refresh_featured_stories", refresh_featured_stories)
+    monkeypatch.setattr(server.featured_stories_snapshot, "value", [{"id": "s1", "is_featured": False}])
+    fake_database.featured_refreshes = refreshed
+    return fake_database
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+def make_user(user_id):
+    return server.User(id=user_id, email=f"{user_id}@example.com", name=user_id, user_type="student")
+
+
+@pytest.mark.anyio
+async def test_toggle_adds_then_removes_an_edge(fake_db):
+    reader = make_user("reader")
+
+    added = await server.toggle_resonance("s1", current_user=reader)
+    assert added == {"message": "Resonance added", "resonance_count": 1, "user_resonated": True}
+    assert fake_db.story_resonances.docs[0]["user_id"] == "reader"
+    assert "resonated_by" not in fake_db.stories.docs[0]
+
+    removed = await server.toggle_resonance("s1", current_user=reader)
+    assert removed == {"message": "Resonance removed", "resonance_count": 0, "user_resonated": False}
+    assert fake_db.story_resonances.docs == []
+    assert len(fake_db.featured_refreshes) == 2
+
+
+@pytest.mark.anyio
+async def test_toggle_removes_a_legacy_resonance_instead_of_counting_it_twice(fake_db):
+    legacy = make_user("legacy")
+    assert (await server.get_my_resonances("s1,s2", current_user=legacy)) == {"story_ids": ["s2"]}
+
+    result = await server.toggle_resonance("s2", current_user=legacy)
+    assert result["message"] == "Resonance removed" and result["resonance_count"] == 0
+    assert fake_db.stories.docs[1]["resonated_by"] == [] and fake_db.story_resonances.docs == []
+
+    result = await server.toggle_resonance("s2", current_user=legacy)
+    assert result["message"] == "Resonance added" and result["resonance_count"] == 1
+    assert (await server.get_my_resonances("s2", current_user=legacy)) == {"story_ids": ["s2"]}
+
+
+@pytest.mark.anyio
+async def test_toggle_on_unknown_story_is_404(fake_db):
+    with pytest.raises(server.HTTPException) as error:
+        await server.toggle_resonance("missing", current_user=make_user("reader"))
+    assert error.value.status_code == 404
@@ -0,0 +1,132 @@
+import pytest
+
+import server
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def to_list(self, length):
+        return self.docs[:length]
+
+
+def run_stages(docs, stages):
+    for stage in stages:
+        (op, spec), = stage.items()
+        if op == "$match":
+            docs = [d for d in docs if all(v in d.get(k, []) if isinstance(d.get(k), list) else d.get(k) == v
+                                           for k, v in spec.items())]
+        elif op == "$sort":
+            for field, direction in reversed(list(spec.items())):
+                docs.sort(key=lambda d: d.get(field), reverse=direction < 0)
+        elif op == "$skip":
+            docs = docs[spec:]
+        elif op == "$limit":
+            docs = docs[:spec]
+        elif op == "$count":
+            docs = [{spec: len(docs)}] if docs else []
+        elif op == "$unwind":
+            docs = [{**d, "tags": tag} for d in docs for tag in d.get("tags", [])]
+        elif op == "$group":
+            counts = {}
+            for d in docs:
+                counts[d["tags"]] = counts.get(d["tags"], 0) + 1
+            docs = [{"_id": tag, "count": count} for tag, count in counts.items()]
+    return docs
+
+
+class FakeStories:
+    """Understands the search pipeline: $text match, textScore, projection and $facet"""
+
+    def __init__(self, docs):
+        self.docs = docs
+        self.pipelines = []
+
+    def aggregate(self, pipeline):
+        self.pipelines.append(pipeline)
+        match, add_fields, project, facet = pipeline
+        words = match["$match"]["$text"]["$search"].lower().split()
+        docs = []
+        for doc in self.docs:
+            if doc["status"] != match["$match"]["status"]:
+                continue
+            text = f"{doc['title']} {' '.join(doc['tags'])} {doc['body']}".lower()
+            score = sum(text.count(word) for word in words) + sum(doc["title"].lower().count(w) for w in words)
+            if score:
+                hidden = [field for field, keep in project["$project"].items() if not keep]
+                docs.append({**{k: v for k, v in doc.items() if k not in hidden}, "score": score})
+        return FakeCursor([{name: run_stages(list(docs), stages) for name, stages in facet["$facet"].items()}])
+
+
+def story(story_id, title, body, tags, published_at, **extra):
+    return {"_id": story_id, "id": story_id, "status": "approved", "title": title, "body": body,
+            "body_html": f"<p>{body}</p>", "tags": tags, "published_at": published_at,
+            "author_email": "author@example.com", "author_name": "Sam", **extra}
+
+
+class FakeDB:
+    def __init__(self):
+        self.stories = FakeStories([
+            story("s1", "Night shifts", "burnout on night shifts", ["Burnout"], "2026-03-01", is_anonymous=False),
+            story("s2", "Burnout and grief", "burnout burnout after a loss", ["Burnout", "Grief"], "2026-03-02"),
+            story("s3", "Caregiving", "a quiet year of burnout", ["Caregiving"], "2026-03-03"),
+            story("s4", "Unrelated", "nothing to see", ["Grief"], "2026-03-04"),
+            {**story("s5", "Burnout draft", "burnout", ["Burnout"], "2026-03-05"), "status": "pending"},
+        ])
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    fake_database = FakeDB()
+    monkeypatch.setattr(server, "db", fake_database)
+    return fake_database
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.mark.anyio
+async def test_search_ranks_approved_matches_and_facets_their_tags(fake_db):
+    result = await server.search_stories(q=" burnout ", page=1, limit=2)
+
+    assert result["query"] == "burnout"
+    assert [s["id"] for s in result["stories"]] == ["s2", "s1"]
+    assert result["total"] == 3 and result["has_more"] is True
+    assert result["tags"] == [
+        {"tag": "Burnout", "count": 2}, {"tag": "Caregiving", "count": 1}, {"tag": "Grief", "count": 1},
+    ]
+    first = result["stories"][0]
+    assert first["author_name"] == "Anonymous" and result["stories"][1]["author_name"] == "Sam"
+    assert not {"_id", "body", "body_html", "author_email"} & set(first)
+    # One round-trip for the page, the total and the facets
+    assert len(fake_db.stories.pipelines) == 1
+
+
+@pytest.mark.anyio
+async def test_tag_filter_narrows_results_but_not_facets(fake_db):
+    result = await server.search_stories(q="burnout", tag="Caregiving", page=1, limit=2)
+
+    assert [s["id"] for s in result["stories"]] == ["s3"]
+    assert result["total"] == 1 and result["has_more"] is False
+    assert len(result["tags"]) == 3
+
+    last = await server.search_stories(q="burnout", page=2, limit=2)
+    assert [s["id"] for s in last["stories"]] == ["s3"] and last["has_more"] is False
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("params", [
+    {"q": "   "},
+    {"q": "burnout", "limit": 0},
+    {"q": "burnout", "limit": 51},
+    {"q": "burnout", "page": 0},
+    {"q": "burnout", "page": server.STORY_SEARCH_MAX_PAGE + 1},
+])
+async def test_search_rejects_bad_parameters(fake_db, params):
+    with pytest.raises(server.HTTPException) as error:
+        await server.search_stories(**{"page": 1, "limit": 12, **params})
+    assert error.value.status_code == 400
+    assert fake_db.stories.pipelines == []
@@ -0,0 +1,68 @@
+import pytest
+
+from tag_registry import TagRegistry
+
+
+class FakeHealthTags:
+    def __init__(self, docs):
+        self.docs = docs
+        self.distinct_calls = 0
+
+    async def distinct(self, field, query):
+        self.distinct_calls += 1
+        return [d[field] for d in self.docs if d["is_active"] == query["is_active"]]
+
+
+class FakeSiteCache:
+    def __init__(self):
+        self.docs = {}
+
+    async def find_one(self, query, projection=None):
+        doc = self.docs.get(query["_id"])
+        return dict(doc) if doc else None
+
+    async def find_one_and_update(self, query, update, projection=None, upsert=False, return_document=None):
+        doc = self.docs.setdefault(query["_id"], {"_id": query["_id"], "version": 0})
+        doc.update(update["$set"])
+        doc["version"] += update["$inc"]["version"]
+        return dict(doc)
+
+
+class FakeDB:
+    def __init__(self, tags):
+        self.health_tags = FakeHealthTags(tags)
+        self.site_cache = FakeSiteCache()
+
+    def __getitem__(self, name):
+        return getattr(self, name)
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.mark.anyio
+async def test_edits_published_by_one_worker_reach_another():
+    db = FakeDB([
+        {"name": "Caregiving", "is_active": True},
+        {"name": "Retired Topic", "is_active": False},
+    ])
+    admin_worker = TagRegistry(["Other"], revalidate_seconds=0)
+    story_worker = TagRegistry(["Other"], revalidate_seconds=0)
+
+    assert await story_worker.invalid_tags(db, ["Caregiving", "Retired Topic"]) == ["Retired Topic"]
+
+    db.health_tags.docs.append({"name": "Long COVID", "is_active": True})
+    await admin_worker.refresh(db)
+    assert await story_worker.invalid_tags(db, ["Long COVID"]) == []
+
+
+@pytest.mark.anyio
+async def test_defaults_apply_until_tags_are_seeded_and_reads_are_cached():
+    db = FakeDB([])
+    registry = TagRegistry(["Other"], revalidate_seconds=60)
+
+    assert await registry.allowed(db) == frozenset({"Other"})
+    await registry.allowed(db)
+    assert db.health_tags.distinct_calls == 1
@@ -0,0 +1,95 @@
+import pytest
+from datetime import datetime, timezone
+
+import trending
+
+
+class FakeBucketCollection:
+    def __init__(self):
+        self.counts = {}
+        self.pipelines = []
+
+    async def bulk_write(self, operations, ordered=True):
+        for op in operations:
+            key = (op._filter["tag"], op._filter["bucket"])
+            self.counts[key] = self.counts.get(key, 0) + op._doc["$inc"]["count"]
+
+    def aggregate(self, pipeline):
+        self.pipelines.append(pipeline)
+        window_start = pipeline[0]["$match"]["bucket"]["$gte"]
+        totals = {}
+        for (tag, bucket), count in self.counts.items():
+            if bucket >= window_start:
+                totals[tag] = totals.get(tag, 0) + count
+        rows = [{"_id": tag, "count": count} for tag, count in totals.items() if count > 0]
+        rows.sort(key=lambda row: (-row["count"], row["_id"]))
+        return FakeCursor(rows)
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def to_list(self, length):
+        return self.rows[:length]
+
+
+class FakeDB:
+    def __init__(self):
+        self.tag_buckets = FakeBucketCollection()
+
+    def __getitem__(self, name):
+        return getattr(self, name)
+
+
+@pytest.fixture
+def fake_db():
+    trending._trending_cache.clear()
+    return FakeDB()
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+def test_bucket_key_truncates_to_utc_hour():
+    moment = datetime(2026, 3, 1, 14, 59, 12, tzinfo=timezone.utc)
+    assert trending.bucket_key(moment) == "2026-03-01T14:00:00+00:00"
+
+
+@pytest.mark.anyio
+async def test_create_and_delete_balance_out(fake_db):
+    created_at = datetime(2026, 3, 1, 14, 5, tzinfo=timezone.utc)
+    await trending.record_tags(fake_db, ["Neuro", "#neuro", "tms"], created_at, 1)
+    await trending.record_tags(fake_db, ["neuro"], created_at.isoformat(), -1, now=created_at)
+
+    assert fake_db.tag_buckets.counts == {
+        ("neuro", "2026-03-01T14:00:00+00:00"): 0,
+        ("tms", "2026-03-01T14:00:00+00:00"): 1,
+    }
+
+
+@pytest.mark.anyio
+async def test_get_trending_ranks_within_window_and_caches(fake_db):
+    now = datetime(2026, 3, 2, 12, 30, tzinfo=timezone.utc)
+    await trending.record_tags(fake_db, ["old"], datetime(2026, 2, 20, tzinfo=timezone.utc), 1)
+    for _ in range(3):
+        await trending.record_tags(fake_db, ["crispr"], datetime(2026, 3, 2, 9, tzinfo=timezone.utc), 1)
+    await trending.record_tags(fake_db, ["mri"], datetime(2026, 3, 2, 12, tzinfo=timezone.utc), 1)
+
+    top = await trending.get_trending(fake_db, window_hours=24, limit=5, now=now)
+    assert top == [{"tag": "crispr", "count": 3}, {"tag": "mri", "count": 1}]
+
+    await trending.get_trending(fake_db, window_hours=24, limit=5, now=now)
+    assert len(fake_db.tag_buckets.pipelines) == 1
+
+
+@pytest.mark.anyio
+async def test_deleting_post_older_than_longest_window_leaves_buckets_alone(fake_db):
+    now = datetime(2026, 3, 20, 12, tzinfo=timezone.utc)
+    await trending.record_tags(fake_db, ["neuro"], datetime(2026, 3, 1, 14, tzinfo=timezone.utc), -1, now=now)
+    assert fake_db.tag_buckets.counts == {}
+
+    await trending.record_tags(fake_db, ["neuro"], datetime(2026, 3, 20, 9, tzinfo=timezone.utc), -1, now=now)
+    assert fake_db.tag_buckets.counts == {("neuro", "2026-03-20T09:00:00+00:00"): -1}
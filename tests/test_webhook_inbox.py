@@ -0,0 +1,162 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+import webhook_inbox
+
+NOW = datetime(2024, 6, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def matches(doc, query):
+    if "$or" in query and not any(matches(doc, clause) for clause in query["$or"]):
+        return False
+    for field, condition in query.items():
+        if field == "$or":
+            continue
+        value = doc.get(field)
+        if isinstance(condition, dict):
+            if "$lte" in condition and not (value is not None and value <= condition["$lte"]):
+                return False
+            if "$lt" in condition and not (value is not None and value < condition["$lt"]):
+                return False
+            if "$in" in condition and value not in condition["$in"]:
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+class FakeInbox:
+    def __init__(self):
+        self.docs = {}
+
+    async def insert_one(self, doc):
+        if doc["_id"] in self.docs:
+            raise DuplicateKeyError("duplicate")
+        self.docs[doc["_id"]] = dict(doc)
+
+    def _apply(self, doc, update):
+        doc.update(update.get("$set", {}))
+        for field, amount in update.get("$inc", {}).items():
+            doc[field] = doc.get(field, 0) + amount
+        for field in update.get("$unset", {}):
+            doc.pop(field, None)
+
+    async def find_one_and_update(self, query, update, sort=None, return_document=None):
+        due = sorted((d for d in self.docs.values() if matches(d, query)), key=lambda d: d["next_attempt_at"])
+        if not due:
+            return None
+        self._apply(due[0], update)
+        return dict(due[0])
+
+    async def update_one(self, query, update):
+        self._apply(self.docs[query["_id"]], update)
+
+    async def update_many(self, query, update):
+        selected = [d for d in self.docs.values() if matches(d, query)]
+        for doc in selected:
+            self._apply(doc, update)
+        return SimpleNamespace(modified_count=len(selected))
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def db():
+    return {webhook_inbox.INBOX_COLLECTION: FakeInbox()}
+
+
+@pytest.mark.anyio
+async def test_redelivered_event_is_stored_once_and_applied_once(db):
+    applied = []
+
+    async def handler(event):
+        applied.append(event["_id"])
+
+    payload = {"session_id": "cs_1"}
+    assert await webhook_inbox.record(db, "evt_1", "stripe", "checkout.session.completed", payload, now=NOW)
+    assert not await webhook_inbox.record(db, "evt_1", "stripe", "checkout.session.completed", payload, now=NOW)
+
+    assert await webhook_inbox.process_pending(db, handler, now=NOW) == 1
+    assert await webhook_inbox.process_pending(db, handler, now=NOW) == 0
+    assert applied == ["evt_1"]
+    assert db[webhook_inbox.INBOX_COLLECTION].docs["evt_1"]["status"] == webhook_inbox.DONE
+
+
+@pytest.mark.anyio
+async def test_failures_back_off_then_dead_letter_and_requeue(db, monkeypatch):
+    monkeypatch.setattr(webhook_inbox, "MAX_ATTEMPTS", 2)
+
+    async def failing(event):
+        raise RuntimeError("mongo hiccup")
+
+    await webhook_inbox.record(db, "evt_2", "stripe", "checkout.session.completed", {}, now=NOW)
+    inbox = db[webhook_inbox.INBOX_COLLECTION]
+
+    await webhook_inbox.process_pending(db, failing, now=NOW)
+    event = inbox.docs["evt_2"]
+    assert event["status"] == webhook_inbox.PENDING and event["last_error"] == "mongo hiccup"
+    # Not due again until the backoff has passed
+    assert await webhook_inbox.process_pending(db, failing, now=NOW + timedelta(seconds=10)) == 0
+
+    await webhook_inbox.process_pending(db, failing, now=NOW + timedelta(minutes=5))
+    assert inbox.docs["evt_2"]["status"] == webhook_inbox.DEAD
+
+    assert await webhook_inbox.requeue(db, {"status": webhook_inbox.DEAD}) == 1
+    assert inbox.docs["evt_2"]["attempts"] == 0 and inbox.docs["evt_2"]["status"] == webhook_inbox.PENDING
+
+
+@pytest.mark.anyio
+async def test_expired_lease_is_reclaimed(db):
+    async def handler(event):
+        pass
+
+    await webhook_inbox.record(db, "evt_3", "stripe", "checkout.session.completed", {}, now=NOW)
+    inbox = db[webhook_inbox.INBOX_COLLECTION]
+    # A worker claimed it and died
+    await webhook_inbox._claim(db, NOW)
+    assert await webhook_inbox.process_pending(db, handler, now=NOW + timedelta(seconds=30)) == 0
+
+    later = NOW + timedelta(seconds=webhook_inbox.LEASE_SECONDS + 1)
+    assert await webhook_inbox.process_pending(db, handler, now=later) == 1
+    assert inbox.docs["evt_3"]["status"] == webhook_inbox.DONE and inbox.docs["evt_3"]["attempts"] == 2
+
+
+@pytest.mark.anyio
+async def test_event_whose_lease_keeps_expiring_is_dead_lettered(db, monkeypatch):
+    monkeypatch.setattr(webhook_inbox, "MAX_ATTEMPTS", 2)
+    applied = []
+
+    async def handler(event):
+        applied.append(event["_id"])
+
+    await webhook_inbox.record(db, "evt_4", "stripe", "checkout.session.completed", {}, now=NOW)
+    inbox = db[webhook_inbox.INBOX_COLLECTION]
+    lease = timedelta(seconds=webhook_inbox.LEASE_SECONDS + 1)
+    # Two workers claimed it and died mid-handler
+    await webhook_inbox._claim(db, NOW)
+    await webhook_inbox._claim(db, NOW + lease)
+
+    assert await webhook_inbox.process_pending(db, handler, now=NOW + 2 * lease) == 1
+    assert applied == []
+    assert inbox.docs["evt_4"]["status"] == webhook_inbox.DEAD and "lease_until" not in inbox.docs["evt_4"]
+
+
+@pytest.mark.anyio
+async def test_process_pending_can_be_limited_to_given_events(db):
+    applied = []
+
+    async def handler(event):
+        applied.append(event["_id"])
+
+    for event_id in ("evt_5", "evt_6"):
+        await webhook_inbox.record(db, event_id, "stripe", "checkout.session.completed", {}, now=NOW)
+
+    assert await webhook_inbox.process_pending(db, handler, now=NOW, event_ids=["evt_6"]) == 1
+    assert applied == ["evt_6"]
+    assert db[webhook_inbox.INBOX_COLLECTION].docs["evt_5"]["status"] == webhook_inbox.PENDING